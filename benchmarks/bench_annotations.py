@@ -0,0 +1,60 @@
+"""
+Annotation conversion time for outlines of 1k to 200k parts.
+
+Text part records are generated directly, without building RDF graphs, so only
+TextPartProcessor._convert_to_annotation_format is timed.
+
+    PYTHONPATH=src python -m benchmarks.bench_annotations --sizes 1000 10000 200000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import tree_indexes
+from search_bdrc import BdrcScraper
+from search_bdrc.outline_formatter import TextPartProcessor
+
+
+def text_parts(n_parts: int, fanout: int) -> list[dict]:
+    return [
+        {
+            "id": f"MW0SYN_{n:06X}",
+            "label": f"part {tree_index}",
+            "part_tree_index": tree_index,
+            "part_index": int(tree_index.rsplit(".", 1)[-1]),
+        }
+        for n, tree_index in enumerate(tree_indexes(n_parts, fanout))
+    ]
+
+
+def run(sizes: list[int], fanout: int) -> list[dict]:
+    processor = TextPartProcessor(BdrcScraper())
+    results = []
+    for size in sizes:
+        parts = text_parts(size, fanout)
+        start = time.perf_counter()
+        processor._convert_to_annotation_format(parts)
+        elapsed = time.perf_counter() - start
+        results.append({"parts": size, "convert_s": elapsed, "us_per_part": elapsed / size * 1e6})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 200000])
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.fanout)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'parts':>8} {'convert (s)':>12} {'us/part':>8}")
+    for r in results:
+        print(f"{r['parts']:>8} {r['convert_s']:>12.3f} {r['us_per_part']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Import time of search_bdrc, measured in fresh interpreters.
+
+Each statement runs in a new Python process, timed from inside it so that
+interpreter startup is left out, and the heavy dependencies it loaded are
+listed. With --ref the same statements also run against another commit of the
+tree (exported with git archive), e.g. one from before the lazy imports:
+
+    PYTHONPATH=src python -m benchmarks.bench_import --ref f1bf8b7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STATEMENTS = [
+    "import search_bdrc",
+    "from search_bdrc import BdrcScraper",
+    "from search_bdrc import BdrcScraper; BdrcScraper()",
+    "from search_bdrc.outline_formatter import TextPartProcessor",
+]
+HEAVY_MODULES = ["playwright", "rdflib", "requests", "tqdm", "multiprocessing.pool", "asyncio"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"s": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_statement(statement: str, src: Path, repeat: int) -> dict:
+    runs = []
+    loaded = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True, cwd=src.parent, env={**os.environ, "PYTHONPATH": str(src)},
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        runs.append(result["s"])
+        loaded = result["loaded"]
+    return {"median_ms": statistics.median(runs) * 1000, "min_ms": min(runs) * 1000, "loaded": loaded}
+
+
+def export_ref(ref: str, directory: Path) -> Path:
+    """Extract the src tree of a git commit into directory, returning its src path."""
+    archive = subprocess.run(["git", "archive", ref, "src"], capture_output=True, check=True, cwd=ROOT).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(directory)
+    return directory / "src"
+
+
+def run(repeat: int, ref: str = None) -> dict:
+    trees = {"current": ROOT / "src"}
+    with tempfile.TemporaryDirectory() as tmp:
+        if ref:
+            trees[ref] = export_ref(ref, Path(tmp))
+        return {
+            name: {statement: time_statement(statement, src, repeat) for statement in STATEMENTS}
+            for name, src in trees.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--ref", help="git commit to compare with")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.ref)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, timings in results.items():
+        print(name)
+        for statement, r in timings.items():
+            loaded = ", ".join(r["loaded"]) or "-"
+            print(f"  {r['median_ms']:>8.1f} ms  {statement:<62} loads: {loaded}")
+
+
+if __name__ == "__main__":
+    main()
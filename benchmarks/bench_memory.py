@@ -0,0 +1,71 @@
+"""
+Memory held by converted outlines with dict records and with compact records.
+
+Synthetic outlines are parsed into RDF graphs first, outside of the
+measurement. Text parts are then extracted with extract_text_parts, as
+get_ordered_text_parts does, and converted with
+TextPartProcessor._convert_to_annotation_format. The peak and the memory still
+allocated afterwards (the text parts and the annotation output) are measured
+with tracemalloc.
+
+    PYTHONPATH=src python -m benchmarks.bench_memory --sizes 10000 100000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import outline_trig
+from search_bdrc import BdrcScraper
+from search_bdrc.outline_formatter import TextPartProcessor
+from search_bdrc.parsing import parse_outline_graph
+from search_bdrc.text_parts import extract_text_parts
+
+
+def measure(graph, compact: bool) -> dict:
+    processor = TextPartProcessor(BdrcScraper())
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    text_parts = extract_text_parts(graph, compact=compact)
+    output = processor._convert_to_annotation_format(text_parts, compact=compact)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del output, text_parts
+    return {"retained_mb": current / 2**20, "peak_mb": peak / 2**20, "seconds": elapsed}
+
+
+def run(sizes: list[int], fanout: int) -> list[dict]:
+    results = []
+    for size in sizes:
+        graph = parse_outline_graph(outline_trig(size, fanout))
+        results.append({"parts": size, "dict": measure(graph, False), "compact": measure(graph, True)})
+        del graph
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.fanout)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'parts':>8} {'dict (MB)':>10} {'compact (MB)':>13} {'dict peak':>10} {'compact peak':>13}")
+    for r in results:
+        print(
+            f"{r['parts']:>8} {r['dict']['retained_mb']:>10.1f} {r['compact']['retained_mb']:>13.1f} "
+            f"{r['dict']['peak_mb']:>10.1f} {r['compact']['peak_mb']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
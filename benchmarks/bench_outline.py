@@ -0,0 +1,59 @@
+"""
+Outline extraction time on synthetic TriG outlines of growing size.
+
+Parsing is timed separately from get_ordered_text_parts; the per-part cost of
+extraction should stay flat as outlines grow.
+
+    PYTHONPATH=src python -m benchmarks.bench_outline --sizes 1000 10000 50000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import outline_trig
+from search_bdrc import BdrcScraper
+from search_bdrc.parsing import parse_outline_graph
+
+
+def run(sizes: list[int], fanout: int) -> list[dict]:
+    scraper = BdrcScraper()
+    results = []
+    for size in sizes:
+        text = outline_trig(size, fanout=fanout)
+        start = time.perf_counter()
+        graph = parse_outline_graph(text)
+        parsed = time.perf_counter()
+        parts = scraper.get_ordered_text_parts(graph)
+        extracted = time.perf_counter()
+        results.append({
+            "parts": len(parts),
+            "triples": len(graph),
+            "parse_s": parsed - start,
+            "extract_s": extracted - parsed,
+            "extract_us_per_part": (extracted - parsed) / len(parts) * 1e6,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000])
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.fanout)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'parts':>8} {'triples':>9} {'parse (s)':>10} {'extract (s)':>12} {'us/part':>8}")
+    for r in results:
+        print(
+            f"{r['parts']:>8} {r['triples']:>9} {r['parse_s']:>10.2f} "
+            f"{r['extract_s']:>12.3f} {r['extract_us_per_part']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-page latency of the default and fast scrape modes against a local fixture server.
+
+Both modes load the same fixture search pages in one persistent browser, so the
+numbers compare page readiness only, not browser startup.
+
+    PYTHONPATH=src python -m benchmarks.bench_scrape --pages 10
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from search_bdrc import BdrcScraper
+from search_bdrc.browser_pool import ScrapeSettings, close_browser, fetch_page_content, get_browser
+
+
+def run(pages: int, asset_delay: float) -> dict:
+    scraper = BdrcScraper()
+    results = {}
+    with FixtureServer(asset_delay=asset_delay) as server:
+        get_browser()
+        for mode, settings in (("default", ScrapeSettings()), ("fast", ScrapeSettings(fast=True))):
+            latencies = []
+            ids = 0
+            for page_no in range(1, pages + 1):
+                start = time.perf_counter()
+                content = fetch_page_content(server.search_url("test", page_no), settings)
+                latencies.append(time.perf_counter() - start)
+                ids += len(scraper.extract_instance_ids(content))
+            results[mode] = {
+                "latencies": latencies,
+                "mean": statistics.mean(latencies),
+                "median": statistics.median(latencies),
+                "instance_ids": ids,
+            }
+        close_browser()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--asset-delay", type=float, default=0.3, help="seconds per static asset")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.asset_delay)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'page':>4} {'default (s)':>12} {'fast (s)':>10}")
+    for page_no in range(args.pages):
+        default = results["default"]["latencies"][page_no]
+        fast = results["fast"]["latencies"][page_no]
+        print(f"{page_no + 1:>4} {default:>12.3f} {fast:>10.3f}")
+    for mode in ("default", "fast"):
+        r = results[mode]
+        print(f"{mode}: mean {r['mean']:.3f}s, median {r['median']:.3f}s, {r['instance_ids']} instance IDs")
+
+
+if __name__ == "__main__":
+    main()
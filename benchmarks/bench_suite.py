@@ -0,0 +1,238 @@
+"""
+Offline benchmark of the scrape-to-annotations pipeline, stage by stage.
+
+Every request goes to a local ReplayServer, which replays the responses recorded
+in outputs/ and serves synthetic ones of configurable size, so results depend
+only on the code under test. Each stage is timed separately, `--repeat` times:
+
+    scrape                          render osearch pages in a browser
+    extract_instance_ids            find the result IDs in rendered pages
+    get_instance_metadata           download and parse instance Turtle
+    get_instance_metadata.parse     parse_turtle on the downloaded Turtle alone
+    get_instance_metadata.jsonld    download and decode JSON-LD metadata
+    fetch_outline_trig              download outline TriG
+    parse_outline_graph             build the outline graph
+    get_ordered_text_parts          extract the text parts from the graph
+    _convert_to_annotation_format   build the annotation document
+    write_json                      the JSON writes of process_outline
+    process_outline                 all of the above for one outline, forced
+    process_outline.unchanged       process_outline of an outline already done
+
+Results are written as JSON with the commit they were measured on; pass an
+earlier result file to --compare to see the change per stage.
+
+    PYTHONPATH=src python -m benchmarks.bench_suite --outline-parts 20000 --output bench.json
+    PYTHONPATH=src python -m benchmarks.bench_suite --outline-parts 20000 --compare bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from benchmarks.replay_server import ReplayServer
+from benchmarks.synthetic import search_results_html
+from search_bdrc import BdrcScraper
+from search_bdrc.json_output import write_json
+from search_bdrc.outline_formatter import TextPartProcessor
+from search_bdrc.parsing import parse_outline_graph, parse_turtle
+from search_bdrc.text_parts import json_default
+
+RECORDED_INSTANCES = ["MW19999", "MW21752", "MW23703"]
+RECORDED_OUTLINES = ["O2DB80610", "O2DB95714"]
+
+
+def timed(fn: Callable[[], object], repeat: int, items: int = 1) -> tuple[dict, object]:
+    """Time `fn` repeat times; returns the stage statistics and the last result."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    median = statistics.median(runs)
+    return {
+        "runs": runs,
+        "min": min(runs),
+        "median": median,
+        "mean": statistics.mean(runs),
+        "items": items,
+        "us_per_item": median / items * 1e6 if items else None,
+    }, result
+
+
+@contextmanager
+def working_directory(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scrape_stage(server: ReplayServer, pages: int, repeat: int) -> dict:
+    from search_bdrc.browser_pool import ScrapeSettings, close_browser, fetch_page_content, get_browser
+
+    settings = ScrapeSettings(fast=True)
+    get_browser()
+    try:
+        stats, _ = timed(
+            lambda: [fetch_page_content(server.search_url("bench", page_no), settings)
+                     for page_no in range(1, pages + 1)],
+            repeat, pages,
+        )
+    finally:
+        close_browser()
+    return stats
+
+
+def run(
+    outline_parts: int,
+    fanout: int = 8,
+    instances: int = 20,
+    pages: int = 5,
+    results_per_page: int = 20,
+    repeat: int = 3,
+    scrape: bool = True,
+) -> dict:
+    stages = {}
+    with ReplayServer(
+        outline_parts=outline_parts, fanout=fanout, results_per_page=results_per_page, asset_delay=0.0, api_delay=0.0
+    ) as server, tempfile.TemporaryDirectory() as tmp, working_directory(Path(tmp)):
+        scraper = BdrcScraper()
+        server.point(scraper)
+
+        if scrape:
+            try:
+                stages["scrape"] = scrape_stage(server, pages, repeat)
+            except Exception as e:
+                stages["scrape"] = {"error": f"{type(e).__name__}: {str(e).splitlines()[0]}"}
+
+        html = [search_results_html(page_no, results_per_page) for page_no in range(1, pages + 1)]
+        stages["extract_instance_ids"], _ = timed(
+            lambda: [scraper.extract_instance_ids(page) for page in html], repeat, pages
+        )
+
+        instance_ids = RECORDED_INSTANCES + [f"MW0BENCH{i}" for i in range(max(instances - len(RECORDED_INSTANCES), 0))]
+        stages["get_instance_metadata"], _ = timed(
+            lambda: [scraper.get_instance_metadata(instance_id) for instance_id in instance_ids],
+            repeat, len(instance_ids),
+        )
+        ttl = [scraper.fetch_instance_ttl(instance_id) for instance_id in instance_ids]
+        stages["get_instance_metadata.parse"], _ = timed(
+            lambda: [parse_turtle(text) for text in ttl], repeat, len(ttl)
+        )
+        stages["get_instance_metadata.jsonld"], _ = timed(
+            lambda: [scraper.get_instance_metadata(instance_id, json_format=True) for instance_id in instance_ids],
+            repeat, len(instance_ids),
+        )
+
+        outline_id = "OMW0BENCH"
+        stages["fetch_outline_trig"], trig = timed(lambda: scraper.fetch_outline_trig(outline_id), repeat)
+        stages["parse_outline_graph"], graph = timed(lambda: parse_outline_graph(trig), repeat)
+        stages["get_ordered_text_parts"], parts = timed(
+            lambda: scraper.get_ordered_text_parts(graph), repeat, outline_parts
+        )
+        processor = TextPartProcessor(scraper)
+        stages["_convert_to_annotation_format"], output = timed(
+            lambda: processor._convert_to_annotation_format(parts, scraper.get_page_title(graph)),
+            repeat, outline_parts,
+        )
+        out_dir = Path("out")
+        out_dir.mkdir()
+        destinations = [Path("cache") / "bench_full.json", Path("cache") / "bench.json", out_dir / "bench.json"]
+        stages["write_json"], _ = timed(
+            lambda: write_json(
+                {"text": output["text"], "annotations": processor._iter_filtered_annotations(output["annotations"])},
+                destinations, default=json_default,
+            ),
+            repeat, outline_parts,
+        )
+        stages["process_outline"], _ = timed(
+            lambda: processor.process_outline(outline_id, out_dir, force=True), repeat, outline_parts
+        )
+        stages["process_outline.unchanged"], _ = timed(
+            lambda: processor.process_outline(outline_id, out_dir), repeat, outline_parts
+        )
+
+        for recorded in RECORDED_OUTLINES:
+            stats, _ = timed(lambda: processor.process_outline(recorded, force=True), repeat)
+            stages[f"process_outline[{recorded}]"] = stats
+
+    return {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "params": {
+            "outline_parts": outline_parts,
+            "fanout": fanout,
+            "instances": len(instance_ids),
+            "pages": pages,
+            "results_per_page": results_per_page,
+            "repeat": repeat,
+        },
+        "stages": stages,
+    }
+
+
+def compare(baseline: dict, results: dict) -> None:
+    print(f"{'stage':<36} {'before (s)':>11} {'after (s)':>11} {'change':>8}")
+    for name, stats in results["stages"].items():
+        before = baseline.get("stages", {}).get(name, {})
+        if "median" not in stats or "median" not in before:
+            print(f"{name:<36} {'-':>11} {stats.get('median', float('nan')):>11.4f}")
+            continue
+        change = (stats["median"] / before["median"] - 1) * 100 if before["median"] else float("nan")
+        print(f"{name:<36} {before['median']:>11.4f} {stats['median']:>11.4f} {change:>+7.1f}%")
+    if baseline.get("params") != results["params"]:
+        print(f"note: parameters differ from the baseline ({baseline.get('params')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--outline-parts", type=int, default=5000, help="parts of the synthetic outline")
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--instances", type=int, default=20, help="instances whose metadata is fetched")
+    parser.add_argument("--pages", type=int, default=5, help="search result pages")
+    parser.add_argument("--results-per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-scrape", action="store_true", help="skip the browser stage")
+    parser.add_argument("--output", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(
+        args.outline_parts, args.fanout, args.instances, args.pages, args.results_per_page,
+        args.repeat, scrape=not args.no_scrape,
+    )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.compare:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), results)
+    elif not args.output:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the BDRC osearch UI, used by the benchmarks.
+
+The search page behaves like the real one as far as page readiness goes: the
+result anchors are rendered by JavaScript after an API call, the page pulls in a
+stylesheet, a font and a batch of images, and an analytics script keeps beaconing
+for a while, which delays network idle.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<link rel="stylesheet" href="/static/style.css">
+<script src="/analytics/track.js"></script>
+</head>
+<body>
+<div id="results"></div>
+{images}
+<script>
+fetch("/api/search?page={page_no}")
+  .then(r => r.json())
+  .then(ids => {{
+    const results = document.getElementById("results");
+    for (const id of ids) {{
+      const a = document.createElement("a");
+      a.setAttribute("href", "/show/bdr:" + id + "?uilang=bo");
+      a.textContent = id;
+      results.appendChild(a);
+      const img = document.createElement("img");
+      img.src = "/static/thumb/" + id + ".png";
+      results.appendChild(img);
+    }}
+  }});
+</script>
+</body>
+</html>
+"""
+
+ANALYTICS_JS = """
+let beacons = 0;
+const timer = setInterval(() => {
+  fetch("/analytics/beacon?n=" + beacons);
+  if (++beacons >= 6) clearInterval(timer);
+}, 250);
+"""
+
+# 1x1 transparent PNG
+PIXEL = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class FixtureServer:
+    """
+    Serve the fixture search pages on localhost from a background thread.
+
+    Args:
+        results_per_page: Number of result anchors on each page
+        images_per_page: Number of static images on each page
+        asset_delay: Seconds before each static asset or analytics response
+        api_delay: Seconds before the search API answers
+    """
+
+    def __init__(
+        self,
+        results_per_page: int = 20,
+        images_per_page: int = 10,
+        asset_delay: float = 0.3,
+        api_delay: float = 0.1,
+    ):
+        self.results_per_page = results_per_page
+        self.images_per_page = images_per_page
+        self.asset_delay = asset_delay
+        self.api_delay = api_delay
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search_url(self, query: str, page_no: int) -> str:
+        return f"{self.url}/osearch/search?q={query}&uilang=bo&page={page_no}"
+
+    def __enter__(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fixture.handle(self)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        parsed = urlparse(request.path)
+        query = parse_qs(parsed.query)
+        if parsed.path == "/osearch/search":
+            page_no = int(query.get("page", ["1"])[0])
+            images = "\n".join(
+                f'<img src="/static/img/{page_no}_{i}.png">' for i in range(self.images_per_page)
+            )
+            body = SEARCH_PAGE.format(page_no=page_no, images=images).encode()
+            self.respond(request, body, "text/html; charset=utf-8")
+        elif parsed.path == "/api/search":
+            page_no = int(query.get("page", ["1"])[0])
+            time.sleep(self.api_delay)
+            ids = [f"MW{page_no}_{i}" for i in range(self.results_per_page)]
+            self.respond(request, json.dumps(ids).encode(), "application/json")
+        elif parsed.path.startswith("/analytics/"):
+            time.sleep(self.asset_delay)
+            self.respond(request, ANALYTICS_JS.encode(), "application/javascript")
+        elif parsed.path.endswith(".css"):
+            time.sleep(self.asset_delay)
+            self.respond(request, b"body { font-family: 'Jomolhari'; }", "text/css")
+        elif parsed.path.startswith("/static/"):
+            time.sleep(self.asset_delay)
+            self.respond(request, PIXEL, "image/png")
+        else:
+            request.send_error(404)
+
+    @staticmethod
+    def respond(request: BaseHTTPRequestHandler, body: bytes, content_type: str, status: int = 200):
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
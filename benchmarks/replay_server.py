@@ -0,0 +1,110 @@
+"""
+Local stand-in for the BDRC metadata endpoints, used by the benchmark suite.
+
+On top of the osearch pages of FixtureServer it serves what BdrcScraper
+downloads: instance Turtle (/resource/<id>.ttl), JSON-LD (/resource/<id>.jsonld)
+and outline TriG (/graph/<id>.trig). Responses recorded in outputs/ are
+replayed as they are; any other ID gets a synthetic response, with outlines of
+`outline_parts` parts, so runs are repeatable and never touch the network.
+
+Synthetic instance <id> has the outline O<id>, whose parts are named after
+<id> as in benchmarks.synthetic.outline_trig.
+"""
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+from rdflib import Graph
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.synthetic import instance_ttl, outline_trig
+
+RECORDED = Path(__file__).resolve().parent.parent / "outputs"
+
+_RESOURCE = re.compile(r"/resource/([A-Za-z0-9_]+)\.(ttl|jsonld)$")
+_GRAPH = re.compile(r"/graph/([A-Za-z0-9_]+)\.trig$")
+
+
+def load_recordings(directory: Path = RECORDED) -> dict[str, bytes]:
+    """Recorded responses by request path: <id>_metadata.ttl and trig/<id>.trig files."""
+    recordings = {}
+    for path in directory.glob("*_metadata.ttl"):
+        recordings[f"/resource/{path.name[:-len('_metadata.ttl')]}.ttl"] = path.read_bytes()
+    for path in directory.glob("trig/*.trig"):
+        recordings[f"/graph/{path.name}"] = path.read_bytes()
+    return recordings
+
+
+class ReplayServer(FixtureServer):
+    """
+    Serve recorded and synthetic BDRC responses on localhost.
+
+    Args:
+        outline_parts: Number of parts of synthetic outlines
+        fanout: Children per part of synthetic outlines
+        recordings: Response bodies by request path, load_recordings() by default
+        **kwargs: Passed to FixtureServer for the search pages
+    """
+
+    CONTENT_TYPES = {
+        "ttl": "text/turtle; charset=utf-8",
+        "jsonld": "application/ld+json; charset=utf-8",
+        "trig": "application/trig; charset=utf-8",
+    }
+
+    def __init__(
+        self,
+        outline_parts: int = 1000,
+        fanout: int = 8,
+        recordings: Optional[dict[str, bytes]] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.outline_parts = outline_parts
+        self.fanout = fanout
+        self.recordings = load_recordings() if recordings is None else dict(recordings)
+        self._generated = {}
+        self._lock = threading.Lock()
+
+    def point(self, scraper) -> None:
+        """Send the searches, metadata and outline requests of a BdrcScraper to this server."""
+        scraper.SEARCH_URL = f"{self.url}/osearch/search?q={{input}}&uilang=bo&page={{page_no}}"
+        scraper.JSONLD_URL = f"{self.url}/resource/{{resource_id}}.jsonld"
+        scraper.TTL_URL = f"{self.url}/resource/{{resource_id}}.ttl"
+        scraper.TRIG_URL = f"{self.url}/graph/{{outline_id}}.trig"
+
+    def body(self, path: str) -> Optional[bytes]:
+        """Response body of a metadata or outline path, None if it isn't one."""
+        if path in self.recordings:
+            return self.recordings[path]
+        with self._lock:
+            if path not in self._generated:
+                self._generated[path] = self._generate(path)
+            return self._generated[path]
+
+    def _generate(self, path: str) -> Optional[bytes]:
+        match = _RESOURCE.match(path)
+        if match:
+            resource_id, extension = match.groups()
+            ttl = self.recordings.get(f"/resource/{resource_id}.ttl")
+            if ttl is None:
+                ttl = instance_ttl(resource_id, f"O{resource_id}", f"WA{resource_id}").encode()
+            if extension == "ttl":
+                return ttl
+            return Graph().parse(data=ttl, format="turtle").serialize(format="json-ld").encode()
+        match = _GRAPH.match(path)
+        if match:
+            outline_id = match.group(1)
+            root = outline_id[1:] if outline_id.startswith("O") else outline_id
+            return outline_trig(self.outline_parts, fanout=self.fanout, root=root).encode()
+        return None
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        path = urlparse(request.path).path
+        if not (_RESOURCE.match(path) or _GRAPH.match(path)):
+            return super().handle(request)
+        body = self.body(path)
+        self.respond(request, body, self.CONTENT_TYPES[path.rsplit(".", 1)[-1]])
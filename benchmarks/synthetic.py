@@ -0,0 +1,100 @@
+"""
+Synthetic BDRC outlines of arbitrary size.
+
+The generated TriG follows the shape of the outline graphs served by BDRC (see
+outputs/trig): every part has a type, tree index, labels, titles and a content
+location, nested `fanout` parts deep.
+"""
+import random
+
+PREFIXES = """\
+@prefix bdg:   <http://purl.bdrc.io/graph/> .
+@prefix bdo:   <http://purl.bdrc.io/ontology/core/> .
+@prefix bdr:   <http://purl.bdrc.io/resource/> .
+@prefix rdfs:  <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix skos:  <http://www.w3.org/2004/02/skos/core#> .
+"""
+
+PART_TYPES = ["PartTypeVolume", "PartTypeText", "PartTypeSection", "PartTypeChapter"]
+
+
+def tree_indexes(n_parts: int, fanout: int) -> list[str]:
+    """Breadth-first tree indexes ("1", "2", ..., "1.1", ...) for n_parts nodes."""
+    indexes = []
+    level = [str(i) for i in range(1, fanout + 1)]
+    while len(indexes) < n_parts:
+        indexes.extend(level[: n_parts - len(indexes)])
+        level = [f"{parent}.{i}" for parent in level for i in range(1, fanout + 1)]
+    return indexes
+
+
+def outline_trig(n_parts: int, fanout: int = 8, root: str = "MW0SYN", seed: int = 0) -> str:
+    """TriG text of an outline of `root` with n_parts parts."""
+    rng = random.Random(seed)
+    out = [PREFIXES, f"bdg:O{root} {{"]
+    part_ids = {}
+    for n, tree_index in enumerate(tree_indexes(n_parts, fanout)):
+        part = part_ids[tree_index] = f"{root}_{n:06X}"
+        depth = tree_index.count(".")
+        parent = part_ids[tree_index.rsplit(".", 1)[0]] if depth else root
+        volume = int(tree_index.split(".")[0])
+        page = rng.randint(1, 500)
+        titles = [f"TT{root}{n:06X}{i}" for i in range(rng.choice((1, 1, 2)))]
+
+        props = [
+            f'skos:prefLabel "part {tree_index}"@bo-x-ewts',
+            f"bdo:contentLocation bdr:CL{root}{n:06X}",
+            f"bdo:hasTitle {', '.join('bdr:' + t for t in titles)}",
+            f"bdo:inRootInstance bdr:{root}",
+            f"bdo:partIndex {tree_index.rsplit('.', 1)[-1]}",
+            f"bdo:partOf bdr:{parent}",
+            f'bdo:partTreeIndex "{tree_index}"',
+            f"bdo:partType bdr:{PART_TYPES[min(depth, len(PART_TYPES) - 1)]}",
+        ]
+        if n % 3 == 0:
+            props.insert(1, f'skos:prefLabel "part {tree_index}"@en')
+        if n % 5 == 0:
+            props.append(f'bdo:colophon "colophon {tree_index}"@bo-x-ewts')
+        if depth == 1:
+            props.append(f"bdo:instanceOf bdr:WA{root}{n:06X}")
+        out.append(f"    bdr:{part} a bdo:Instance ;\n        " + " ;\n        ".join(props) + " .")
+
+        out.append(
+            f"    bdr:CL{root}{n:06X} a bdo:ContentLocation ;\n"
+            f"        bdo:contentLocationEndPage {page + rng.randint(0, 20)} ;\n"
+            f"        bdo:contentLocationInstance bdr:W{root} ;\n"
+            f"        bdo:contentLocationPage {page} ;\n"
+            f"        bdo:contentLocationVolume {volume} ."
+        )
+        for i, title in enumerate(titles):
+            label = "rdfs:label" if i else "skos:prefLabel"
+            out.append(f'    bdr:{title} a bdo:Title ;\n        {label} "title {tree_index}/{i}"@bo-x-ewts .')
+    out.append("}")
+    return "\n".join(out) + "\n"
+
+
+def instance_ttl(instance_id: str, outline_id: str, work_id: str, n_titles: int = 3) -> str:
+    """Turtle metadata of an instance with an outline, like ldspdi serves it."""
+    titles = [f"TT{instance_id}_{i:03d}" for i in range(n_titles)]
+    out = [
+        PREFIXES,
+        f"bdr:{instance_id} a bdo:Instance ;\n"
+        f"    bdo:hasOutline bdr:{outline_id} ;\n"
+        f"    bdo:hasTitle {', '.join('bdr:' + t for t in titles)} ;\n"
+        f"    bdo:instanceOf bdr:{work_id} ;\n"
+        f"    bdo:numberOfVolumes 1 ;\n"
+        f'    skos:prefLabel "instance {instance_id}"@bo-x-ewts .',
+    ]
+    for i, title in enumerate(titles):
+        out.append(f'bdr:{title} a bdo:Title ;\n    rdfs:label "title {i}"@bo-x-ewts .')
+    return "\n".join(out) + "\n"
+
+
+def search_results_html(page_no: int, results: int) -> str:
+    """A search result page as the browser has rendered it, with its result anchors."""
+    anchors = "\n".join(
+        f'<a href="/show/bdr:MW{page_no}_{i}?uilang=bo">MW{page_no}_{i}</a>'
+        f'<img src="/static/thumb/MW{page_no}_{i}.png">'
+        for i in range(results)
+    )
+    return f'<html><head></head><body><div id="results">\n{anchors}\n</div></body></html>'
@@ -0,0 +1,313 @@
+"""
+Persistent Playwright browsers for the BDRC search scraper.
+
+Every process that scrapes keeps one headless Chromium for its whole lifetime
+instead of launching a new one per page. Each page is loaded in its own browser
+context, which is cheap to create and keeps cookies and storage isolated between
+pages. The browser is relaunched only when it has crashed or disconnected.
+
+AsyncBrowserPool does the same with Playwright's async API: a few browsers in
+one process serve many pages loading concurrently.
+
+How a page is loaded is controlled by ScrapeSettings. The default waits for the
+network to go idle. Fast mode blocks images, fonts, stylesheets, media and
+analytics requests and treats the page as ready as soon as the result list
+anchors are in the DOM, falling back to the network idle wait when they never
+appear (e.g. on a page past the last result).
+
+A search page answered with 429 or a 5xx status raises ThrottledError. Given a
+RateLimiter, the pools load pages through it, sharing its per-host pacing with
+the HTTP session and the other worker processes.
+"""
+import asyncio
+import atexit
+import multiprocessing
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+
+from playwright.async_api import Browser as AsyncBrowser
+from playwright.async_api import Playwright as AsyncPlaywright
+from playwright.async_api import TimeoutError as AsyncTimeoutError
+from playwright.async_api import async_playwright
+from playwright.sync_api import Browser, Playwright, sync_playwright
+from playwright.sync_api import TimeoutError as SyncTimeoutError
+
+from search_bdrc.config import get_logger
+from search_bdrc.rate_limit import (
+    THROTTLE_STATUSES,
+    RateLimiter,
+    ThrottledError,
+    failure_outcome,
+    host_of,
+    parse_retry_after,
+)
+from search_bdrc.scrape_settings import DEFAULT_SETTINGS, ScrapeSettings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _WorkerState:
+    playwright: Playwright | None = None
+    browser: Browser | None = None
+    settings: ScrapeSettings = DEFAULT_SETTINGS
+    limiter: RateLimiter | None = None
+
+
+# Per-process browser state. Pool workers each get their own copy.
+_state = _WorkerState()
+
+
+def get_browser() -> Browser:
+    """
+    Return this process's browser, launching it on first use or after a crash.
+    """
+    browser = _state.browser
+    if browser is not None and browser.is_connected():
+        return browser
+    if browser is not None:
+        logger.warning("Browser disconnected, relaunching.")
+        _state.browser = None
+
+    if _state.playwright is None:
+        _state.playwright = sync_playwright().start()
+        atexit.register(close_browser)
+    logger.debug("Launching headless Chromium.")
+    browser = _state.playwright.chromium.launch(headless=True)
+    _state.browser = browser
+    return browser
+
+
+def close_browser():
+    """
+    Close this process's browser and stop Playwright. Safe to call repeatedly.
+    """
+    browser, playwright = _state.browser, _state.playwright
+    _state.browser = None
+    _state.playwright = None
+    if browser is not None:
+        try:
+            browser.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing browser: {e}")
+    if playwright is not None:
+        try:
+            playwright.stop()
+        except Exception as e:
+            logger.debug(f"Ignoring error while stopping playwright: {e}")
+
+
+def init_browser_worker(settings: ScrapeSettings = DEFAULT_SETTINGS, limiter: RateLimiter | None = None):
+    """
+    Pool initializer: launch the worker's browser up front and close it on exit.
+    """
+    _state.settings = settings
+    _state.limiter = limiter
+    # atexit hooks do not run in pool workers, multiprocessing finalizers do.
+    Finalize(None, close_browser, exitpriority=10)
+    try:
+        get_browser()
+    except Exception as e:
+        # A failing initializer makes the pool respawn workers forever, so leave
+        # the launch to the first page, which reports the error per page.
+        logger.error(f"Failed to launch browser in worker: {e}")
+
+
+def _check_response(response, url: str) -> None:
+    # goto returns None when the navigation didn't reach the network
+    if response is not None and response.status in THROTTLE_STATUSES:
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        raise ThrottledError(url, response.status, retry_after)
+
+
+def _load_page(browser, url: str, settings: ScrapeSettings) -> str:
+    context = browser.new_context()
+    try:
+        if settings.fast:
+            context.route(
+                "**/*",
+                lambda route: route.abort() if settings.is_blocked(route.request) else route.continue_(),
+            )
+        page = context.new_page()
+        if not settings.fast:
+            _check_response(page.goto(url, wait_until="networkidle"), url)  # waits for JS to load
+            return page.content()
+
+        _check_response(page.goto(url, wait_until="domcontentloaded"), url)
+        try:
+            page.wait_for_selector(settings.ready_selector, timeout=settings.ready_timeout_ms)
+        except SyncTimeoutError:
+            logger.debug(f"No results appeared on {url}, waiting for network idle.")
+            page.wait_for_load_state("networkidle")
+        return page.content()
+    finally:
+        try:
+            context.close()
+        except Exception:
+            pass
+
+
+def fetch_page_content(url: str, settings: ScrapeSettings | None = None) -> str:
+    """
+    Load a URL in a fresh context of this process's browser and return its HTML.
+
+    If the browser crashes while loading, it is relaunched and the page is
+    retried once. Without explicit settings, the ones this process's pool
+    worker was initialized with are used, and the page waits for a slot of the
+    worker's rate limiter if it has one.
+    """
+    settings = settings or _state.settings
+    limiter = _state.limiter
+    with limiter.limit(url) if limiter is not None else nullcontext():
+        browser = get_browser()
+        try:
+            return _load_page(browser, url, settings)
+        except Exception:
+            if browser.is_connected():
+                raise
+            logger.warning(f"Browser crashed while loading {url}, retrying.")
+        return _load_page(get_browser(), url, settings)
+
+
+@contextmanager
+def browser_worker_pool(
+    processes: int,
+    settings: ScrapeSettings = DEFAULT_SETTINGS,
+    limiter: RateLimiter | None = None,
+    start_method: str | None = None,
+):
+    """
+    Process pool whose workers each keep one browser alive between pages.
+
+    With a limiter, all workers load pages through it. Pass start_method="spawn"
+    when other threads of this process may hold locks, which a forked worker
+    would inherit locked. The pool is closed and joined on exit, so workers
+    shut their browsers down cleanly instead of being terminated.
+    """
+    context = multiprocessing.get_context(start_method)
+    pool = context.Pool(processes=processes, initializer=init_browser_worker, initargs=(settings, limiter))
+    try:
+        yield pool
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+class AsyncBrowserPool:
+    """
+    A small set of async browsers shared by many concurrently loading pages.
+
+    Pages are spread over the browsers round-robin, each in its own context.
+    A browser that has disconnected is relaunched the next time it is picked.
+    With a limiter, every page load waits for a slot of it. Use as an async
+    context manager.
+    """
+
+    def __init__(
+        self, browsers: int = 2, settings: ScrapeSettings = DEFAULT_SETTINGS, limiter: RateLimiter | None = None
+    ):
+        self.size = max(1, browsers)
+        self.settings = settings
+        self.limiter = limiter
+        self._playwright: AsyncPlaywright | None = None
+        self._browsers: list[AsyncBrowser] = []
+        self._locks: list[asyncio.Lock] = []
+        self._next = 0
+
+    async def __aenter__(self):
+        playwright = self._playwright = await async_playwright().start()
+        self._locks = [asyncio.Lock() for _ in range(self.size)]
+        self._browsers = list(await asyncio.gather(
+            *(playwright.chromium.launch(headless=True) for _ in range(self.size))
+        ))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser: {e}")
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _get_browser(self, slot: int) -> AsyncBrowser:
+        if self._playwright is None:
+            raise RuntimeError("AsyncBrowserPool is used outside of its async with block")
+        async with self._locks[slot]:
+            browser = self._browsers[slot]
+            if not browser.is_connected():
+                logger.warning("Browser disconnected, relaunching.")
+                browser = await self._playwright.chromium.launch(headless=True)
+                self._browsers[slot] = browser
+            return browser
+
+    async def _load_page(self, browser, url: str) -> str:
+        settings = self.settings
+        context = await browser.new_context()
+        try:
+            if settings.fast:
+
+                async def handle_route(route):
+                    if settings.is_blocked(route.request):
+                        await route.abort()
+                    else:
+                        await route.continue_()
+
+                await context.route("**/*", handle_route)
+            page = await context.new_page()
+            if not settings.fast:
+                _check_response(await page.goto(url, wait_until="networkidle"), url)  # waits for JS to load
+                return await page.content()
+
+            _check_response(await page.goto(url, wait_until="domcontentloaded"), url)
+            try:
+                await page.wait_for_selector(settings.ready_selector, timeout=settings.ready_timeout_ms)
+            except AsyncTimeoutError:
+                logger.debug(f"No results appeared on {url}, waiting for network idle.")
+                await page.wait_for_load_state("networkidle")
+            return await page.content()
+        finally:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    async def fetch_page_content(self, url: str) -> str:
+        """
+        Load a URL in a fresh context of one of the pool's browsers and return its HTML.
+
+        If the browser crashes while loading, the page is retried once on a
+        relaunched browser.
+        """
+        if self.limiter is None:
+            return await self._fetch(url)
+        host = host_of(url)
+        await self.limiter.acquire_async(host)
+        try:
+            content = await self._fetch(url)
+        except BaseException as e:
+            # a cancelled load only frees its slot, see failure_outcome
+            self.limiter.release(host, failure_outcome(e), getattr(e, "retry_after", None))
+            raise
+        self.limiter.release(host)
+        return content
+
+    async def _fetch(self, url: str) -> str:
+        slot = self._next
+        self._next = (self._next + 1) % self.size
+        browser = await self._get_browser(slot)
+        try:
+            return await self._load_page(browser, url)
+        except Exception:
+            if browser.is_connected():
+                raise
+            logger.warning(f"Browser crashed while loading {url}, retrying.")
+        return await self._load_page(await self._get_browser(slot), url)
@@ -0,0 +1,270 @@
+"""
+Command line batch runner: JSONL jobs in, JSONL results out.
+
+Each input line is a job, a JSON object with an "op" and its arguments:
+
+    {"op": "search", "query": "བྱང་ཆུབ", "pages": 3}
+    {"op": "instance_works", "id": "MW23703"}
+    {"op": "work_instances", "id": "WA0BC002"}
+    {"op": "instance_outlines", "id": "MW23703"}
+    {"op": "outline_annotations", "id": "O2DB80610"}
+
+A line holding just an ID (bare or as a JSON string) is a job for the --op
+operation. Jobs run concurrently on one scraper and its connection pool; each
+result is written as soon as it is ready, as the job's fields plus "line" (its
+input line number), "status" ("ok" or "error"), "seconds" and either "result"
+or "error". Results therefore come out in completion order. Input is read lazily
+and only a bounded number of jobs are in flight, so ID lists of any length can be
+piped through:
+
+    cut -f1 instance_ids.tsv | search-bdrc-batch --op instance_outlines > outlines.jsonl
+
+Requests to each BDRC host, from the HTTP session and the search browsers alike,
+go through one adaptive rate limiter (see search_bdrc.rate_limit) that starts at
+--rate requests per second and backs off when the server answers 429 or 5xx.
+
+Search jobs share one pool of --processes browser processes, started with the
+first search and kept until the end of the run.
+
+Logs and progress messages go to stderr, stdout only carries results.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from search_bdrc.config import configure_logging, get_logger
+from search_bdrc.metrics import Metrics
+from search_bdrc.scraper import BdrcScraper
+
+if TYPE_CHECKING:
+    from search_bdrc.outline_formatter import TextPartProcessor
+
+logger = get_logger(__name__)
+
+OPERATIONS = ["search", "instance_works", "work_instances", "instance_outlines", "outline_annotations"]
+
+
+class JobError(ValueError):
+    """A job line that can't be run."""
+
+
+def parse_job(line: str, default_op: Optional[str]) -> Dict[str, Any]:
+    """Turn one input line into a job dict with an "op"."""
+    text = line.strip()
+    try:
+        value = json.loads(text)
+    except ValueError:
+        # a bare ID
+        value = text
+    job: Dict[str, Any]
+    if isinstance(value, str):
+        job = {"id": value}
+    elif isinstance(value, dict):
+        job = dict(value)
+    else:
+        raise JobError(f"Expected a JSON object or an ID, got {text!r}")
+    job.setdefault("op", default_op)
+    if job["op"] not in OPERATIONS:
+        raise JobError(f"Unknown op {job['op']!r}, expected one of {', '.join(OPERATIONS)}")
+    if job["op"] == "search":
+        if not job.get("query"):
+            raise JobError("A search job needs a query")
+    elif not job.get("id"):
+        raise JobError(f"A {job['op']} job needs an id")
+    return job
+
+
+class BatchRunner:
+    """
+    Run jobs concurrently on a shared scraper.
+
+    Args:
+        scraper: Scraper used for every job
+        workers: Number of jobs run at once
+        output_dir: Where outline_annotations jobs write their JSON, as
+            process_outlines does
+        pages: Search result pages scraped by search jobs without "pages",
+            None scrapes until the results run out
+        processes: Browser processes shared by all search jobs
+
+    Call close() after the run to shut the browsers down.
+    """
+
+    def __init__(
+        self,
+        scraper: BdrcScraper,
+        workers: int = 8,
+        output_dir: Optional[Path] = None,
+        pages: Optional[int] = None,
+        processes: int = 4,
+    ):
+        self.scraper = scraper
+        self.workers = workers
+        self.output_dir = output_dir
+        self.pages = pages
+        self.processes = processes
+        self._processor: Optional["TextPartProcessor"] = None
+        self._processor_lock = threading.Lock()
+        self._browser_pool = contextlib.ExitStack()
+        self._browser_pool_lock = threading.Lock()
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "search": self.search,
+            "instance_works": lambda job: self.scraper.get_work_of_instance(job["id"]),
+            "work_instances": lambda job: self.scraper.get_related_instance_ids_from_work(job["id"]),
+            "instance_outlines": lambda job: self.scraper.get_outline_of_instance(job["id"], save_metadata=False),
+            "outline_annotations": self.outline_annotations,
+        }
+
+    @property
+    def processor(self):
+        # Created on the first outline job, it brings in rdflib and the cache directory
+        with self._processor_lock:
+            if self._processor is None:
+                from search_bdrc.outline_formatter import TextPartProcessor
+
+                self._processor = TextPartProcessor(self.scraper)
+            return self._processor
+
+    def _start_browser_pool(self) -> None:
+        # Jobs run on threads, so workers are spawned rather than forked: a
+        # forked worker would inherit the locks other jobs hold at the time
+        with self._browser_pool_lock:
+            if self.scraper.worker_pool is None:
+                from search_bdrc import browser_pool
+
+                self.scraper.worker_pool = self._browser_pool.enter_context(
+                    browser_pool.browser_worker_pool(
+                        self.processes, self.scraper.scrape_settings, self.scraper.rate_limiter, start_method="spawn"
+                    )
+                )
+                self._browser_pool.callback(setattr, self.scraper, "worker_pool", None)
+
+    def close(self) -> None:
+        """Shut down the browser pool of the search jobs, if one was started."""
+        with self._browser_pool_lock:
+            self._browser_pool.close()
+
+    def search(self, job: Dict[str, Any]) -> list:
+        self._start_browser_pool()
+        return self.scraper.get_related_instance_ids(
+            job["query"], job.get("pages", self.pages), job.get("processes", self.processes)
+        )
+
+    def outline_annotations(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        output_dir = job.get("output_dir", self.output_dir)
+        output_dir = Path(output_dir) if output_dir else None
+        output, unchanged = self.processor.write_outline(job["id"], output_dir, force=job.get("force", False))
+        return {"unchanged": unchanged, "output": str(output)}
+
+    def run_job(self, numbered: tuple) -> Any:
+        _, job = numbered
+        if isinstance(job, Exception):
+            raise job
+        return self.handlers[job["op"]](job)
+
+    def run(self, lines: Iterable[str], default_op: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run the jobs of input lines, yielding a result record as each finishes.
+
+        Blank lines are skipped; a line that isn't a valid job gives an error record.
+        """
+        def jobs():
+            for line_no, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, parse_job(line, default_op)
+                except JobError as e:
+                    yield line_no, e
+
+        started = {}
+
+        def timed_job(numbered: tuple):
+            started[numbered[0]] = time.perf_counter()
+            return self.run_job(numbered)
+
+        for (line_no, job), result in BdrcScraper.map_concurrently(timed_job, jobs(), self.workers):
+            record: Dict[str, Any] = dict(job) if isinstance(job, dict) else {}
+            record["line"] = line_no
+            seconds = time.perf_counter() - started.pop(line_no, time.perf_counter())
+            if isinstance(result, Exception):
+                record["status"] = "error"
+                record["error"] = f"{type(result).__name__}: {result}"
+            else:
+                record["status"] = "ok"
+                record["result"] = result
+            record["seconds"] = round(seconds, 3)
+            yield record
+
+
+def write_records(records: Iterable[Dict[str, Any]], out: TextIO) -> Dict[str, int]:
+    """Write records as JSON lines, flushing each one. Returns the count per status."""
+    counts: Dict[str, int] = {}
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    return counts
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="search-bdrc-batch", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input", nargs="?", default="-", help="JSONL job file, - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="result file, - for stdout (default)")
+    parser.add_argument("--op", choices=OPERATIONS, help="operation of lines without an op, e.g. bare IDs")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="jobs run at once")
+    parser.add_argument("--output-dir", type=Path, help="directory for outline annotation files")
+    parser.add_argument("--pages", type=int, help="search result pages per query, default until results run out")
+    parser.add_argument("--processes", type=int, default=4, help="browser processes shared by the searches")
+    parser.add_argument("--http-cache", type=Path, help="directory of an HTTP response cache to use")
+    parser.add_argument("--rate", type=float, default=5.0, help="starting requests per second per host")
+    parser.add_argument("--no-rate-limit", action="store_true", help="send requests without pacing them")
+    parser.add_argument("--metrics", type=Path, help="write a JSON metrics summary to this file at the end")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    args = parser.parse_args(argv)
+
+    configure_logging(logging.INFO if args.verbose else logging.WARNING)
+    http_cache = None
+    if args.http_cache:
+        from search_bdrc.http_cache import HttpCache
+
+        http_cache = HttpCache(args.http_cache)
+    rate_limiter = None
+    if not args.no_rate_limit:
+        from search_bdrc.rate_limit import RateLimiter
+
+        rate_limiter = RateLimiter(rate=args.rate, concurrency=args.workers)
+    metrics = Metrics() if args.metrics else None
+    scraper = BdrcScraper(http_cache=http_cache, metrics=metrics, rate_limiter=rate_limiter)
+    runner = BatchRunner(scraper, args.workers, args.output_dir, args.pages, args.processes)
+
+    with contextlib.ExitStack() as stack:
+        source = sys.stdin if args.input == "-" else stack.enter_context(open(args.input, encoding="utf-8"))
+        out = sys.stdout if args.output == "-" else stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        # Library code prints progress messages; keep them out of the results
+        stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        stack.callback(runner.close)
+        try:
+            counts = write_records(runner.run(source, args.op), out)
+        except BrokenPipeError:
+            # The reader went away, e.g. piped into head. Point stdout at devnull
+            # so that flushing it at exit doesn't fail again.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 1
+    if metrics is not None:
+        args.metrics.write_text(metrics.to_json(), encoding="utf-8")
+    logger.info(f"Finished jobs: {counts}")
+    return 1 if counts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,17 @@
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Send log records to stderr in the package's format.
+
+    Importing search_bdrc leaves logging alone; the command line entry points
+    call this, and applications embedding the package configure logging their
+    own way.
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
 
 
 def get_logger(name):
@@ -1,27 +1,290 @@
+"""
+Download of BDRC etexts.
+
+Etext volumes can be hundreds of MB, so responses are streamed to disk in chunks
+and never held in memory. A volume is written to `<name>.part` and renamed once
+complete and verified; when a download is interrupted, the next attempt asks the
+server for the rest of the file with an HTTP Range request instead of starting
+over. The volumes of an instance are downloaded in parallel.
+
+The etext of an instance is found by following its reproduction (an IE etext
+instance) to the etext resources of its volumes. The URL templates below are
+module-level settings so they can be pointed at another server.
+"""
+import hashlib
+import os
+import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterator, Optional
 import logging
 
-logging.basicConfig(level=logging.INFO)
+import requests
+
+from search_bdrc.config import configure_logging
+from search_bdrc.etext_reader import EtextReader
+from search_bdrc.http_session import DEFAULT_TIMEOUT
+from search_bdrc.scraper import BdrcScraper
+
 logger = logging.getLogger(__name__)
 
+BDO = "http://purl.bdrc.io/ontology/core/"
+BDO_INSTANCE_HAS_REPRODUCTION = BDO + "instanceHasReproduction"
+BDO_INSTANCE_HAS_VOLUME = BDO + "instanceHasVolume"
+BDO_ETEXT_RESOURCE = BDO + "eTextResource"
+
+# Plain text of one etext volume (UT...), by etext ID
+ETEXT_URL_TEMPLATE = "https://purl.bdrc.io/resource/{etext_id}.txt"
+ETEXT_DIR = Path("outputs/etexts")
+
+CHUNK_SIZE = 1 << 20
+# Errors after which a download is resumed where it stopped
+RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+_UNSATISFIED_RANGE = re.compile(r"bytes \*/(\d+)")
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify(path: Path, size: Optional[int], sha256: Optional[str]) -> None:
+    actual_size = path.stat().st_size
+    if size is not None and actual_size != size:
+        raise IOError(f"{path} has {actual_size} bytes, expected {size}")
+    if sha256 is not None and _file_sha256(path) != sha256.lower():
+        raise IOError(f"{path} does not match SHA-256 {sha256}")
+
+
+def _fetch_to_part(session: requests.Session, url: str, part: Path, chunk_size: int, timeout) -> Optional[int]:
+    """
+    Append the missing end of a file to `part`.
+
+    Returns:
+        Total size of the file as announced by the server, if it did
+    """
+    offset = part.stat().st_size if part.exists() else 0
+    # Byte ranges only line up with the file when it is sent unencoded
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # Nothing left past the end of the partial file
+            match = _UNSATISFIED_RANGE.match(response.headers.get("Content-Range", ""))
+            return int(match.group(1)) if match else offset
+        if response.status_code == 206:
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                raise IOError(f"Unexpected Content-Range from {url}: {response.headers.get('Content-Range')}")
+            total = None if match.group(2) == "*" else int(match.group(2))
+            mode = 'ab'
+        elif response.status_code == 200:
+            # The server ignored the Range header and sends the whole file
+            length = response.headers.get("Content-Length")
+            total = int(length) if length and not response.headers.get("Content-Encoding") else None
+            mode = 'wb'
+        else:
+            raise IOError(f"Error fetching {url}: {response.status_code}")
+
+        with open(part, mode) as f:
+            for chunk in response.iter_content(chunk_size):
+                f.write(chunk)
+    return total
+
+
+def download_file(
+    url: str,
+    path: str | Path,
+    session: Optional[requests.Session] = None,
+    size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    retries: int = 3,
+    chunk_size: int = CHUNK_SIZE,
+    timeout=DEFAULT_TIMEOUT,
+) -> Path:
+    """
+    Stream a file to disk, resuming after interruptions.
+
+    Args:
+        url: File to download
+        path: Destination; data is written to path + ".part" until complete
+        session: requests session to use, a new one by default
+        size: Expected size in bytes, checked once complete. Without it the size
+            announced by the server is checked.
+        sha256: Expected SHA-256 hex digest, checked once complete
+        retries: Number of times a dropped connection is resumed
+        chunk_size: Bytes read from the response at a time
+        timeout: requests timeout for connecting and for each read
+
+    Returns:
+        The destination path
+
+    Raises:
+        IOError: if the server answers with an error, or the file does not
+            match the expected size or hash
+    """
+    path = Path(path)
+    if path.exists():
+        try:
+            _verify(path, size, sha256)
+            return path
+        except IOError as e:
+            logger.warning(f"Downloading {path} again: {e}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    part = path.with_name(path.name + ".part")
+    session = session or requests.Session()
+
+    for attempt in range(retries + 1):
+        try:
+            total = _fetch_to_part(session, url, part, chunk_size, timeout)
+        except RESUMABLE_ERRORS as e:
+            if attempt == retries:
+                raise
+            logger.warning(f"Download of {url} interrupted at {part.stat().st_size if part.exists() else 0} bytes: {e}")
+            continue
+        if not part.exists():
+            part.touch()
+        expected = size if size is not None else total
+        if expected is not None and part.stat().st_size < expected and attempt < retries:
+            logger.warning(f"Download of {url} stopped at {part.stat().st_size} of {expected} bytes, resuming")
+            continue
+        break
+
+    expected = size if size is not None else total
+    try:
+        _verify(part, expected, sha256)
+    except IOError:
+        # A file that is only short is resumed by the next call; one that is
+        # too long or corrupt can't be, start over next time
+        if expected is None or part.stat().st_size >= expected:
+            part.unlink()
+        raise
+    os.replace(part, path)
+    return path
+
+
+def list_etext_volumes(instance_id: str, scraper: Optional[BdrcScraper] = None) -> list[str]:
+    """
+    Etext IDs (UT...) of the volumes of an instance, in volume order.
+
+    Args:
+        instance_id: An instance (MW...) or etext instance (IE...) ID
+        scraper: Scraper used for the metadata lookups
+    """
+    scraper = scraper or BdrcScraper()
+    if instance_id.startswith("IE"):
+        etext_instances = [instance_id]
+    else:
+        linked = scraper.get_linked_ids(instance_id, BDO_INSTANCE_HAS_REPRODUCTION) or []
+        etext_instances = [resource_id for resource_id in linked if resource_id.startswith("IE")]
+
+    etexts = []
+    for etext_instance in etext_instances:
+        found = scraper.get_linked_ids(etext_instance, BDO_ETEXT_RESOURCE)
+        if not found:
+            # Etext references may only be described on the volumes
+            found = []
+            for volume_id in scraper.get_linked_ids(etext_instance, BDO_INSTANCE_HAS_VOLUME) or []:
+                found.extend(scraper.get_linked_ids(volume_id, BDO_ETEXT_RESOURCE) or [])
+        etexts.extend(sorted(found))
+    return list(dict.fromkeys(etexts))
+
+
+def download_instance_etexts(
+    instance_id: str,
+    output_dir: str | Path = ETEXT_DIR,
+    workers: int = 4,
+    scraper: Optional[BdrcScraper] = None,
+    url_template: str = ETEXT_URL_TEMPLATE,
+    etext_ids: Optional[list[str]] = None,
+    **kwargs,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Download all etext volumes of an instance in parallel.
+
+    Volumes are saved as output_dir/<instance_id>/<etext_id>.txt. Files that
+    are already complete are not downloaded again.
+
+    Args:
+        instance_id: An instance (MW...) or etext instance (IE...) ID
+        output_dir: Directory for the instance's etext folder
+        workers: Number of volumes downloaded at once
+        scraper: Scraper whose session is used for the metadata and downloads
+        url_template: URL of a volume's text, formatted with etext_id
+        etext_ids: Volumes to download, defaults to list_etext_volumes
+        **kwargs: Passed to download_file
+
+    Yields:
+        (etext_id, path) as each volume finishes, or (etext_id, exception) if
+        its download failed
+    """
+    scraper = scraper or BdrcScraper()
+    instance_dir = Path(output_dir) / instance_id
+    kwargs.setdefault("timeout", scraper.timeout)
+
+    def download(etext_id: str) -> Path:
+        return download_file(
+            url_template.format(etext_id=etext_id),
+            instance_dir / f"{etext_id}.txt",
+            session=scraper.session,
+            **kwargs,
+        )
+
+    if etext_ids is None:
+        etext_ids = list_etext_volumes(instance_id, scraper)
+    return BdrcScraper.map_concurrently(download, etext_ids, workers)
+
+
 def get_text_from_instance_id(instance_id: str) -> Optional[str]:
     """Get text content from a given instance ID.
-    
+
+    Downloads the etext volumes of the instance into outputs/etexts and joins
+    them. For very large etexts use download_instance_etexts and read the
+    volume files instead.
+
     Args:
         instance_id: The ID of the instance (e.g. MW23703)
-        
+
     Returns:
         Text content if successful, None if instance not found or can't be read
     """
-    pass
+    scraper = BdrcScraper()
+    etext_ids = list_etext_volumes(instance_id, scraper)
+    if not etext_ids:
+        return None
+    paths = {}
+    for etext_id, result in download_instance_etexts(instance_id, scraper=scraper, etext_ids=etext_ids):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to download etext {etext_id} of {instance_id}: {result}")
+            return None
+        paths[etext_id] = result
+    texts = []
+    # Volumes finish in any order, join them in volume order
+    for etext_id in etext_ids:
+        text = read_text_file(paths[etext_id])
+        if text is None:
+            return None
+        texts.append(text)
+    return "\n".join(texts)
 
 def read_text_file(file_path: str | Path) -> Optional[str]:
     """Read text content from a file.
-    
+
+    This decodes the whole file; use etext_reader.EtextReader to read spans of
+    large etexts.
+
     Args:
         file_path: Path to the text file to read
-        
+
     Returns:
         Text content if successful, None if file doesn't exist or can't be read
     """
@@ -29,20 +292,22 @@ def read_text_file(file_path: str | Path) -> Optional[str]:
         path = Path(file_path)
         if not path.exists():
             return None
-            
+
         return path.read_text(encoding='utf-8')
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return None
 
 def main():
+    configure_logging()
     # Example usage
     file_path = Path("outputs/etexts/W22084.txt")
-    text = read_text_file(file_path)
-    if text:
-        print(f"Successfully read {len(text)} characters from {file_path}")
-    else:
+    if not file_path.exists():
         print(f"Failed to read {file_path}")
+        return
+    # Count characters through the offset index instead of decoding the file
+    with EtextReader(file_path) as reader:
+        print(f"Successfully read {len(reader)} characters from {file_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,152 @@
+"""
+Memory-mapped reading of character spans from large UTF-8 etexts.
+
+Annotation positions are character offsets, but in UTF-8 Tibetan text a
+character takes one to four bytes, so finding where a character starts normally
+means decoding everything before it. EtextReader keeps a sparse index of
+(character offset, byte offset) pairs, one per block of about `block_bytes`
+bytes, with each block starting on a character boundary. A span is read by
+finding the block holding each end with a binary search, decoding at most that
+block to reach the exact character, and decoding only the bytes of the span.
+
+The index is built once by counting UTF-8 lead bytes and cached next to the
+file as <name>.charidx.json; it is rebuilt when the file's size or
+modification time changes.
+"""
+import json
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Union
+
+from search_bdrc.config import get_logger
+from search_bdrc.json_output import unique_tmp_path
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+BLOCK_BYTES = 16384
+
+# Every byte that starts a character, i.e. all but UTF-8 continuation bytes
+_LEAD_BYTES = bytes(b for b in range(256) if b & 0xC0 != 0x80)
+
+
+class EtextReader:
+    """
+    Read character spans of a UTF-8 text file without decoding all of it.
+
+    Usable as a context manager; positions are 0-based character offsets.
+    """
+
+    def __init__(self, path: Union[str, Path], block_bytes: int = BLOCK_BYTES, cache_index: bool = True):
+        self.path = Path(path)
+        self.block_bytes = block_bytes
+        self._file = open(self.path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        # mmap cannot map an empty file
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b''
+        self.index_path = self.path.with_name(self.path.name + ".charidx.json")
+        if not (cache_index and self._load_index()):
+            self._build_index()
+            if cache_index:
+                self._save_index()
+
+    def __enter__(self) -> "EtextReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _build_index(self) -> None:
+        data = self._data
+        chars = array('q')
+        offsets = array('q')
+        char_pos = 0
+        pos = 0
+        while pos < self._size:
+            end = min(pos + self.block_bytes, self._size)
+            # move the block end to the start of the next character
+            while end < self._size and data[end] & 0xC0 == 0x80:
+                end += 1
+            chars.append(char_pos)
+            offsets.append(pos)
+            block = data[pos:end]
+            char_pos += len(block) - len(block.translate(None, _LEAD_BYTES))
+            pos = end
+        self._chars = chars
+        self._offsets = offsets
+        self._length = char_pos
+
+    def _load_index(self) -> bool:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (index.get("version"), index.get("size"), index.get("mtime_ns"), index.get("block_bytes")) != (
+            INDEX_VERSION, self._size, self._mtime_ns, self.block_bytes
+        ):
+            return False
+        self._chars = array('q', index["chars"])
+        self._offsets = array('q', index["offsets"])
+        self._length = index["length"]
+        return True
+
+    def _save_index(self) -> None:
+        tmp_path = unique_tmp_path(self.index_path)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "size": self._size,
+                    "mtime_ns": self._mtime_ns,
+                    "block_bytes": self.block_bytes,
+                    "length": self._length,
+                    "chars": self._chars.tolist(),
+                    "offsets": self._offsets.tolist(),
+                }, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not cache the character index of {self.path}: {e}")
+
+    def byte_offset(self, char_pos: int) -> int:
+        """Byte offset at which the character at `char_pos` starts."""
+        char_pos = max(0, min(char_pos, self._length))
+        if char_pos == self._length:
+            return self._size
+        i = bisect_right(self._chars, char_pos) - 1
+        start = self._offsets[i]
+        skip = char_pos - self._chars[i]
+        if not skip:
+            return start
+        end = self._offsets[i + 1] if i + 1 < len(self._offsets) else self._size
+        return start + len(self._data[start:end].decode('utf-8')[:skip].encode('utf-8'))
+
+    def read(self, start: int, end: int) -> str:
+        """Characters start to end, like text[start:end] on the decoded file."""
+        if end <= start:
+            return ""
+        return self._data[self.byte_offset(start):self.byte_offset(end)].decode('utf-8')
+
+    def read_annotation(self, annotation: Any) -> str:
+        """Text covered by an annotation dict or Annotation record."""
+        if isinstance(annotation, dict):
+            return self.read(annotation["start_position"], annotation["end_position"])
+        return self.read(annotation.start_position, annotation.end_position)
+
+    def iter_annotations(self, annotations: Iterable[Any]) -> Iterator[str]:
+        """Text of each annotation, in order."""
+        for annotation in annotations:
+            yield self.read_annotation(annotation)
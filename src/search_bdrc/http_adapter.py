@@ -0,0 +1,84 @@
+"""
+requests adapter that sends every attempt of a request through a RateLimiter.
+
+urllib3's Retry resends a request on its own, out of sight of anything above the
+adapter, so a limiter wrapped around session.get would count one slot for all
+of them and never hear about the 503s in between. RateLimitedAdapter does the
+retrying itself instead: each attempt takes a slot of the host, and its outcome
+is reported back so that throttling answers (429, 5xx) and dropped connections
+slow the host down, and a Retry-After header holds it until the time given.
+"""
+import time
+from typing import Iterable
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from search_bdrc.rate_limit import (
+    RateLimiter,
+    failure_outcome,
+    host_of,
+    parse_retry_after,
+)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter retrying through a shared RateLimiter.
+
+    The number of attempts a request took is left in `response.attempts`.
+
+    Args:
+        limiter: Limiter shared with the other sessions and browser workers
+        retries: Maximum retries of a request
+        backoff_factor: The n-th retry waits backoff_factor * 2 ** (n - 1)
+            seconds, unless the response gave a Retry-After
+        status_forcelist: Response statuses that are retried, besides 429
+        **kwargs: Passed to HTTPAdapter, e.g. pool_maxsize
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        retries: int = 5,
+        backoff_factor: float = 0.5,
+        status_forcelist: Iterable[int] = (500, 502, 503, 504),
+        **kwargs,
+    ):
+        super().__init__(max_retries=0, **kwargs)
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = frozenset(status_forcelist) | {429}
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        host = host_of(request.url)
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            self.limiter.acquire(host)
+            try:
+                response = super().send(request, stream, timeout, verify, cert, proxies)
+            except (ConnectionError, Timeout):
+                self.limiter.release(host, "error")
+                if last:
+                    raise
+                self._backoff(attempt)
+                continue
+            except BaseException as e:
+                self.limiter.release(host, failure_outcome(e))
+                raise
+
+            throttled = response.status_code in self.status_forcelist
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) if throttled else None
+            self.limiter.release(host, "throttled" if throttled else "ok", retry_after)
+            if not throttled or last:
+                setattr(response, "attempts", attempt + 1)
+                return response
+            response.close()
+            # With a Retry-After the limiter holds the host until it has passed
+            if retry_after is None:
+                self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> None:
+        if self.backoff_factor:
+            time.sleep(self.backoff_factor * 2 ** attempt)
@@ -0,0 +1,221 @@
+"""
+Disk-backed HTTP response cache for the BDRC metadata endpoints.
+
+Responses are keyed by URL and Accept header. Each entry stores the body next to
+a small JSON record holding its ETag and Last-Modified validators. Within the TTL
+an entry is served without touching the network; after it, the entry is
+revalidated with a conditional request and a 304 answer refreshes it in place.
+Once the cache grows past its size budget the least recently used entries are
+evicted.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from search_bdrc.config import get_logger
+from search_bdrc.json_output import unique_tmp_path
+
+logger = get_logger(__name__)
+
+
+class CachedResponse:
+    """
+    The parts of a requests.Response the scraper uses, rebuilt from a cache entry.
+    """
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: dict):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.from_cache = True
+
+    @property
+    def encoding(self) -> str:
+        content_type = self.headers.get("Content-Type", "")
+        for param in content_type.split(";")[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class HttpCache:
+    """
+    Persistent response cache with conditional revalidation and LRU eviction.
+
+    Safe to share between threads of one process.
+
+    Args:
+        cache_dir: Directory holding the cache entries
+        ttl: Seconds an entry is served without revalidation
+        max_bytes: Size budget for stored bodies, least recently used entries
+            are evicted beyond it
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = Path("cache") / "http",
+        ttl: float = 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        # key -> [last_access, body_size], loaded lazily from disk
+        self._index: Optional[dict[str, list]] = None
+        self._total_bytes = 0
+
+    @staticmethod
+    def key(url: str, accept: str = "") -> str:
+        return hashlib.sha256(f"{url}\n{accept}".encode()).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def _load_index(self) -> dict[str, list]:
+        if self._index is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._index = {}
+            for meta_path in self.cache_dir.glob("*.json"):
+                body_path = meta_path.with_suffix(".body")
+                try:
+                    size = body_path.stat().st_size
+                    self._index[meta_path.stem] = [meta_path.stat().st_mtime, size]
+                    self._total_bytes += size
+                except FileNotFoundError:
+                    continue
+        return self._index
+
+    def _read_entry(self, key: str) -> Optional[tuple[dict, bytes]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta, body
+
+    def _write_meta(self, key: str, meta: dict):
+        meta_path, _ = self._paths(key)
+        tmp_path = unique_tmp_path(meta_path)
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+    def _store(self, key: str, meta: dict, body: bytes):
+        _, body_path = self._paths(key)
+        tmp_path = unique_tmp_path(body_path)
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, body_path)
+        self._write_meta(key, meta)
+        with self._lock:
+            index = self._load_index()
+            old = index.get(key)
+            if old:
+                self._total_bytes -= old[1]
+            index[key] = [time.time(), len(body)]
+            self._total_bytes += len(body)
+            self._evict()
+
+    def _touch(self, key: str):
+        with self._lock:
+            entry = self._load_index().get(key)
+            if entry:
+                entry[0] = time.time()
+        try:
+            os.utime(self._paths(key)[0])
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget. Holds the lock."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        index = self._load_index()
+        for key, (_, size) in sorted(index.items(), key=lambda item: item[1][0]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            del index[key]
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+
+    def fetch(self, url: str, headers: Optional[dict] = None, get: Callable = requests.get):
+        """
+        GET a URL through the cache.
+
+        Args:
+            url: URL to fetch
+            headers: Request headers, the Accept header is part of the cache key
+            get: Function performing the actual request, called as get(url, headers=...)
+
+        Returns:
+            A CachedResponse when served from the cache, otherwise the response
+            returned by `get`. Only 200 responses are stored.
+        """
+        headers = dict(headers or {})
+        key = self.key(url, headers.get("Accept", ""))
+        with self._lock:
+            self._load_index()
+        cached = self._read_entry(key)
+
+        if cached is not None:
+            meta, body = cached
+            if time.time() - meta["stored_at"] < self.ttl:
+                self._touch(key)
+                self.stats["hits"] += 1
+                return CachedResponse(url, meta["status_code"], body, meta["headers"])
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = get(url, headers=headers)
+
+        if cached is not None and response.status_code == 304:
+            meta, body = cached
+            meta["stored_at"] = time.time()
+            self._write_meta(key, meta)
+            self._touch(key)
+            self.stats["revalidated"] += 1
+            logger.debug(f"Revalidated cached response for {url}")
+            return CachedResponse(url, meta["status_code"], body, meta["headers"])
+
+        self.stats["misses"] += 1
+        if response.status_code == 200:
+            response_headers = CaseInsensitiveDict(response.headers or {})
+            meta = {
+                "url": url,
+                "accept": headers.get("Accept", ""),
+                "status_code": 200,
+                "headers": {
+                    name: response_headers[name]
+                    for name in ("Content-Type", "ETag", "Last-Modified")
+                    if name in response_headers
+                },
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "stored_at": time.time(),
+            }
+            self._store(key, meta, response.content)
+        return response
@@ -0,0 +1,91 @@
+"""
+Shared HTTP session for the BDRC metadata endpoints.
+
+One requests.Session keeps connections to purl.bdrc.io and ldspdi-dev.bdrc.io
+alive between calls, so a batch of lookups pays the TCP and TLS handshake once
+per pooled connection instead of once per request. Failed requests are retried
+with exponential backoff on connection errors and 5xx responses.
+
+With a RateLimiter, requests are retried by http_adapter.RateLimitedAdapter
+instead, which also paces them per host and backs off when a host throttles.
+
+The session only issues GET requests and holds no per-request state, so one
+instance can be shared by all threads of a process; urllib3's connection pools
+are thread-safe.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+    from search_bdrc.rate_limit import RateLimiter
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def create_session(
+    pool_maxsize: int = 16,
+    pool_connections: int = 4,
+    retries: int = 5,
+    backoff_factor: float = 0.5,
+    status_forcelist: Iterable[int] = RETRY_STATUSES,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> requests.Session:
+    """
+    Create a connection-pooled session with retries.
+
+    Args:
+        pool_maxsize: Connections kept open per host
+        pool_connections: Number of hosts to keep a connection pool for
+        retries: Maximum retries for a request on connection errors, resets and
+            `status_forcelist` responses
+        backoff_factor: Base of the exponential backoff between retries, the
+            n-th retry waits backoff_factor * 2 ** (n - 1) seconds
+        status_forcelist: Response statuses that are retried
+        rate_limiter: Limiter every attempt of a request goes through, 429
+            responses are then retried as well
+
+    Returns:
+        A requests.Session with the retrying adapter mounted for http and https
+    """
+    # requests is imported here so that importing the package does not load it
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    adapter: HTTPAdapter
+    if rate_limiter is not None:
+        from search_bdrc.http_adapter import RateLimitedAdapter
+
+        adapter = RateLimitedAdapter(
+            rate_limiter,
+            retries=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+        )
+    else:
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,99 @@
+"""
+Streaming JSON output for annotation documents.
+
+Annotation documents are a small "text" object and a list of annotations that
+can run into hundreds of thousands of entries. write_json serializes such a
+document once, one annotation at a time, and writes the same bytes to every
+destination. With indent=4 the bytes are exactly those of
+json.dump(document, f, ensure_ascii=False, indent=4).
+"""
+import functools
+import json
+import os
+import threading
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+
+def iter_json_chunks(
+    document: dict, indent: Optional[int] = 4, default: Optional[Callable[[Any], Any]] = None
+) -> Iterator[str]:
+    """
+    Serialize a JSON object piece by piece.
+
+    Top-level values that are lists, tuples or iterators (such as a generator of
+    annotations) are written one element at a time and never held as a whole.
+
+    Args:
+        document: Object to serialize
+        indent: Indentation as with json.dump, or None for compact output
+            without any whitespace
+        default: json.dump `default` hook for objects JSON can't serialize
+    """
+    if indent is None:
+        dumps = functools.partial(json.dumps, ensure_ascii=False, separators=(',', ':'), default=default)
+        newline = pad = inner_pad = ""
+        key_sep = ":"
+    else:
+        dumps = functools.partial(json.dumps, ensure_ascii=False, indent=indent, default=default)
+        newline = "\n"
+        pad = " " * indent
+        inner_pad = pad * 2
+        key_sep = ": "
+
+    if not document:
+        yield "{}"
+        return
+    yield "{"
+    for i, (key, value) in enumerate(document.items()):
+        yield f"{',' if i else ''}{newline}{pad}{json.dumps(key, ensure_ascii=False)}{key_sep}"
+        if isinstance(value, (list, tuple, Iterator)):
+            yield "["
+            empty = True
+            for item in value:
+                # nested lines of an element move in by the two enclosing levels
+                item = dumps(item).replace("\n", newline + inner_pad)
+                yield f"{'' if empty else ','}{newline}{inner_pad}{item}"
+                empty = False
+            yield "]" if empty else f"{newline}{pad}]"
+        else:
+            yield dumps(value).replace("\n", newline + pad)
+    yield f"{newline}}}"
+
+
+def unique_tmp_path(path: Path) -> Path:
+    """
+    Temporary name next to `path` for an atomic write, unique to this process
+    and thread so that concurrent writes of the same file don't clobber it.
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def write_json(
+    document: dict,
+    paths: Iterable[Union[str, Path]],
+    indent: Optional[int] = 4,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Serialize a document once and write it to every path.
+
+    Each file is written to a temporary name next to it and moved into place
+    once complete, so readers never see a partly written file.
+    """
+    out_paths = [Path(path) for path in paths]
+    tmp_paths = [unique_tmp_path(path) for path in out_paths]
+    try:
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(tmp_path, 'wb')) for tmp_path in tmp_paths]
+            for chunk in iter_json_chunks(document, indent, default):
+                data = chunk.encode('utf-8')
+                for f in files:
+                    f.write(data)
+    except BaseException:
+        for tmp_path in tmp_paths:
+            tmp_path.unlink(missing_ok=True)
+        raise
+    for tmp_path, path in zip(tmp_paths, out_paths):
+        os.replace(tmp_path, path)
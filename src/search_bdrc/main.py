@@ -1,27 +1,25 @@
-from search_bdrc import BdrcScraper
+from search_bdrc.scraper import BdrcScraper
 from pathlib import Path
 import json
+import sys
+from search_bdrc.config import configure_logging
 from search_bdrc.outline_formatter import TextPartProcessor
 import logging
 
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
+    configure_logging()
     # Initialize scraper and processor
     scraper = BdrcScraper()
     processor = TextPartProcessor(scraper)
     
-    # Get outline ID for an instance
-    instance_id = "MW21752"
-    outline_id = scraper.get_outline_of_instance(instance_id)[0]
-    print(f"Outline ID: {outline_id}")
-    
-    # Process outline
-    try:
-        output_dir = Path("outputs")  # or any directory you want
-        output = processor.process_outline(outline_id, output_dir=output_dir)
-        logger.info(f"Successfully processed outline {outline_id}")
-    except Exception as e:
-        logger.error(f"Failed to process outline {outline_id}: {e}")
-    
-   
\ No newline at end of file
+    # Process the outlines of the instances given on the command line
+    instance_ids = sys.argv[1:] or ["MW21752"]
+    output_dir = Path("outputs")  # or any directory you want
+    records = processor.process_instances(instance_ids, output_dir=output_dir)
+    for record in records:
+        if record["status"] == "error":
+            logger.error(f"Failed to process instance {record['id']}: {record['error']}")
+        else:
+            logger.info(f"Processed outlines {record['outline_ids']} of instance {record['id']}")
@@ -0,0 +1,196 @@
+"""
+Stage timings and counters for BdrcScraper and TextPartProcessor.
+
+Both take a `metrics` object and report to it: how long each stage took (browser
+scraping, HTTP fetches, rdflib parsing, text part extraction, annotation
+conversion, JSON writes) and how much went through it (bytes fetched, cache
+hits, retries, triples, parts). The default is NullMetrics, whose methods do
+nothing, so an uninstrumented run only pays for a few no-op calls per document.
+
+Pass a Metrics instance to record, then export it with summary() / to_json()
+or to_prometheus():
+
+    metrics = Metrics()
+    scraper = BdrcScraper(metrics=metrics)
+    TextPartProcessor(scraper).process_outlines(outline_ids)
+    print(metrics.to_prometheus())
+
+Timings and counters are keyed by name and optional labels, e.g.
+metrics.count("http_bytes", n, endpoint="ttl").
+"""
+import json
+import re
+import threading
+import time
+from typing import Any, Optional
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class NullMetrics:
+    """Metrics sink that records nothing, the default of the scraper and processor."""
+
+    enabled = False
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        pass
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        pass
+
+    def stage(self, name: str, **labels: str):
+        """Context manager timing the block it wraps as one run of a stage."""
+        return _NULL_STAGE
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "labels", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, labels: dict):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        labels = self.labels if exc_type is None else {**self.labels, "error": exc_type.__name__}
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **labels)
+        return False
+
+
+class Metrics(NullMetrics):
+    """
+    Thread-safe in-memory record of stage timings and counters.
+
+    Each timing keeps the number of runs and their total, minimum and maximum
+    duration; counters keep a running total.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        # key -> [count, total, min, max]
+        self.timings: dict[tuple, list] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, *sorted(labels.items())) if labels else (name,)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                self.timings[key] = [1, seconds, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                timing[2] = min(timing[2], seconds)
+                timing[3] = max(timing[3], seconds)
+
+    def stage(self, name: str, **labels: str) -> _Stage:
+        return _Stage(self, name, labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Everything recorded so far as plain data.
+
+        Returns:
+            {"timings": [...], "counters": [...]}, with one entry per name and
+            label set, e.g. {"name": "parse", "labels": {"format": "trig"},
+            "count": 3, "total_s": 1.2, "mean_s": 0.4, "min_s": 0.3, "max_s": 0.5}
+        """
+        with self._lock:
+            timings = sorted(self.timings.items())
+            counters = sorted(self.counters.items())
+        return {
+            "timings": [
+                {
+                    "name": key[0],
+                    "labels": dict(key[1:]),
+                    "count": count,
+                    "total_s": total,
+                    "mean_s": total / count,
+                    "min_s": minimum,
+                    "max_s": maximum,
+                }
+                for key, (count, total, minimum, maximum) in timings
+            ],
+            "counters": [{"name": key[0], "labels": dict(key[1:]), "value": value} for key, value in counters],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.summary(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "search_bdrc") -> str:
+        """
+        Prometheus text exposition of the metrics.
+
+        Timings become summaries without quantiles (<name>_seconds_count and
+        _sum) plus a <name>_seconds_max gauge; counters become <name>_total.
+        """
+        summary = self.summary()
+        lines = []
+        declared = set()
+
+        def declare(metric: str, kind: str):
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} {kind}")
+
+        for timing in summary["timings"]:
+            metric = f"{prefix}_{_metric_name(timing['name'])}_seconds"
+            labels = _format_labels(timing["labels"])
+            declare(metric, "summary")
+            lines.append(f"{metric}_count{labels} {timing['count']}")
+            lines.append(f"{metric}_sum{labels} {timing['total_s']!r}")
+        for timing in summary["timings"]:
+            metric = f"{prefix}_{_metric_name(timing['name'])}_seconds_max"
+            declare(metric, "gauge")
+            lines.append(f"{metric}{_format_labels(timing['labels'])} {timing['max_s']!r}")
+        for counter in summary["counters"]:
+            metric = f"{prefix}_{_metric_name(counter['name'])}_total"
+            declare(metric, "counter")
+            lines.append(f"{metric}{_format_labels(counter['labels'])} {counter['value']!r}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+NULL_METRICS = NullMetrics()
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    return "{" + ",".join(f'{_metric_name(name)}="{value}"' for name, value in zip(labels, escaped)) + "}"
@@ -1,147 +1,224 @@
+import filecmp
+import hashlib
 import json
 import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from search_bdrc import BdrcScraper
+from tqdm import tqdm
+
+from search_bdrc.config import configure_logging
+from search_bdrc.json_output import unique_tmp_path, write_json
+from search_bdrc.metrics import NullMetrics
+from search_bdrc.page_index import VolumePageIndex
+from search_bdrc.parsing import parse_outline_graph
+from search_bdrc.scraper import BdrcScraper
+from search_bdrc.text_parts import Annotation, TextPart, json_default
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump when a change to extraction or conversion changes the files written by
+# process_outline, so that outlines processed by older code are redone.
+PROCESSING_VERSION = "1"
+
+# Start of a part not placed yet by its content location, see _convert_to_annotation_format
+_UNPLACED = -1
+
+# Batch manifest statuses of IDs that are not processed again on resume
+BATCH_DONE_STATUSES = {"ok", "unchanged"}
+
+def materialize_content(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore the placeholder content of a document written with virtual_content.
+    
+    The underscore padding is added back to text["content"] and content_length is
+    removed, giving the same document as without virtual_content. The document
+    is changed in place and returned; other documents are returned unchanged.
+    """
+    text = document["text"]
+    if "content_length" in text:
+        content_length = text.pop("content_length")
+        text["content"] = text["content"] + "_" * (content_length - len(text["content"]))
+    return document
+
+
+def load_annotations(path: Union[str, Path], materialize: bool = True) -> Dict[str, Any]:
+    """Read an annotation file written by process_outline.
+    
+    Args:
+        path: JSON file from the cache or output directory
+        materialize: Restore virtual placeholder content, see materialize_content
+    """
+    with open(path, encoding='utf-8') as f:
+        document = json.load(f)
+    return materialize_content(document) if materialize else document
+
+
 class TextPartProcessor:
-    def __init__(self, scraper: BdrcScraper):
+    def __init__(self, scraper: BdrcScraper, metrics: Optional[NullMetrics] = None):
+        """
+        Args:
+            scraper: Scraper used to fetch outlines and extract their text parts
+            metrics: Where stage timings and counters are reported, defaults to
+                the scraper's (see search_bdrc.metrics)
+        """
         self.scraper = scraper
+        self.metrics = metrics or scraper.metrics
         self.cache_dir = Path('cache')
         self.cache_dir.mkdir(exist_ok=True)
     
 
 
-    def _build_annotation_tree(self, annotations: List[Dict[str, Any]]) -> Dict[str, Dict]:
-        """Build a tree structure mapping each annotation to its direct children and siblings.
-        
-        Args:
-            annotations: List of annotations with tree_index information
-            
-        Returns:
-            Dictionary mapping tree_index to dict with children and siblings info
-        """
-        tree = {}
-        for i, anno in enumerate(annotations):
-            tree_idx = anno['meta']['part_tree_index']
-            tree[tree_idx] = []
-            # Find all descendants (direct and indirect children)
-            for j, other in enumerate(annotations):
-                if other['meta']['part_tree_index'].startswith(tree_idx + '.'):
-                    tree[tree_idx].append(j)
-        return tree
-
-    def _convert_to_annotation_format(self, text_parts: List[Dict[str, Any]], 
+    def _convert_to_annotation_format(self, text_parts: List[Any], 
                                    title: str = "BDRC Text Parts",
                                    language: str = "bo",
-                                   content: str = "") -> Dict[str, Any]:
+                                   content: str = "",
+                                   compact: bool = False,
+                                   virtual_content: bool = False,
+                                   page_index: Optional[VolumePageIndex] = None) -> Dict[str, Any]:
         """Convert text parts to annotation format with only headers
         
         Args:
-            text_parts: List of text parts with location and label information
+            text_parts: List of text part dicts with location and label information,
+                    or TextPart records. Sorted in place, and with compact
+                    converted to TextPart records in place.
             title: Title of the text
             language: Language code
             content: Optional content string. If provided, annotations will be adjusted to match content length.
                     If not provided, content will be filled with underscores to match max position.
+            compact: Build Annotation records pointing at TextPart records instead of
+                    annotation dicts. Dict text parts are converted to TextPart first.
+            virtual_content: Leave out the underscore padding of the content and store
+                    its full length as text["content_length"] instead. See materialize_content.
+            page_index: Page offsets of the etext of the outline. When given, parts are
+                    placed at the character span of their content location instead of
+                    being spaced evenly, and parents span their children.
         """
-        # Sort text parts by tree index to maintain hierarchy
-        text_parts.sort(key=lambda x: [int(i) for i in x['meta']['part_tree_index'].split('.')])
+        if compact:
+            text_parts[:] = [p if isinstance(p, TextPart) else TextPart.from_dict(p) for p in text_parts]
+            tree_index_of: Callable[[Any], Any] = attrgetter('part_tree_index')
+        else:
+            tree_index_of = itemgetter('part_tree_index')
         
-        annotations = []
+        # Sort text parts by tree index to maintain hierarchy
+        text_parts.sort(key=lambda x: [int(i) for i in tree_index_of(x).split('.')])
+        tree_indexes = [tree_index_of(part) for part in text_parts]
         
         # Calculate base spacing between annotations
         total_parts = len(text_parts)
         content_length = len(content) if content else total_parts * 10
         base_spacing = content_length // total_parts
-        current_pos = 1
-        
-        # First pass: create annotations with initial positions
-        for part in text_parts:
-            annotation = {
-                "annotation_type": "header",
-                "start_position": current_pos,
-                "end_position": current_pos + base_spacing,  # Will be updated for parents
-                "label": "section_header",
-                "name": part['label'],
-                "meta": {
+        
+        # First pass: initial positions, end positions are updated for parents
+        start_positions = [1 + i * base_spacing for i in range(total_parts)]
+        end_positions = [start + base_spacing for start in start_positions]
+        levels = [tree_index.count('.') + 1 for tree_index in tree_indexes]
+        
+        if page_index is not None:
+            # Positioning stage: place parts at the pages of their content location.
+            # Parts without one are left open (_UNPLACED) and placed after the second pass.
+            for i, part in enumerate(text_parts):
+                location = part.location_dict() if compact else part.get('location')
+                span = page_index.span(location)
+                start_positions[i], end_positions[i] = span if span else (_UNPLACED, _UNPLACED)
+        
+        # Index of the first annotation for each tree index
+        by_tree_index: Dict[str, int] = {}
+        for i, tree_index in enumerate(tree_indexes):
+            by_tree_index.setdefault(tree_index, i)
+        
+        # Second pass: establish relationships and adjust positions bottom-up.
+        # Processing the deepest nodes first means every annotation already covers
+        # its descendants when it extends its own parent.
+        parent_ids: List[Optional[int]] = [None] * total_parts
+        has_children = [False] * total_parts
+        for idx in sorted(range(total_parts), key=lambda i: -levels[i]):
+            if levels[idx] == 1:
+                continue
+            parent_idx = by_tree_index.get(tree_indexes[idx].rsplit('.', 1)[0])
+            if parent_idx is None:
+                continue
+            parent_ids[idx] = parent_idx
+            has_children[parent_idx] = True
+            # Update parent's end position to cover this descendant
+            if page_index is None:
+                end_positions[parent_idx] = max(end_positions[parent_idx], end_positions[idx])
+            elif start_positions[idx] != _UNPLACED:
+                # Parents without a location of their own span their descendants
+                if start_positions[parent_idx] == _UNPLACED:
+                    start_positions[parent_idx] = start_positions[idx]
+                    end_positions[parent_idx] = end_positions[idx]
+                else:
+                    start_positions[parent_idx] = min(start_positions[parent_idx], start_positions[idx])
+                    end_positions[parent_idx] = max(end_positions[parent_idx], end_positions[idx])
+        
+        if page_index is not None:
+            # Parts placed nowhere get an empty span where the previous part ends
+            previous_end = 0
+            for i in range(total_parts):
+                if start_positions[i] == _UNPLACED:
+                    start_positions[i] = end_positions[i] = previous_end
+                previous_end = end_positions[i]
+        
+        annotations: Union[List[Annotation], List[Dict[str, Any]]]
+        if compact:
+            annotations = [
+                Annotation(start_positions[i], end_positions[i], part, parent_ids[i], has_children[i])
+                for i, part in enumerate(text_parts)
+            ]
+        else:
+            annotations = annotation_dicts = []
+            for i, part in enumerate(text_parts):
+                tree_index = tree_indexes[i]
+                meta = {
                     "id": part.get('id'),
                     "location": part.get('location'),
                     "titles": part.get('titles', []),
                     "colophon": part.get('colophon'),
                     "part_index": part.get('part_index'),
-                    "part_tree_index": part['part_tree_index'],
+                    "part_tree_index": tree_index,
                     "instance_of": part.get('instance_of'),
                     "part_of": part.get('part_of'),
                     "root_instance": part.get('root_instance'),
-                    "level": len(part['part_tree_index'].split('.')),
-                    "parent": '.'.join(part['part_tree_index'].split('.')[:-1]) if '.' in part['part_tree_index'] else None
+                    "level": levels[i],
+                    "parent": tree_index.rsplit('.', 1)[0] if '.' in tree_index else None
                 }
-            }
-            annotations.append(annotation)
-            current_pos += base_spacing
-        
-        # Build tree structure
-        tree = self._build_annotation_tree(annotations)
-        
-        # Second pass: establish relationships and adjust positions bottom-up
-        # Process deepest nodes first
-        sorted_indices = sorted(
-            range(len(annotations)),
-            key=lambda i: (-len(annotations[i]['meta']['part_tree_index'].split('.')), annotations[i]['meta']['part_tree_index'])
-        )
-        
-        for idx in sorted_indices:
-            anno = annotations[idx]
-            tree_idx = anno['meta']['part_tree_index']
-            
-            # Find direct parent
-            if anno['meta']['parent']:
-                for j, other in enumerate(annotations):
-                    if other['meta']['part_tree_index'] == anno['meta']['parent']:
-                        anno['meta']['parent_id'] = j
-                        anno['meta']['relationship'] = 'child'
-                        other['meta']['relationship'] = 'parent'
-                        break
-            
-            # Adjust positions for all ancestors
-            if anno['meta']['parent']:
-                current = anno['meta']['parent']
-                while current:
-                    # Find the parent annotation
-                    parent_idx = next(
-                        (i for i, a in enumerate(annotations) if a['meta']['part_tree_index'] == current),
-                        None
-                    )
-                    if parent_idx is not None:
-                        parent = annotations[parent_idx]
-                        # Update parent's end position to cover this descendant
-                        parent['end_position'] = max(
-                            parent['end_position'],
-                            anno['end_position']
-                        )
-                        # Move up to grandparent
-                        current = parent['meta']['parent']
-                    else:
-                        break
+                # Parents are marked while their children are processed, so their
+                # relationship key comes before their own parent_id
+                if has_children[i]:
+                    meta['relationship'] = 'parent'
+                if parent_ids[i] is not None:
+                    meta['parent_id'] = parent_ids[i]
+                    meta['relationship'] = 'child'
+                annotation_dicts.append({
+                    "annotation_type": "header",
+                    "start_position": start_positions[i],
+                    "end_position": end_positions[i],
+                    "label": "section_header",
+                    "name": part['label'],
+                    "meta": meta
+                })
         
         # Create content string
-        max_pos = max(a['end_position'] for a in annotations)
-        content = "_" * max_pos if not content else content + "_" * (max_pos - len(content))
-        
-        # Sort annotations by tree index
-        annotations.sort(key=lambda x: [int(i) for i in x['meta']['part_tree_index'].split('.')])
+        max_pos = max(end_positions)
+        text: Dict[str, Any] = {"title": title}
+        if virtual_content:
+            text["content"] = content
+            text["content_length"] = max(max_pos, len(content))
+        else:
+            text["content"] = "_" * max_pos if not content else content + "_" * (max_pos - len(content))
+        text["language"] = language
+        text["source"] = "Buddhist Digital Resource Center"
         
         return {
-            "text": {
-                "title": title,
-                "content": content,
-                "language": language,
-                "source": "Buddhist Digital Resource Center"
-            },
+            "text": text,
             "annotations": annotations
         }
     # Convert to annotation format
@@ -154,11 +231,13 @@ class TextPartProcessor:
         Returns:
             Dictionary with filtered annotations containing required fields and meta
         """
-        filtered_output = {
+        return {
             "text": output_data["text"],
-            "annotations": []
+            "annotations": list(self._iter_filtered_annotations(output_data["annotations"]))
         }
-        
+
+    def _iter_filtered_annotations(self, annotations: List[Any]):
+        """Yield the filtered form of each annotation, see _filter_annotations."""
         required_fields = {
             "annotation_type",
             "start_position",
@@ -168,87 +247,406 @@ class TextPartProcessor:
             "meta"  # Keep meta field to preserve additional data
         }
         
-        for annotation in output_data["annotations"]:
-            filtered_annotation = {k: v for k, v in annotation.items() if k in required_fields}
-            filtered_output["annotations"].append(filtered_annotation)
-        
-        return filtered_output
+        for annotation in annotations:
+            if isinstance(annotation, Annotation):
+                # compact records only carry the required fields
+                yield annotation
+                continue
+            yield {k: v for k, v in annotation.items() if k in required_fields}
+
+    def _manifest_file(self, outline_id: str) -> Path:
+        return self.cache_dir / f"{outline_id}_annotations.meta.json"
 
-    def process_outline(self, outline_id: str, output_dir: Optional[Path] = None) -> Dict[str, Any]:
+    def _is_up_to_date(self, outline_id: str, trig_hash: str, options: Dict[str, Any]) -> bool:
+        """Check the manifest of a previous run against the fetched TriG."""
+        try:
+            with open(self._manifest_file(outline_id), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (
+            manifest.get("trig_sha256") == trig_hash
+            and manifest.get("processing_version") == PROCESSING_VERSION
+            and manifest.get("options") == options
+            and (self.cache_dir / f"{outline_id}_annotations_full.json").exists()
+            and (self.cache_dir / f"{outline_id}_annotations.json").exists()
+        )
+
+    def _write_manifest(self, outline_id: str, trig_hash: str, options: Dict[str, Any]) -> None:
+        # Written last and atomically: a run interrupted while writing the
+        # cache files leaves the previous manifest, which no longer matches.
+        manifest_file = self._manifest_file(outline_id)
+        tmp_file = unique_tmp_path(manifest_file)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "outline_id": outline_id,
+                "trig_sha256": trig_hash,
+                "processing_version": PROCESSING_VERSION,
+                "options": options,
+            }, f, indent=4)
+        os.replace(tmp_file, manifest_file)
+
+    def process_outline(self, outline_id: str, output_dir: Optional[Path] = None,
+                        compact: bool = False, force: bool = False,
+                        indent: Optional[int] = 4,
+                        virtual_content: bool = False,
+                        page_index: Optional[VolumePageIndex] = None) -> Dict[str, Any]:
         """
         Process an outline ID to extract text parts and convert to annotation format
         
+        The SHA-256 of the fetched TriG and PROCESSING_VERSION are recorded in
+        cache/{outline_id}_annotations.meta.json. When both match on a later run,
+        extraction and conversion are skipped and the cached output is returned.
+        
         Args:
             outline_id: BDRC outline ID
             output_dir: Optional directory to save output JSON
+            compact: Keep text parts and annotations as compact records (see
+                search_bdrc.text_parts) to reduce memory on large outlines. The JSON
+                files are the same; the returned annotations are Annotation records.
+            force: Process the outline even if it has not changed since the last run
+            indent: JSON indentation of the written files, None writes them compact
+            virtual_content: Store the length of the placeholder content instead of
+                the underscores themselves, see materialize_content
+            page_index: Page offsets of the outline's etext (see
+                search_bdrc.page_index), to place parts at their real positions
             
         Returns:
             Dictionary containing text and annotations
         """
+        output, _ = self._process_outline(
+            outline_id, output_dir, compact=compact, force=force, indent=indent,
+            virtual_content=virtual_content, page_index=page_index,
+        )
+        return output
+
+    def write_outline(self, outline_id: str, output_dir: Optional[Path] = None,
+                      **options) -> Tuple[Path, bool]:
+        """
+        Process an outline for its files only, without loading its output
+        
+        Unlike process_outline, the output of an unchanged outline is not read
+        back from the cache, which keeps batches of large outlines cheap.
+        
+        Args:
+            outline_id: BDRC outline ID
+            output_dir: Optional directory to save output JSON
+            **options: Passed to process_outline (compact, force, indent,
+                virtual_content, page_index)
+            
+        Returns:
+            (output_path, unchanged): the written JSON file, in output_dir or the
+            cache, and whether the outline was unchanged since the last run
+        """
+        return self._write_outline(outline_id, output_dir, **options)
+
+    def _write_outline(self, outline_id: str, output_dir: Optional[Path] = None,
+                       executor: Optional[Executor] = None, **options) -> Tuple[Path, bool]:
+        """write_outline, running the parse, extract and convert steps on `executor` if given."""
+        _, unchanged = self._process_outline(
+            outline_id, output_dir, load_cached=False, executor=executor, **options
+        )
+        return self._outline_output_file(outline_id, output_dir), unchanged
+
+    def _process_outline(self, outline_id: str, output_dir: Optional[Path] = None,
+                         compact: bool = False, force: bool = False,
+                         indent: Optional[int] = 4, virtual_content: bool = False,
+                         page_index: Optional[VolumePageIndex] = None,
+                         load_cached: bool = True, executor: Optional[Executor] = None):
+        """process_outline, also telling whether the outline was unchanged.
+        
+        The TriG is fetched and checked against the cache here. With an executor,
+        the CPU-bound parse, extract and convert steps of a changed outline run on
+        it instead (see _convert_outline_in_worker), and its output is not returned.
+        
+        Returns:
+            (output, unchanged). With load_cached unset, the output of an unchanged
+            outline is not read back from the cache and None is returned for it.
+        """
+        options = self._manifest_options(indent, virtual_content, page_index)
+        metrics = self.metrics
         try:
 
             # Get outline graph
             logger.info(f"Fetching graph for outline {outline_id}...")
-            graph = self.scraper.get_outline_graph(outline_id)
-            if not graph:
+            data = self.scraper.fetch_outline_trig(outline_id)
+            if not data:
                 raise ValueError(f"Could not fetch graph for outline {outline_id}")
+            trig_hash = hashlib.sha256(data.encode('utf-8')).hexdigest()
 
-            logger.info(f"Got graph with {len(list(graph))} triples")
-
-            # Extract text parts
-            logger.info("Extracting text parts...")
-            text_parts = self.scraper.get_ordered_text_parts(graph)
-            logger.info(f"Found {len(text_parts)} text parts")
-
-            title = self.scraper.get_page_title(graph)
-
-            output = self._convert_to_annotation_format(text_parts, title)
-            output_format_annotations = self._filter_annotations(output)
-
-            # Save full version to cache directory
             cache_file = self.cache_dir / f"{outline_id}_annotations_full.json"
-            logger.info(f"Saving full version to cache: {cache_file}...")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(output, f, ensure_ascii=False, indent=4)
-
-            # Save filtered version to cache
             filtered_cache_file = self.cache_dir / f"{outline_id}_annotations.json"
-            logger.info(f"Saving filtered version to cache: {filtered_cache_file}...")
-            with open(filtered_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(output_format_annotations, f, ensure_ascii=False, indent=4)
-
-            # Save to output directory if specified
-            if output_dir:
-                output_dir = Path(output_dir)
-                output_dir.mkdir(exist_ok=True)
-                
-                # Save filtered version
-                filtered_output_file = output_dir / f"{outline_id}.json"
-                logger.info(f"Saving filtered version to {filtered_output_file}...")
-                with open(filtered_output_file, "w", encoding="utf-8") as f:
-                    json.dump(output_format_annotations, f, ensure_ascii=False, indent=4)
-
-            return output
+
+            if not force and self._is_up_to_date(outline_id, trig_hash, options):
+                logger.info(f"Outline {outline_id} is unchanged, using {cache_file}")
+                if output_dir:
+                    output_dir = Path(output_dir)
+                    output_dir.mkdir(exist_ok=True)
+                    filtered_output_file = output_dir / f"{outline_id}.json"
+                    # The cache may have been refreshed by a run without output_dir
+                    if not (filtered_output_file.exists()
+                            and filecmp.cmp(filtered_cache_file, filtered_output_file, shallow=False)):
+                        tmp_file = unique_tmp_path(filtered_output_file)
+                        shutil.copyfile(filtered_cache_file, tmp_file)
+                        os.replace(tmp_file, filtered_output_file)
+                metrics.count("outlines", status="unchanged")
+                if not load_cached:
+                    return None, True
+                with open(cache_file, encoding='utf-8') as f:
+                    return json.load(f), True
+
+            convert_options: Dict[str, Any] = {
+                "compact": compact, "indent": indent, "virtual_content": virtual_content, "page_index": page_index,
+            }
+            if executor is not None:
+                executor.submit(
+                    _convert_outline_in_worker, self.cache_dir, outline_id, data, trig_hash, output_dir,
+                    convert_options,
+                ).result()
+                output = None
+            else:
+                output = self._convert_outline(outline_id, data, trig_hash, output_dir, **convert_options)
+            metrics.count("outlines", status="ok")
+            return output, False
 
         except Exception as e:
+            metrics.count("outlines", status="error")
             logger.exception(f"Error processing outline {outline_id}: {e}")
             raise
 
+    @staticmethod
+    def _manifest_options(indent: Optional[int], virtual_content: bool,
+                          page_index: Optional[VolumePageIndex]) -> Dict[str, Any]:
+        """Options changing the written files, recorded in the manifest."""
+        return {
+            "indent": indent,
+            "virtual_content": virtual_content,
+            "page_index": page_index.fingerprint() if page_index is not None else None,
+        }
+
+    def _convert_outline(self, outline_id: str, data: str, trig_hash: str,
+                         output_dir: Optional[Path] = None, compact: bool = False,
+                         indent: Optional[int] = 4, virtual_content: bool = False,
+                         page_index: Optional[VolumePageIndex] = None) -> Dict[str, Any]:
+        """Parse a fetched outline, convert it and write its files and manifest."""
+        metrics = self.metrics
+        cache_file = self.cache_dir / f"{outline_id}_annotations_full.json"
+        filtered_cache_file = self.cache_dir / f"{outline_id}_annotations.json"
+        with metrics.stage("parse", format="trig"):
+            graph = parse_outline_graph(data)
+        triples = len(graph)
+        metrics.count("triples", triples, format="trig")
+        logger.info(f"Got graph with {triples} triples")
+
+        # Extract text parts
+        logger.info("Extracting text parts...")
+        text_parts = self.scraper.get_ordered_text_parts(graph, compact=compact)
+        logger.info(f"Found {len(text_parts)} text parts")
+
+        title = self.scraper.get_page_title(graph)
+
+        with metrics.stage("convert_annotations"):
+            output = self._convert_to_annotation_format(
+                text_parts, title, compact=compact, virtual_content=virtual_content,
+                page_index=page_index,
+            )
+        metrics.count("annotations", len(output["annotations"]))
+
+        # Annotations built above only carry the fields kept by the filter, so
+        # the full and filtered versions are the same document: serialize the
+        # filtered one once, streaming annotations, and write it everywhere.
+        output_format_annotations = {
+            "text": output["text"],
+            "annotations": self._iter_filtered_annotations(output["annotations"]),
+        }
+        destinations = [cache_file, filtered_cache_file]
+        if output_dir:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(exist_ok=True)
+            destinations.append(output_dir / f"{outline_id}.json")
+        logger.info(f"Saving annotations to {', '.join(str(path) for path in destinations)}...")
+        with metrics.stage("write_json"):
+            write_json(output_format_annotations, destinations, indent=indent, default=json_default)
+        metrics.count("json_files", len(destinations))
+
+        self._write_manifest(outline_id, trig_hash, self._manifest_options(indent, virtual_content, page_index))
+        return output
+
+    @staticmethod
+    def _read_batch_manifest(manifest: Path) -> Set[str]:
+        """IDs whose last record in a batch manifest says they were processed."""
+        done: Set[str] = set()
+        if not manifest.exists():
+            return done
+        with open(manifest, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a line cut short by a crash
+                    continue
+                if record.get("status") in BATCH_DONE_STATUSES:
+                    done.add(record["id"])
+                else:
+                    done.discard(record["id"])
+        return done
+
+    def _run_batch(self, ids: Iterable[str], job: Callable[[str, Executor], Dict[str, Any]], workers: int,
+                   manifest: Union[str, Path], resume: bool, desc: str) -> List[Dict[str, Any]]:
+        """
+        Run `job` on every ID from a thread pool, recording one manifest line per ID.
+
+        Jobs get the batch's process pool (see _outline_pool) for their CPU-bound
+        steps, the threads only wait on the network and on the pool.
+        """
+        manifest = Path(manifest)
+        done = self._read_batch_manifest(manifest) if resume else set()
+        ids = [item_id for item_id in dict.fromkeys(ids) if item_id not in done]
+        if done:
+            logger.info(f"Resuming from {manifest}: {len(done)} already processed")
+
+        def run(item_id: str) -> Dict[str, Any]:
+            record: Dict[str, Any] = {"id": item_id}
+            start = time.perf_counter()
+            try:
+                record.update(job(item_id, executor))
+            except Exception as e:
+                logger.error(f"Failed to process {item_id}: {e}")
+                record["status"] = "error"
+                record["error"] = f"{type(e).__name__}: {e}"
+            seconds = time.perf_counter() - start
+            self.metrics.observe("batch_item", seconds, status=record["status"])
+            record["seconds"] = round(seconds, 3)
+            return record
+
+        records = []
+        counts: Dict[str, int] = {}
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest, 'a', encoding='utf-8') as f, tqdm(total=len(ids), desc=desc) as progress, \
+                self._outline_pool(workers) as executor:
+            for _, record in BdrcScraper.map_concurrently(run, ids, max_workers=workers):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                records.append(record)
+                counts[record["status"]] = counts.get(record["status"], 0) + 1
+                progress.set_postfix(counts, refresh=False)
+                progress.update()
+        return records
+
+    @contextmanager
+    def _outline_pool(self, workers: int):
+        """
+        Process pool for the parse, extract and convert steps of a batch.
+
+        These steps are pure-Python CPU work holding the GIL, so the batch threads
+        only fetch and hand the TriG over. Workers are spawned, since forking
+        while fetch threads hold locks can deadlock the child.
+        """
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            yield executor
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _outline_output_file(self, outline_id: str, output_dir: Optional[Path]) -> Path:
+        if output_dir:
+            return Path(output_dir) / f"{outline_id}.json"
+        return self.cache_dir / f"{outline_id}_annotations.json"
+
+    def process_outlines(self, outline_ids: Iterable[str], output_dir: Optional[Path] = None,
+                         workers: int = 4, manifest: Optional[Union[str, Path]] = None,
+                         resume: bool = False, **options) -> List[Dict[str, Any]]:
+        """
+        Process many outlines concurrently
+        
+        A failing outline is recorded and does not stop the others. Each finished
+        outline is appended to a JSONL manifest as a record with its id, status
+        ("ok", "unchanged" or "error"), seconds, output path and, for failures,
+        the error.
+        
+        Args:
+            outline_ids: BDRC outline IDs
+            output_dir: Optional directory to save output JSON
+            workers: Number of outlines processed at once. Outlines are fetched
+                on threads and parsed, converted and written in as many spawned
+                processes; the stage timings of those steps stay in the workers.
+            manifest: JSONL manifest path, defaults to cache/batch_outlines.jsonl
+            resume: Skip outlines the manifest already records as processed, to
+                continue a run that crashed. Off by default: a later run must
+                fetch every outline again to pick up changes upstream.
+            **options: Passed to process_outline (compact, force, indent, virtual_content)
+            
+        Returns:
+            Manifest records of the outlines processed in this run
+        """
+        def job(outline_id: str, executor: Executor) -> Dict[str, Any]:
+            output, unchanged = self._write_outline(outline_id, output_dir, executor, **options)
+            return {
+                "status": "unchanged" if unchanged else "ok",
+                "output": str(output),
+            }
+
+        manifest = manifest or self.cache_dir / "batch_outlines.jsonl"
+        return self._run_batch(outline_ids, job, workers, manifest, resume, desc="Outlines")
+
+    def process_instances(self, instance_ids: Iterable[str], output_dir: Optional[Path] = None,
+                          workers: int = 4, manifest: Optional[Union[str, Path]] = None,
+                          resume: bool = False, **options) -> List[Dict[str, Any]]:
+        """
+        Process the outlines of many instances concurrently
+        
+        Outlines are found with get_outline_of_instance. Manifest records are per
+        instance, with the outline_ids and outputs of the instance; an instance
+        fails if any of its outlines does. The manifest defaults to
+        cache/batch_instances.jsonl. See process_outlines for the arguments.
+        """
+        def job(instance_id: str, executor: Executor) -> Dict[str, Any]:
+            outline_ids = self.scraper.get_outline_of_instance(instance_id, save_metadata=False)
+            outputs = []
+            unchanged = []
+            for outline_id in outline_ids:
+                output, outline_unchanged = self._write_outline(outline_id, output_dir, executor, **options)
+                outputs.append(str(output))
+                unchanged.append(outline_unchanged)
+            return {
+                "status": "unchanged" if unchanged and all(unchanged) else "ok",
+                "outline_ids": outline_ids,
+                "outputs": outputs,
+            }
+
+        manifest = manifest or self.cache_dir / "batch_instances.jsonl"
+        return self._run_batch(instance_ids, job, workers, manifest, resume, desc="Instances")
+
+
+# Processor used by _convert_outline_in_worker in batch pool workers, created on first use.
+_worker_processor: Optional[TextPartProcessor] = None
+
+
+def _convert_outline_in_worker(cache_dir: Path, outline_id: str, data: str, trig_hash: str,
+                               output_dir: Optional[Path], options: Dict[str, Any]) -> None:
+    """TextPartProcessor._convert_outline in a pool worker, writing to the batch's cache."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = TextPartProcessor(BdrcScraper())
+    _worker_processor.cache_dir = cache_dir
+    _worker_processor._convert_outline(outline_id, data, trig_hash, output_dir, **options)
+
+
 def main():
+    configure_logging()
     # Initialize scraper and processor
     scraper = BdrcScraper()
     processor = TextPartProcessor(scraper)
 
-    # Process outline
-    outline_id = "O2DB80610"
-    try:
-        output_dir = Path("outputs")  # or any directory you want
-        output = processor.process_outline(outline_id, output_dir=output_dir)
-        logger.info(f"Successfully processed outline {outline_id}")
-        return output
-    except Exception as e:
-        logger.error(f"Failed to process outline {outline_id}: {e}")
-        return None
+    # Process the outlines given on the command line
+    outline_ids = sys.argv[1:] or ["O2DB80610"]
+    output_dir = Path("outputs")  # or any directory you want
+    records = processor.process_outlines(outline_ids, output_dir=output_dir)
+    failed = [record["id"] for record in records if record["status"] == "error"]
+    logger.info(f"Processed {len(records) - len(failed)} outlines, {len(failed)} failed")
+    if failed:
+        logger.error(f"Failed outlines: {', '.join(failed)}")
+    return records
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
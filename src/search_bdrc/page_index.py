@@ -0,0 +1,152 @@
+"""
+Page to character offset index of etext volumes.
+
+Outline parts locate their text by volume and page (contentLocationVolume,
+contentLocationPage, contentLocationEndPage...). A PageIndex records where each
+page starts in the text of one volume, found through a page marker regular
+expression, and VolumePageIndex joins the volumes of an etext into one
+character space, the way their texts are concatenated. Looking up the span of
+a part is then two binary searches, so placing tens of thousands of parts costs
+O(n log pages).
+
+The marker pattern depends on how the etext marks pages; its first group must
+capture the page number.
+"""
+import hashlib
+import mmap
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+# e.g. "[12]" or "[12a]"
+PAGE_MARKER = r"\[(\d+)[ab]?\]"
+
+_LEAD_BYTES = bytes(b for b in range(256) if b & 0xC0 != 0x80)
+
+
+class PageIndex:
+    """Character offset at which each page of one volume starts."""
+
+    def __init__(self, pages: Iterable[int], offsets: Iterable[int], length: int):
+        # Keep the first marker of each page, in page order
+        first: dict[int, int] = {}
+        for page, offset in zip(pages, offsets):
+            first.setdefault(page, offset)
+        self.pages = array('q', sorted(first))
+        self.offsets = array('q', (first[page] for page in self.pages))
+        self.length = length
+
+    @classmethod
+    def from_text(cls, text: str, pattern: str = PAGE_MARKER) -> "PageIndex":
+        pages, offsets = [], []
+        for match in re.finditer(pattern, text):
+            pages.append(int(match.group(1)))
+            offsets.append(match.start())
+        return cls(pages, offsets, len(text))
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], pattern: str = PAGE_MARKER) -> "PageIndex":
+        """
+        Index a UTF-8 file without decoding it.
+
+        The pattern is matched on the mapped bytes, and byte offsets of the
+        markers are turned into character offsets by counting UTF-8 lead bytes
+        between them.
+        """
+        with open(path, 'rb') as f:
+            if not f.seek(0, 2):
+                return cls([], [], 0)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                regex = re.compile(pattern.encode('utf-8'))
+                pages, offsets = [], []
+                chars = 0
+                pos = 0
+                for match in regex.finditer(data):
+                    block = data[pos:match.start()]
+                    chars += len(block) - len(block.translate(None, _LEAD_BYTES))
+                    pos = match.start()
+                    pages.append(int(match.group(1)))
+                    offsets.append(chars)
+                block = data[pos:]
+                chars += len(block) - len(block.translate(None, _LEAD_BYTES))
+        return cls(pages, offsets, chars)
+
+    def page_start(self, page: int) -> int:
+        """Offset of the first page at or after `page`, or the volume end."""
+        i = bisect_left(self.pages, page)
+        return self.offsets[i] if i < len(self.pages) else self.length
+
+    def page_end(self, page: int) -> int:
+        """Offset where the pages after `page` start, or the volume end."""
+        i = bisect_right(self.pages, page)
+        return self.offsets[i] if i < len(self.pages) else self.length
+
+
+class VolumePageIndex:
+    """
+    Page indexes of the volumes of an etext, in one character space.
+
+    Args:
+        volumes: PageIndex of each volume by volume number, placed in volume
+            order one after the other
+        separator_length: Characters between two volumes in the concatenated text
+    """
+
+    def __init__(self, volumes: dict[int, PageIndex], separator_length: int = 0):
+        self.volumes = dict(sorted(volumes.items()))
+        self.bases = {}
+        base = 0
+        for volume, index in self.volumes.items():
+            self.bases[volume] = base
+            base += index.length + separator_length
+        self.length = max(base - separator_length, 0)
+
+    @classmethod
+    def from_files(
+        cls, paths: Iterable[Union[str, Path]], pattern: str = PAGE_MARKER, separator_length: int = 0
+    ) -> "VolumePageIndex":
+        """Index volume files, numbering them from 1 in the given order."""
+        return cls(
+            {number: PageIndex.from_file(path, pattern) for number, path in enumerate(paths, 1)},
+            separator_length,
+        )
+
+    def fingerprint(self) -> str:
+        """Digest of the index, identifying the positions it produces."""
+        digest = hashlib.sha256()
+        for volume, index in self.volumes.items():
+            digest.update(f"{volume}:{self.bases[volume]}:{index.length}:".encode())
+            digest.update(index.pages.tobytes())
+            digest.update(index.offsets.tobytes())
+        return digest.hexdigest()
+
+    def span(self, location: Optional[dict]) -> Optional[tuple[int, int]]:
+        """
+        Character span of a part's content location.
+
+        Uses the volume, page, endvolume and endpage keys of a location as
+        extracted by get_ordered_text_parts. Returns None if the location has
+        no volume and page, or its volume is not indexed.
+        """
+        if not location:
+            return None
+        volume = location.get('volume')
+        page = location.get('page')
+        if not isinstance(volume, int) or not isinstance(page, int) or volume not in self.volumes:
+            return None
+        end_volume = location.get('endvolume')
+        if not isinstance(end_volume, int) or end_volume not in self.volumes:
+            end_volume = volume
+        end_page = location.get('endpage')
+        if not isinstance(end_page, int):
+            end_page = page if end_volume == volume else None
+
+        start = self.bases[volume] + self.volumes[volume].page_start(page)
+        end_index = self.volumes[end_volume]
+        if end_page is None:
+            end = self.bases[end_volume] + end_index.length
+        else:
+            end = self.bases[end_volume] + end_index.page_end(end_page)
+        return start, max(start, end)
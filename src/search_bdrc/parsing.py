@@ -0,0 +1,81 @@
+"""
+Parsing of the raw documents downloaded from BDRC.
+
+These are plain module-level functions so they can also run in a process pool
+(see search_bdrc.pipeline), where they take raw Turtle or TriG text and return
+small picklable results instead of rdflib graphs.
+"""
+from rdflib import ConjunctiveGraph, Graph, Namespace
+
+from search_bdrc.config import get_logger
+
+logger = get_logger(__name__)
+
+BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+
+# Scraper used by extract_outline in pool workers, created on first use.
+_scraper = None
+
+
+def parse_turtle(text: str) -> Graph:
+    g = Graph()
+    g.parse(data=text, format="turtle")
+    return g
+
+
+def parse_outline_graph(text: str) -> Graph:
+    """
+    Parse an outline graph downloaded as TriG, falling back to Turtle.
+    """
+    # Create and configure graph
+    g = ConjunctiveGraph()
+    g.bind('bdr', 'http://purl.bdrc.io/resource/')
+    g.bind('bdo', 'http://purl.bdrc.io/ontology/core/')
+    g.bind('skos', 'http://www.w3.org/2004/02/skos/core#')
+
+    try:
+        g.parse(data=text, format="trig")
+        return g
+    except Exception as e:
+        logger.warning(f"Failed to parse as trig: {e}, trying turtle format")
+        return parse_turtle(text)
+
+
+def _local_ids(graph: Graph, predicate) -> list[str]:
+    return list(dict.fromkeys(str(obj).split("/")[-1] for obj in graph.objects(None, predicate)))
+
+
+def extract_instance_fields(text: str) -> dict:
+    """
+    Parse instance or work metadata in Turtle and pull out the linked IDs.
+
+    Returns:
+        Dictionary with the `works` (instanceOf), `instances` (workHasInstance)
+        and `outlines` (hasOutline) IDs found in the document
+    """
+    graph = parse_turtle(text)
+    return {
+        "works": _local_ids(graph, BDO.instanceOf),
+        "instances": _local_ids(graph, BDO.workHasInstance),
+        "outlines": _local_ids(graph, BDO.hasOutline),
+    }
+
+
+def extract_outline(text: str) -> dict:
+    """
+    Parse an outline graph in TriG and extract its title and ordered text parts.
+
+    Returns:
+        Dictionary with the outline `title` and its `text_parts` as returned by
+        BdrcScraper.get_ordered_text_parts
+    """
+    global _scraper
+    if _scraper is None:
+        from search_bdrc import BdrcScraper
+
+        _scraper = BdrcScraper()
+    graph = parse_outline_graph(text)
+    return {
+        "title": _scraper.get_page_title(graph),
+        "text_parts": _scraper.get_ordered_text_parts(graph),
+    }
@@ -0,0 +1,136 @@
+"""
+Two-stage fetch/parse pipeline for batches of BDRC documents.
+
+Downloading is I/O bound and runs on threads. Parsing Turtle and TriG with rdflib
+is pure-Python CPU work that holds the GIL, so it runs in a process pool instead.
+A bounded queue sits between the two stages and the number of documents being
+parsed is capped too: when parsing falls behind, the download threads block
+rather than piling up raw documents in memory.
+
+Parse workers are started with the "spawn" method, since forking a process
+while download threads hold locks can deadlock the child.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from search_bdrc.config import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+
+def fetch_and_parse(
+    ids: Iterable[str],
+    fetch: Callable[[str], Optional[str]],
+    parse: Callable[[str], Any],
+    fetch_workers: int = 8,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 32,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Download documents on threads and parse them in a process pool.
+
+    Args:
+        ids: IDs to process, consumed lazily
+        fetch: Called on a thread with an ID, returns the raw document or None
+        parse: Module-level function called in a worker process with the raw
+            document; its return value must be picklable
+        fetch_workers: Number of download threads
+        parse_workers: Number of parse processes, defaults to the CPU count
+        queue_size: Maximum number of downloaded documents waiting to be parsed,
+            and of documents being parsed at once
+
+    Yields:
+        (id, result) pairs in completion order. The result is None when the
+        download returned nothing, or the exception raised while fetching or
+        parsing that ID.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    ids = iter(ids)
+    ids_lock = threading.Lock()
+    raw: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                raw.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetcher():
+        while not stop.is_set():
+            with ids_lock:
+                item_id = next(ids, None)
+            if item_id is None:
+                break
+            item: tuple[str, Optional[str], Optional[Exception]]
+            try:
+                item = (item_id, fetch(item_id), None)
+            except Exception as e:
+                item = (item_id, None, e)
+            if not put(item):
+                return
+        put(_DONE)
+
+    threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(fetch_workers)]
+    for thread in threads:
+        thread.start()
+
+    running_fetchers = fetch_workers
+    parsing: dict[Future, str] = {}
+    executor = ProcessPoolExecutor(
+        max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        while running_fetchers or parsing:
+            # Move downloaded documents into the parse stage while it has room,
+            # only blocking on the queue when there is nothing else to wait for.
+            while running_fetchers and len(parsing) < queue_size:
+                try:
+                    item = raw.get(block=not parsing)
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    running_fetchers -= 1
+                    continue
+                item_id, text, error = item
+                if error is not None:
+                    logger.error(f"Failed to fetch {item_id}: {error}")
+                    yield item_id, error
+                elif text is None:
+                    yield item_id, None
+                else:
+                    parsing[executor.submit(parse, text)] = item_id
+
+            if not parsing:
+                continue
+            # Poll for new downloads while parse slots are free.
+            timeout = 0.05 if running_fetchers and len(parsing) < queue_size else None
+            done, _ = wait(parsing, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                item_id = parsing.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to parse {item_id}: {e}")
+                    result = e
+                yield item_id, result
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        # unblock fetchers waiting on a full queue
+        while True:
+            try:
+                raw.get_nowait()
+            except queue.Empty:
+                break
+        for thread in threads:
+            thread.join(timeout=1)
@@ -0,0 +1,291 @@
+"""
+Adaptive per-host rate limiting shared by threads and processes.
+
+Each host gets a token bucket refilled at `rate` requests per second, plus a
+window of at most `concurrency` requests in flight. Both adapt AIMD-style, like
+TCP congestion control:
+
+- every successful request raises the rate by about `rate_step` per second of
+  traffic and widens the window by about one request per window of traffic.
+- a throttling answer (429, 5xx, a dropped connection) halves both, at most once
+  per `cooldown` seconds, and empties the bucket. A Retry-After header also
+  holds all requests to the host until the time it gives.
+- a request given up by the client (a cancelled task, Ctrl-C) only frees its
+  slot, since it says nothing about the server.
+
+Throughput therefore climbs until the server starts pushing back and then
+oscillates just under the most it accepts.
+
+The state lives in shared memory guarded by a multiprocessing lock. A
+RateLimiter created in the parent process can be handed to pool workers
+(e.g. as an initializer argument), and all of them draw from the same buckets.
+Its primitives come from the spawn context, which can be handed to both
+forked and spawned workers.
+
+http_adapter.RateLimitedAdapter runs the requests of a session through a
+limiter (see http_session.create_session) and browser_worker_pool takes one for
+search page loads, so both paths slow down together when a host pushes back.
+"""
+import multiprocessing
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+from search_bdrc.config import get_logger
+
+logger = get_logger(__name__)
+
+# Answers telling the client to slow down
+THROTTLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Fields of a host's state in the shared array
+_TOKENS, _UPDATED, _RATE, _WINDOW, _IN_FLIGHT, _BLOCKED_UNTIL, _LAST_DECREASE = range(7)
+_FIELDS = 7
+_HOST_BYTES = 128
+
+
+class ThrottledError(Exception):
+    """A server answered a page load with a throttling status."""
+
+    def __init__(self, url: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"{url} answered {status}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+def failure_outcome(error: BaseException) -> str:
+    """
+    RateLimiter.release outcome of a request that raised `error`.
+
+    Exceptions count as failed requests, except ThrottledError. Other
+    BaseExceptions, such as asyncio.CancelledError or KeyboardInterrupt, mean
+    the client gave the request up.
+    """
+    if isinstance(error, ThrottledError):
+        return "throttled"
+    if isinstance(error, Exception):
+        return "error"
+    return "cancelled"
+
+
+class RateLimiter:
+    """
+    AIMD token buckets, one per host, shared across threads and processes.
+
+    Args:
+        rate: Starting requests per second of each host
+        min_rate: Lowest rate backoff goes down to
+        max_rate: Highest rate reached by additive increase
+        rate_step: Rate added per second of successful traffic
+        burst: Tokens a bucket holds, i.e. requests allowed back to back
+        concurrency: Starting number of requests in flight per host
+        max_concurrency: Largest window reached by additive increase
+        decrease: Factor applied to rate and window on throttling
+        cooldown: Minimum seconds between two decreases, so that a burst of
+            failures from one overload counts once
+        max_hosts: Number of hosts that can be tracked
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        min_rate: float = 0.2,
+        max_rate: float = 50.0,
+        rate_step: float = 1.0,
+        burst: float = 5.0,
+        concurrency: float = 4.0,
+        max_concurrency: float = 32.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        max_hosts: int = 16,
+    ):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.burst = burst
+        self.initial_concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.max_hosts = max_hosts
+        context = multiprocessing.get_context("spawn")
+        self._lock = context.Lock()
+        self._state = context.RawArray('d', max_hosts * _FIELDS)
+        self._names = context.RawArray('c', max_hosts * _HOST_BYTES)
+        self._host_count = context.RawValue('i', 0)
+        # host -> slot, filled per process from the shared names
+        self._slots: dict[str, int] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_slots"] = {}
+        return state
+
+    def _slot(self, host: str) -> int:
+        """Index of a host's state, registering the host on first use. Holds the lock."""
+        slot = self._slots.get(host)
+        if slot is not None:
+            return slot
+        name = host.encode("utf-8")[:_HOST_BYTES]
+        for i in range(self._host_count.value):
+            if self._names[i * _HOST_BYTES:(i + 1) * _HOST_BYTES].rstrip(b"\0") == name:
+                self._slots[host] = i
+                return i
+        i = self._host_count.value
+        if i >= self.max_hosts:
+            raise RuntimeError(f"RateLimiter tracks at most {self.max_hosts} hosts")
+        self._names[i * _HOST_BYTES:i * _HOST_BYTES + len(name)] = name
+        base = i * _FIELDS
+        self._state[base + _TOKENS] = self.burst
+        self._state[base + _UPDATED] = time.monotonic()
+        self._state[base + _RATE] = self.initial_rate
+        self._state[base + _WINDOW] = self.initial_concurrency
+        self._state[base + _IN_FLIGHT] = 0
+        self._state[base + _BLOCKED_UNTIL] = 0
+        self._state[base + _LAST_DECREASE] = 0
+        self._host_count.value = i + 1
+        self._slots[host] = i
+        return i
+
+    def _try_acquire(self, host: str) -> float:
+        """Take a token and a window slot if both are free; else return the seconds to wait."""
+        with self._lock:
+            base = self._slot(host) * _FIELDS
+            state = self._state
+            now = time.monotonic()
+            rate = state[base + _RATE]
+            state[base + _TOKENS] = min(self.burst, state[base + _TOKENS] + (now - state[base + _UPDATED]) * rate)
+            state[base + _UPDATED] = now
+            if now < state[base + _BLOCKED_UNTIL]:
+                return state[base + _BLOCKED_UNTIL] - now
+            if state[base + _TOKENS] < 1:
+                return (1 - state[base + _TOKENS]) / rate
+            if state[base + _IN_FLIGHT] >= max(1, int(state[base + _WINDOW])):
+                # wait for a request to finish
+                return 0.01
+            state[base + _TOKENS] -= 1
+            state[base + _IN_FLIGHT] += 1
+            return 0.0
+
+    def acquire(self, host: str, timeout: Optional[float] = None) -> None:
+        """
+        Block until a request to `host` may start.
+
+        Every acquire must be followed by a release once the request is over.
+
+        Raises:
+            TimeoutError: if `timeout` seconds pass first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No request slot for {host} within {timeout}s")
+                wait = min(wait, remaining)
+            time.sleep(min(wait, 1.0))
+
+    async def acquire_async(self, host: str) -> None:
+        """acquire for coroutines, waiting with asyncio.sleep instead of blocking the loop."""
+        import asyncio
+
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return
+            await asyncio.sleep(min(wait, 1.0))
+
+    def release(self, host: str, outcome: str = "ok", retry_after: Optional[float] = None) -> None:
+        """
+        End a request started with acquire and adapt to how it went.
+
+        Args:
+            host: Host passed to acquire
+            outcome: "ok" when the server answered normally (including 4xx
+                errors other than 429), "throttled" for a throttling status,
+                "error" for a failed connection or timeout, "cancelled" for a
+                request the client gave up, which leaves rate and window as
+                they are (see failure_outcome)
+            retry_after: Seconds from a Retry-After header
+        """
+        with self._lock:
+            base = self._slot(host) * _FIELDS
+            state = self._state
+            now = time.monotonic()
+            state[base + _IN_FLIGHT] = max(0, state[base + _IN_FLIGHT] - 1)
+            if outcome == "cancelled":
+                return
+            rate = state[base + _RATE]
+            window = state[base + _WINDOW]
+            if outcome == "ok":
+                state[base + _RATE] = min(self.max_rate, rate + self.rate_step / max(rate, 1.0))
+                state[base + _WINDOW] = min(self.max_concurrency, window + 1 / max(window, 1.0))
+                return
+            if retry_after:
+                state[base + _BLOCKED_UNTIL] = max(state[base + _BLOCKED_UNTIL], now + retry_after)
+            state[base + _TOKENS] = 0
+            if now - state[base + _LAST_DECREASE] < self.cooldown:
+                return
+            state[base + _LAST_DECREASE] = now
+            state[base + _RATE] = max(self.min_rate, rate * self.decrease)
+            state[base + _WINDOW] = max(1.0, window * self.decrease)
+        logger.info(
+            f"Backing off {host}: {state[base + _RATE]:.2f} requests/s, "
+            f"{int(state[base + _WINDOW])} at once"
+        )
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[None]:
+        """
+        Hold a request slot for the host of `url` while the block runs.
+
+        A ThrottledError raised in the block counts as throttling, with its
+        Retry-After; any other exception as a failed request. A
+        KeyboardInterrupt or cancellation only frees the slot.
+        """
+        host = host_of(url)
+        self.acquire(host)
+        try:
+            yield
+        except BaseException as e:
+            self.release(host, failure_outcome(e), getattr(e, "retry_after", None))
+            raise
+        self.release(host)
+
+    def state(self, host: str) -> dict:
+        """Current rate, window, requests in flight and hold time of a host."""
+        with self._lock:
+            base = self._slot(host) * _FIELDS
+            state = self._state
+            return {
+                "rate": state[base + _RATE],
+                "concurrency": int(state[base + _WINDOW]),
+                "in_flight": int(state[base + _IN_FLIGHT]),
+                "blocked_for": max(0.0, state[base + _BLOCKED_UNTIL] - time.monotonic()),
+            }
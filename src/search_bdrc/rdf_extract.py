@@ -0,0 +1,393 @@
+"""
+Lightweight extraction of predicate values from Turtle and JSON-LD documents.
+
+Looking up the work of an instance only needs the objects of one predicate, but
+building an rdflib Graph parses, indexes and stores every triple of the document
+first. The functions here tokenize the document in a single pass and stream its
+triples as plain strings, keeping only those whose predicate was asked for.
+
+The Turtle reader covers the syntax BDRC serves (prefixes, base, predicate and
+object lists, blank node property lists, collections, literals with language
+tags or datatypes, numbers and booleans) plus TriG graph blocks. Terms come out
+the way rdflib's str() renders them: IRIs in full and literals as their lexical
+form. Blank nodes are returned as "_:" labels.
+
+Callers that need the whole graph should keep using rdflib.
+"""
+import json
+import re
+from itertools import count
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urljoin
+
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+XSD_NS = "http://www.w3.org/2001/XMLSchema#"
+
+# Prefixes assumed for JSON-LD documents whose @context is a remote URL, as
+# BDRC's are. Terms without a prefix are taken from the core ontology.
+BDRC_PREFIXES = {
+    "bdo": "http://purl.bdrc.io/ontology/core/",
+    "bdr": "http://purl.bdrc.io/resource/",
+    "bda": "http://purl.bdrc.io/admindata/",
+    "bdg": "http://purl.bdrc.io/graph/",
+    "adm": "http://purl.bdrc.io/ontology/admin/",
+    "tmp": "http://purl.bdrc.io/ontology/tmp/",
+    "bf": "http://id.loc.gov/ontologies/bibframe/",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "rdf": RDF_NS,
+    "xsd": XSD_NS,
+}
+BDRC_VOCAB = BDRC_PREFIXES["bdo"]
+
+_TOKEN = re.compile(
+    r"""
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<iri><[^<>"{}|^`\\\s]*>)
+  | (?P<long_string>\"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*''')
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<langtag>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+  | (?P<datatype>\^\^)
+  | (?P<number>[+-]?(?:\d+\.\d*[eE][+-]?\d+|\.?\d+[eE][+-]?\d+|\d*\.\d+|\d+))
+  | (?P<bnode>_:[\w-](?:[\w.-]*[\w-])?)
+  | (?P<pname>(?:[^\W\d_](?:[\w.-]*[\w-])?)?:(?:(?:[\w:%-]|\\.)(?:(?:[\w.:%-]|\\.)*(?:[\w:%-]|\\.))?)?)
+  | (?P<word>[A-Za-z]+)
+  | (?P<punct>[;,.\[\]()]|\{|\})
+    """,
+    re.VERBOSE,
+)
+
+_ESCAPES = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+_ESCAPE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))", re.DOTALL)
+_PN_ESCAPE = re.compile(r"\\(.)")
+_ABSOLUTE_IRI = re.compile(r"[A-Za-z][\w+.-]*:")
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+
+    def replace(match):
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        return _ESCAPES.get(match.group(3), match.group(3))
+
+    return _ESCAPE.sub(replace, value)
+
+
+def _tokens(text: str) -> Iterator[tuple[str, str]]:
+    pos = 0
+    end = len(text)
+    while pos < end:
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            snippet = text[pos : pos + 30]
+            raise ValueError(f"Unexpected Turtle input at offset {pos}: {snippet!r}")
+        pos = match.end()
+        # every alternative of _TOKEN is a named group
+        kind = match.lastgroup
+        if kind and kind != "ws":
+            yield kind, match.group()
+
+
+class _TurtleReader:
+    def __init__(self, text: str):
+        self.tokens = _tokens(text)
+        self.lookahead: Optional[tuple[str, str]] = None
+        self.prefixes: dict[str, str] = {}
+        self.base = ""
+        self.bnode_ids = count()
+
+    def peek(self) -> Optional[tuple[str, str]]:
+        if self.lookahead is None:
+            self.lookahead = next(self.tokens, None)
+        return self.lookahead
+
+    def peek_token(self) -> str:
+        """The next token, which must exist."""
+        lookahead = self.peek()
+        if lookahead is None:
+            raise ValueError("Unexpected end of Turtle input")
+        return lookahead[1]
+
+    def next(self) -> tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise ValueError("Unexpected end of Turtle input")
+        self.lookahead = None
+        return token
+
+    def expect(self, value: str):
+        kind, token = self.next()
+        if token != value:
+            raise ValueError(f"Expected {value!r} in Turtle input, got {token!r}")
+
+    def new_bnode(self) -> str:
+        return f"_:b{next(self.bnode_ids)}"
+
+    def iri(self, kind: str, token: str) -> str:
+        if kind == "iri":
+            value = _unescape(token[1:-1])
+            if self.base and not _ABSOLUTE_IRI.match(value):
+                return urljoin(self.base, value)
+            return value
+        prefix, _, local = token.partition(":")
+        if prefix not in self.prefixes:
+            raise ValueError(f"Undeclared prefix {prefix!r} in Turtle input")
+        return self.prefixes[prefix] + _PN_ESCAPE.sub(r"\1", local)
+
+    def triples(self) -> Iterator[tuple[str, str, str]]:
+        while (lookahead := self.peek()) is not None:
+            kind, token = lookahead
+            if kind == "langtag" and token in ("@prefix", "@base"):
+                self.next()
+                self.directive(token[1:])
+                self.expect(".")
+            elif kind == "word" and token.upper() in ("PREFIX", "BASE"):
+                self.next()
+                self.directive(token.lower())
+            elif kind == "word" and token.upper() == "GRAPH":
+                self.next()
+                self.next()
+                yield from self.graph_block()
+            elif token == "{":
+                yield from self.graph_block()
+            elif token == "}":
+                self.next()
+            else:
+                yield from self.statement()
+
+    def directive(self, name: str):
+        if name == "prefix":
+            _, prefix = self.next()
+            _, iri = self.next()
+            self.prefixes[prefix[:-1]] = self.iri("iri", iri)
+        else:
+            _, iri = self.next()
+            self.base = self.iri("iri", iri)
+
+    def graph_block(self) -> Iterator[tuple[str, str, str]]:
+        self.expect("{")
+        while self.peek_token() != "}":
+            yield from self.statement(in_graph=True)
+        self.expect("}")
+
+    def statement(self, in_graph: bool = False) -> Iterator[tuple[str, str, str]]:
+        kind, token = self.next()
+        if token == "[":
+            subject = self.new_bnode()
+            if self.peek_token() != "]":
+                yield from self.property_list(subject)
+            self.expect("]")
+            if self.peek_token() in (".", "}"):
+                if self.peek_token() == ".":
+                    self.next()
+                return
+        elif token == "(":
+            subject = self.new_bnode()
+            yield from self.collection(subject)
+        else:
+            subject = self.term(kind, token)
+            if self.peek_token() == "{":
+                # TriG: the term was a graph name
+                yield from self.graph_block()
+                return
+        yield from self.property_list(subject)
+        if self.peek_token() == ".":
+            self.next()
+        elif not (in_graph and self.peek_token() == "}"):
+            self.expect(".")
+
+    def term(self, kind: str, token: str) -> str:
+        if kind in ("iri", "pname"):
+            return self.iri(kind, token)
+        if kind == "bnode":
+            return token
+        raise ValueError(f"Unexpected {token!r} in Turtle input")
+
+    def property_list(self, subject: str) -> Iterator[tuple[str, str, str]]:
+        while True:
+            kind, token = self.next()
+            predicate = RDF_NS + "type" if kind == "word" and token == "a" else self.iri(kind, token)
+            while True:
+                obj = yield from self.object()
+                yield subject, predicate, obj
+                if self.peek_token() != ",":
+                    break
+                self.next()
+            if self.peek_token() != ";":
+                return
+            while self.peek_token() == ";":
+                self.next()
+            if self.peek_token() in (".", "]", "}"):
+                return
+
+    def collection(self, head: str) -> Iterator[tuple[str, str, str]]:
+        node = head
+        first = True
+        while self.peek_token() != ")":
+            if not first:
+                rest = self.new_bnode()
+                yield node, RDF_NS + "rest", rest
+                node = rest
+            first = False
+            item = yield from self.object()
+            yield node, RDF_NS + "first", item
+        self.next()
+        yield node, RDF_NS + "rest", RDF_NS + "nil"
+
+    def object(self):
+        kind, token = self.next()
+        if kind in ("iri", "pname", "bnode"):
+            return self.term(kind, token)
+        if token == "[":
+            node = self.new_bnode()
+            if self.peek_token() != "]":
+                yield from self.property_list(node)
+            self.expect("]")
+            return node
+        if token == "(":
+            if self.peek_token() == ")":
+                self.next()
+                return RDF_NS + "nil"
+            node = self.new_bnode()
+            yield from self.collection(node)
+            return node
+        if kind == "long_string":
+            value = _unescape(token[3:-3])
+        elif kind == "string":
+            value = _unescape(token[1:-1])
+        elif kind == "number":
+            return token
+        elif kind == "word" and token in ("true", "false"):
+            return token
+        else:
+            raise ValueError(f"Unexpected {token!r} in Turtle input")
+        # language tag or datatype; neither changes the lexical form
+        lookahead = self.peek()
+        if lookahead is not None and lookahead[0] == "langtag":
+            self.next()
+        elif lookahead is not None and lookahead[0] == "datatype":
+            self.next()
+            self.next()
+        return value
+
+
+def iter_turtle_triples(text: str) -> Iterator[tuple[str, str, str]]:
+    """
+    Stream the triples of a Turtle or TriG document as strings.
+
+    Raises:
+        ValueError: If the document is not valid Turtle
+    """
+    return _TurtleReader(text).triples()
+
+
+def _expand(term: str, prefixes: dict[str, str], vocab: Optional[str]) -> str:
+    if term.startswith(("http://", "https://", "_:")):
+        return term
+    prefix, sep, local = term.partition(":")
+    if sep and prefix in prefixes:
+        return prefixes[prefix] + local
+    if not sep and vocab and not term.startswith("@"):
+        return vocab + term
+    return term
+
+
+def _jsonld_context(context, prefixes: dict[str, str]) -> dict[str, str]:
+    prefixes = dict(prefixes)
+    for item in context if isinstance(context, list) else [context]:
+        if not isinstance(item, dict):
+            continue
+        for name, value in item.items():
+            if isinstance(value, dict):
+                value = value.get("@id")
+            if isinstance(value, str) and not name.startswith("@"):
+                prefixes[name] = value
+    # expand terms defined through prefixes
+    return {name: _expand(value, prefixes, None) for name, value in prefixes.items()}
+
+
+def iter_jsonld_triples(document) -> Iterator[tuple[str, str, str]]:
+    """
+    Stream (subject, predicate, object) strings from a parsed JSON-LD document.
+
+    Only what the document's own @context defines is used, on top of the
+    BDRC prefixes; remote contexts are not fetched, so bare terms are read as
+    BDRC core ontology terms.
+    """
+    if isinstance(document, str):
+        document = json.loads(document)
+    bnode_ids = count()
+
+    def walk(node, prefixes) -> Iterator[tuple[str, str, str]]:
+        if isinstance(node, list):
+            for item in node:
+                yield from walk(item, prefixes)
+            return
+        if not isinstance(node, dict):
+            return
+        if "@context" in node:
+            prefixes = _jsonld_context(node["@context"], prefixes)
+        node_id = node.get("@id", node.get("id"))
+        subject = _expand(node_id, prefixes, None) if isinstance(node_id, str) else f"_:j{next(bnode_ids)}"
+        for key, values in node.items():
+            if key == "id":
+                continue
+            if key == "@graph":
+                yield from walk(values, prefixes)
+                continue
+            if key.startswith("@") and key != "@type":
+                continue
+            predicate = RDF_NS + "type" if key in ("@type", "type") else _expand(key, prefixes, BDRC_VOCAB)
+            for value in values if isinstance(values, list) else [values]:
+                if isinstance(value, dict):
+                    if "@value" in value:
+                        yield subject, predicate, str(value["@value"])
+                        continue
+                    if "@id" in value and len(value) == 1:
+                        yield subject, predicate, _expand(value["@id"], prefixes, None)
+                        continue
+                    nested = list(walk(value, prefixes))
+                    yield subject, predicate, nested[0][0] if nested else f"_:j{next(bnode_ids)}"
+                    yield from nested
+                elif isinstance(value, str) and predicate == RDF_NS + "type":
+                    yield subject, predicate, _expand(value, prefixes, BDRC_VOCAB)
+                elif isinstance(value, str):
+                    yield subject, predicate, _expand(value, prefixes, None) if ":" in value else value
+                elif isinstance(value, bool):
+                    yield subject, predicate, str(value).lower()
+                elif value is not None:
+                    yield subject, predicate, str(value)
+
+    yield from walk(document, dict(BDRC_PREFIXES))
+
+
+def extract_objects(text: str, predicates: Iterable[str], format: str = "turtle") -> dict[str, list[str]]:
+    """
+    Collect the objects of the given predicates without building a graph.
+
+    Args:
+        text: Turtle, TriG or JSON-LD document
+        predicates: Full predicate IRIs to collect
+        format: "turtle" (also reads TriG) or "json-ld"
+
+    Returns:
+        Mapping of each requested predicate to its objects in document order
+    """
+    wanted: dict[str, list[str]] = {predicate: [] for predicate in predicates}
+    triples = iter_jsonld_triples(text) if format == "json-ld" else iter_turtle_triples(text)
+    for _, predicate, obj in triples:
+        objects = wanted.get(predicate)
+        if objects is not None:
+            objects.append(obj)
+    return wanted
+
+
+def extract_local_ids(text: str, predicate: str, format: str = "turtle") -> list[str]:
+    """
+    Unique local names (the part after the last "/") of a predicate's objects, in document order.
+    """
+    objects = extract_objects(text, [predicate], format)[predicate]
+    return list(dict.fromkeys(obj.split("/")[-1] for obj in objects))
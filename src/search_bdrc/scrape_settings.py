@@ -0,0 +1,42 @@
+"""
+Page loading settings of the search scraper.
+
+Kept apart from browser_pool so that a BdrcScraper can be configured without
+importing Playwright.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ScrapeSettings:
+    """
+    How search result pages are loaded.
+
+    Attributes:
+        fast: Block non-essential requests and wait for `ready_selector`
+            instead of network idle
+        blocked_resource_types: Playwright resource types aborted in fast mode
+        blocked_url_patterns: URL substrings aborted in fast mode (analytics)
+        ready_selector: Selector whose presence marks the page as ready
+        ready_timeout_ms: How long to wait for `ready_selector` before falling
+            back to waiting for network idle
+    """
+
+    fast: bool = False
+    blocked_resource_types: frozenset = frozenset({"image", "media", "font", "stylesheet"})
+    blocked_url_patterns: tuple = (
+        "google-analytics.com",
+        "googletagmanager.com",
+        "matomo",
+        "/analytics",
+    )
+    ready_selector: str = 'a[href^="/show/bdr:"]'
+    ready_timeout_ms: int = 15000
+
+    def is_blocked(self, request) -> bool:
+        if request.resource_type in self.blocked_resource_types:
+            return True
+        return any(pattern in request.url for pattern in self.blocked_url_patterns)
+
+
+DEFAULT_SETTINGS = ScrapeSettings()
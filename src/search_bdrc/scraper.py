@@ -0,0 +1,833 @@
+"""
+This module provides a BdrcScraper class for extracting instance IDs from the BDRC library search results.
+It uses Playwright for web scraping and multiprocessing for parallel page retrieval,
+with one persistent browser per worker process (see search_bdrc.browser_pool).
+
+Playwright, rdflib, tqdm and the multiprocessing pipeline are imported by the
+methods that use them, so metadata lookups never load the browser stack and
+importing the scraper stays cheap.
+
+Search pages that fail to load are queued and retried after the rest of their
+batch (see page_retries), instead of being counted as empty result pages.
+"""
+from __future__ import annotations
+
+import functools
+import re
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+from search_bdrc.config import get_logger
+from search_bdrc.http_session import DEFAULT_TIMEOUT, create_session
+from search_bdrc.metrics import NULL_METRICS, NullMetrics
+from search_bdrc.rdf_extract import extract_local_ids
+from search_bdrc.scrape_settings import ScrapeSettings
+
+if TYPE_CHECKING:
+    import requests
+    from rdflib import Graph
+
+    from search_bdrc.http_cache import HttpCache
+    from search_bdrc.rate_limit import RateLimiter
+    from search_bdrc.text_parts import TextPart
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+BDO_INSTANCE_OF = "http://purl.bdrc.io/ontology/core/instanceOf"
+BDO_WORK_HAS_INSTANCE = "http://purl.bdrc.io/ontology/core/workHasInstance"
+BDO_HAS_OUTLINE = "http://purl.bdrc.io/ontology/core/hasOutline"
+
+
+class BdrcScraper:
+    # BDRC endpoints, class attributes so that they can be pointed at another
+    # server, e.g. the replay server of the benchmarks
+    SEARCH_URL = "https://library.bdrc.io/osearch/search?q={input}&uilang=bo&page={page_no}"  # noqa
+    JSONLD_URL = "https://purl.bdrc.io/resource/{resource_id}.jsonld"  # noqa
+    TTL_URL = "https://ldspdi-dev.bdrc.io/resource/{resource_id}.ttl"  # noqa
+    TRIG_URL = "https://purl.bdrc.io/graph/{outline_id}.trig"  # noqa
+
+    def __init__(
+        self,
+        fast_scrape: bool = False,
+        scrape_settings: Optional[ScrapeSettings] = None,
+        http_cache: Optional[HttpCache] = None,
+        session: Optional[requests.Session] = None,
+        timeout=DEFAULT_TIMEOUT,
+        fast_extract: bool = True,
+        metrics: Optional[NullMetrics] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        page_retries: int = 2,
+        page_retry_delay: float = 2.0,
+    ):
+        """
+        Initialize the BdrcScraper with a regex pattern for extracting instance IDs from HTML content.
+
+        Args:
+            fast_scrape: Block non-essential requests and treat search pages as
+                ready once result anchors appear, instead of waiting for network idle
+            scrape_settings: Full page loading settings, overrides `fast_scrape`
+            http_cache: Optional on-disk cache for metadata and outline downloads
+            session: HTTP session for all BDRC requests, defaults to a pooled
+                session with retries from http_session.create_session
+            timeout: Request timeout in seconds, or a (connect, read) tuple
+            fast_extract: Read single predicates (instanceOf, workHasInstance,
+                hasOutline) straight from the Turtle text instead of building
+                an rdflib Graph
+            metrics: Where stage timings and counters are reported, see
+                search_bdrc.metrics; nothing is recorded by default
+            rate_limiter: Adaptive per-host limiter shared by the default
+                session and the browser workers, see search_bdrc.rate_limit
+            page_retries: Times a search page that failed to load is queued
+                again before it is given up
+            page_retry_delay: Seconds before the first round of page retries,
+                doubled for each further round
+        """
+        self.fast_extract = fast_extract
+        self.http_cache = http_cache
+        self.rate_limiter = rate_limiter
+        self.page_retries = page_retries
+        self.page_retry_delay = page_retry_delay
+        self.session = session or create_session(rate_limiter=rate_limiter)
+        self.timeout = timeout
+        self.metrics = metrics or NULL_METRICS
+        self.scrape_settings = scrape_settings or ScrapeSettings(fast=fast_scrape)
+        self.instance_id_regex = r"<a\shref=\"/show/bdr:([A-Z0-9_]+)\?"
+        # Number of result pages found by the last auto-paginated search.
+        self.result_page_count: Optional[int] = None
+        # A browser_worker_pool that searches scrape with instead of starting
+        # their own, e.g. the one shared by the search jobs of the batch CLI
+        self.worker_pool = None
+
+    def search_url(self, input: str, page_no: int) -> str:
+        """
+        URL of one page of BDRC search results, from this scraper's SEARCH_URL.
+        """
+        return self.SEARCH_URL.format(input=input, page_no=page_no)
+
+    @staticmethod
+    def scrape(args):
+        """
+        Scrape a single page of BDRC search results.
+
+        Takes (url, page_no), with the URL from search_url. Returns
+        (page_no, None) when the page failed to load, so that it can be retried.
+        """
+        url, page_no = args
+        from search_bdrc import browser_pool
+
+        try:
+            # Reuses this process's browser, each page gets its own context.
+            content = browser_pool.fetch_page_content(url)
+            return page_no, content
+        except Exception as e:
+            logger.warning(f"Error scraping page {page_no}: {e}")
+            return page_no, None
+
+    @contextmanager
+    def _browser_workers(self, processes: int) -> Iterator[Any]:
+        if self.worker_pool is not None:
+            yield self.worker_pool
+            return
+        from search_bdrc import browser_pool
+
+        with browser_pool.browser_worker_pool(processes, self.scrape_settings, self.rate_limiter) as pool:
+            yield pool
+
+    def _imap_pages(self, pool, func: Callable, page_args: list) -> Iterator[tuple[int, Any]]:
+        """
+        Run `func` over per-page arguments on a worker pool, retrying failed pages.
+
+        `func` takes a tuple whose second item is the page number and returns
+        (page_no, result), with a None result for a page that failed. Failed
+        pages are queued and sent to the pool again once the current round is
+        done, up to `self.page_retries` times, after a backoff that lets a
+        throttling server recover. Yields (page_no, result) as pages finish;
+        pages that failed every attempt come last with a None result.
+        """
+        args_by_page = {args[1]: args for args in page_args}
+        pending = list(page_args)
+        for attempt in range(self.page_retries + 1):
+            failed = []
+            for page_no, result in pool.imap_unordered(func, pending):
+                if result is None:
+                    failed.append(args_by_page[page_no])
+                else:
+                    yield page_no, result
+            if not failed:
+                return
+            pending = sorted(failed, key=lambda args: args[1])
+            if attempt < self.page_retries:
+                self.metrics.count("page_retries", len(pending))
+                logger.info(f"Retrying {len(pending)} failed pages.")
+                time.sleep(self.page_retry_delay * 2 ** attempt)
+        for args in pending:
+            logger.error(f"Giving up on page {args[1]} after {self.page_retries + 1} attempts.")
+            self.metrics.count("pages_failed")
+            yield args[1], None
+
+    def run_scrape(self, input: str, no_of_page: int, processes: int = 4):
+        """
+        Scrape multiple pages of BDRC search results in parallel.
+
+        Each worker process launches its browser once and reuses it for all the
+        pages it is handed.
+        """
+        logger.info(
+            f"Starting parallel scrape for '{input}' across {no_of_page} pages with {processes} processes."
+        )
+        from tqdm import tqdm
+
+        page_args = [(self.search_url(input, page_no), page_no) for page_no in range(1, no_of_page + 1)]
+        res = {}
+        processes = max(1, min(processes, no_of_page))
+        with self.metrics.stage("scrape"), self._browser_workers(processes) as pool:
+            for page_no, content in tqdm(
+                self._imap_pages(pool, BdrcScraper.scrape, page_args),
+                total=no_of_page,
+                desc="Scraping pages from bdrc",
+            ):
+                res[page_no] = content or ""
+        self.metrics.count("pages_scraped", no_of_page)
+        logger.info(f"Completed scraping {no_of_page} pages.")
+        return res
+
+    @staticmethod
+    def scrape_instance_ids(args):
+        """
+        Scrape a single page and extract its instance IDs inside the worker.
+
+        Takes (url, page_no, instance_id_regex). Only the compact ID list is
+        sent back to the parent process, not the page's HTML. The list is None
+        when the page failed to load.
+        """
+        url, page_no, instance_id_regex = args
+        page_no, content = BdrcScraper.scrape((url, page_no))
+        if content is None:
+            return page_no, None
+        ids = list(set(re.findall(instance_id_regex, content)))
+        logger.debug(f"Extracted {len(ids)} unique instance IDs from page {page_no}.")
+        return page_no, ids
+
+    def run_scrape_ids(self, input: str, no_of_page: int, processes: int = 4) -> set[str]:
+        """
+        Scrape multiple pages in parallel, extracting instance IDs in the workers.
+
+        IDs are merged into a running set as pages complete, so memory does not
+        grow with the number or size of the scraped pages.
+        """
+        logger.info(
+            f"Starting parallel ID scrape for '{input}' across {no_of_page} pages with {processes} processes."
+        )
+        from tqdm import tqdm
+
+        page_args = [
+            (self.search_url(input, page_no), page_no, self.instance_id_regex)
+            for page_no in range(1, no_of_page + 1)
+        ]
+        ids: set[str] = set()
+        processes = max(1, min(processes, no_of_page))
+        with self.metrics.stage("scrape"), self._browser_workers(processes) as pool:
+            for _, ids_in_page in tqdm(
+                self._imap_pages(pool, BdrcScraper.scrape_instance_ids, page_args),
+                total=no_of_page,
+                desc="Scraping pages from bdrc",
+            ):
+                ids.update(ids_in_page or ())
+        self.metrics.count("pages_scraped", no_of_page)
+        logger.info(f"Completed scraping {no_of_page} pages.")
+        return ids
+
+    async def aiter_scrape(
+        self,
+        input: str,
+        pages: Union[int, Iterable[int]],
+        concurrency: int = 16,
+        browsers: int = 2,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """
+        Scrape BDRC search result pages concurrently with Playwright's async API.
+
+        Up to `concurrency` pages load at once, spread over `browsers` browser
+        instances in this process. Yields (page_no, content) pairs as each page
+        finishes. A page that fails to load is retried up to `self.page_retries`
+        times with a growing delay, and yields an empty string if it never loads.
+
+        Args:
+            input: Search query
+            pages: Number of pages to scrape from page 1, or explicit page numbers
+            concurrency: Maximum number of pages loading at the same time
+            browsers: Number of browser instances to share the pages between
+        """
+        import asyncio
+
+        from search_bdrc.browser_pool import AsyncBrowserPool
+
+        page_numbers = range(1, pages + 1) if isinstance(pages, int) else list(pages)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with AsyncBrowserPool(browsers, self.scrape_settings, self.rate_limiter) as pool:
+
+            async def scrape_page(page_no: int) -> tuple[int, str]:
+                url = self.search_url(input, page_no)
+                for attempt in range(self.page_retries + 1):
+                    if attempt:
+                        # Out of the semaphore, so other pages load meanwhile
+                        self.metrics.count("page_retries")
+                        await asyncio.sleep(self.page_retry_delay * 2 ** (attempt - 1))
+                    async with semaphore:
+                        try:
+                            with self.metrics.stage("scrape_page"):
+                                content = await pool.fetch_page_content(url)
+                            self.metrics.count("pages_scraped")
+                            return page_no, content
+                        except Exception as e:
+                            logger.warning(f"Error scraping page {page_no}: {e}")
+                logger.error(f"Giving up on page {page_no} after {self.page_retries + 1} attempts.")
+                self.metrics.count("pages_failed")
+                return page_no, ""
+
+            tasks = [asyncio.ensure_future(scrape_page(page_no)) for page_no in page_numbers]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def arun_scrape(
+        self,
+        input: str,
+        pages: Union[int, Iterable[int]],
+        concurrency: int = 16,
+        browsers: int = 2,
+    ) -> dict[int, str]:
+        """
+        Async counterpart of run_scrape, returning {page_no: content}.
+
+        See aiter_scrape for the arguments.
+        """
+        logger.info(
+            f"Starting async scrape for '{input}' with concurrency {concurrency} over {browsers} browsers."
+        )
+        res = {}
+        async for page_no, content in self.aiter_scrape(input, pages, concurrency, browsers):
+            res[page_no] = content
+        logger.info(f"Completed scraping {len(res)} pages.")
+        return res
+
+    def extract_instance_ids(self, text: str) -> list[str]:
+        """
+        Extract unique instance IDs from the provided HTML content.
+        """
+        logger.debug("Extracting instance IDs from HTML content.")
+        ids = re.findall(self.instance_id_regex, text)
+        # Remove duplicate
+        ids = list(set(ids))
+        logger.info(f"Extracted {len(ids)} unique instance IDs.")
+        return ids
+
+    def iter_related_instance_ids(
+        self,
+        input: str,
+        processes: int = 4,
+        wave_size: Optional[int] = None,
+        max_pages: Optional[int] = None,
+    ) -> Iterator[tuple[int, list[str]]]:
+        """
+        Scrape search result pages in waves until the results run dry.
+
+        Pages are scraped `wave_size` at a time (one per process by default) on
+        the same worker pool. Yields (page_no, new_ids) as each page arrives,
+        where new_ids are the IDs not seen on any earlier page. Scraping stops
+        after the first wave in which a page returns no new IDs. The number of
+        pages that had results is stored in `self.result_page_count`. A page
+        that failed to load even after its retries is skipped, it doesn't end
+        the search, but a wave in which no page loaded at all does (the site is
+        down or refusing requests).
+
+        Args:
+            input: Search query
+            processes: Number of worker processes
+            wave_size: Number of pages requested per wave, defaults to `processes`
+            max_pages: Optional hard limit on the number of pages scraped
+        """
+        wave_size = max(1, wave_size or processes)
+        processes = max(1, min(processes, wave_size))
+        seen: set[str] = set()
+        self.result_page_count = 0
+        page_no = 1
+
+        with self._browser_workers(processes) as pool:
+            while max_pages is None or page_no <= max_pages:
+                last_page = page_no + wave_size - 1
+                if max_pages is not None:
+                    last_page = min(last_page, max_pages)
+                page_args = [
+                    (self.search_url(input, n), n, self.instance_id_regex)
+                    for n in range(page_no, last_page + 1)
+                ]
+
+                run_dry = False
+                loaded = 0
+                self.metrics.count("pages_scraped", len(page_args))
+                for scraped_page, ids_in_page in self._imap_pages(
+                    pool, BdrcScraper.scrape_instance_ids, page_args
+                ):
+                    if ids_in_page is None:
+                        continue
+                    loaded += 1
+                    new_ids = [i for i in ids_in_page if i not in seen]
+                    if not new_ids:
+                        run_dry = True
+                        continue
+                    seen.update(new_ids)
+                    self.result_page_count = max(self.result_page_count, scraped_page)
+                    yield scraped_page, new_ids
+
+                if run_dry:
+                    break
+                if not loaded:
+                    logger.error(
+                        f"No page of {page_no}-{last_page} loaded for query '{input}', stopping the search."
+                    )
+                    break
+                page_no = last_page + 1
+
+        logger.info(
+            f"Query '{input}' has {self.result_page_count} result pages with {len(seen)} unique instance IDs."
+        )
+
+    def get_related_instance_ids(
+        self,
+        input: str,
+        no_of_page: Optional[int] = None,
+        processes: int = 4,
+        extract_in_worker: bool = True,
+    ) -> list[str]:
+        """
+        Scrape multiple pages and extract all unique instance IDs from the results.
+
+        If `no_of_page` is None, pages are scraped until they stop returning new
+        IDs (see iter_related_instance_ids) and the number of result pages is
+        left in `self.result_page_count`. With `extract_in_worker`, IDs are
+        extracted in the scrape workers and page HTML never reaches this process.
+        """
+        if no_of_page is None:
+            logger.info(f"Getting related instance IDs for query '{input}' until results run out.")
+            ids = []
+            for _, new_ids in self.iter_related_instance_ids(input, processes):
+                ids.extend(new_ids)
+            logger.info(f"Total unique instance IDs found: {len(ids)}")
+            return ids
+
+        logger.info(
+            f"Getting related instance IDs for query '{input}' across {no_of_page} pages."
+        )
+        if extract_in_worker:
+            ids = list(self.run_scrape_ids(input, no_of_page, processes))
+            logger.info(f"Total unique instance IDs found: {len(ids)}")
+            return ids
+
+        scraped = self.run_scrape(input, no_of_page, processes)
+
+        ids = []
+        for _, content in scraped.items():
+            ids_in_page = self.extract_instance_ids(content)
+            ids.extend(ids_in_page)
+
+        # remove duplicates
+        ids = list(set(ids))
+        logger.info(f"Total unique instance IDs found: {len(ids)}")
+        return ids
+
+    def get_related_instance_ids_from_work(self, work_id: str) -> list[str]:
+        if self.fast_extract:
+            return list(set(self.get_linked_ids(work_id, BDO_WORK_HAS_INSTANCE) or []))
+
+        metadata = self.get_instance_metadata(work_id)
+
+        if not metadata:
+            return []
+
+        instance_ids = []
+        for subj, pred, obj in metadata:
+            if str(pred) == BDO_WORK_HAS_INSTANCE:
+                instance_link = str(obj)
+                instance_id = instance_link.split("/")[-1]
+                instance_ids.append(instance_id)
+
+        # remove duplicates
+        instance_ids = list(set(instance_ids))
+        return instance_ids
+
+    def http_get(self, url: str, headers: dict, endpoint: str = "other"):
+        """
+        GET a BDRC resource with the scraper's session, through the HTTP cache
+        when one is configured.
+
+        The request is reported to the metrics under the `endpoint` label.
+        """
+        get = functools.partial(self.session.get, timeout=self.timeout)
+        with self.metrics.stage("http", endpoint=endpoint):
+            if self.http_cache is not None:
+                response = self.http_cache.fetch(url, headers, get=get)
+            else:
+                response = get(url, headers=headers)
+        if self.metrics.enabled:
+            self._record_response(response, endpoint)
+        return response
+
+    def _record_response(self, response, endpoint: str) -> None:
+        metrics = self.metrics
+        metrics.count("http_requests", endpoint=endpoint, status=str(response.status_code))
+        if getattr(response, "from_cache", False):
+            metrics.count("http_cache_hits", endpoint=endpoint)
+        metrics.count("http_bytes", len(response.content or b""), endpoint=endpoint)
+        # urllib3 keeps the retries of a request on the raw response
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        history = getattr(retries, "history", None)
+        if history:
+            metrics.count("http_retries", len(history), endpoint=endpoint)
+        # while the rate limited adapter counts its own attempts
+        attempts = getattr(response, "attempts", 1)
+        if attempts > 1:
+            metrics.count("http_retries", attempts - 1, endpoint=endpoint)
+
+    def get_instance_metadata(self, instance_id: str, json_format: bool = False):
+        if json_format:
+            url = self.JSONLD_URL.format(resource_id=instance_id)
+            headers = {"Accept": "application/ld+json"}
+            response = self.http_get(url, headers, endpoint="jsonld")
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except Exception as e:
+                    logger.error(
+                        f"Failed to parse JSON for instance {instance_id}: {e}"
+                    )
+                    return None
+            else:
+                logger.error(
+                    f"Failed to retrieve JSON metadata from instance {instance_id}: {response.status_code}"
+                )
+                return None
+        else:
+            from search_bdrc.parsing import parse_turtle
+
+            data = self.fetch_instance_ttl(instance_id)
+            if data is None:
+                return None
+            with self.metrics.stage("parse", format="turtle"):
+                graph = parse_turtle(data)
+            self.metrics.count("triples", len(graph), format="turtle")
+            return graph
+
+    def fetch_instance_ttl(self, instance_id: str) -> Optional[str]:
+        """
+        Download the Turtle metadata of a BDRC resource without parsing it.
+        """
+        url = self.TTL_URL.format(resource_id=instance_id)
+        headers = {"Accept": "text/turtle"}  # Requesting Turtle format
+        response = self.http_get(url, headers, endpoint="ttl")
+        if response.status_code == 200:
+            return response.text
+        logger.error(
+            f"Failed to retrieve metadata from instance {instance_id}: {response.status_code}"
+        )
+        return None
+
+    def get_linked_ids(self, resource_id: str, predicate: str) -> Optional[list[str]]:
+        """
+        IDs linked from a resource through one predicate, without building a graph.
+
+        Streams the resource's Turtle through rdf_extract and keeps only the
+        objects of `predicate`. Falls back to rdflib if the fast reader cannot
+        handle the document.
+
+        Returns:
+            Unique linked IDs in document order, or None if the metadata could
+            not be retrieved
+        """
+        data = self.fetch_instance_ttl(resource_id)
+        if data is None:
+            return None
+        try:
+            return extract_local_ids(data, predicate)
+        except ValueError as e:
+            from rdflib import URIRef
+
+            from search_bdrc.parsing import parse_turtle
+
+            logger.warning(f"Fast extraction failed for {resource_id}: {e}, using rdflib")
+            graph = parse_turtle(data)
+            return list(dict.fromkeys(str(obj).split("/")[-1] for obj in graph.objects(None, URIRef(predicate))))
+
+    def get_work_of_instance(self, instance_id: str):
+        if self.fast_extract:
+            return list(set(self.get_linked_ids(instance_id, BDO_INSTANCE_OF) or []))
+
+        metadata = self.get_instance_metadata(instance_id)
+        if not metadata:
+            return []
+
+        works = []
+        for subj, pred, obj in metadata:
+            if str(pred) == BDO_INSTANCE_OF:
+                work_link = str(obj)
+                work_id = work_link.split("/")[-1]
+                works.append(work_id)
+
+        # remove duplicates
+        works = list(set(works))
+        return works
+
+
+    def get_outline_of_instance(self, instance_id: str, save_metadata: bool = True) -> list[str]:
+        """Get outline IDs for a given instance.
+        
+        Args:
+            instance_id: The ID of the instance (e.g. MW19999)
+            save_metadata: Save the instance metadata to outputs/. Without it,
+                and with fast_extract, no rdflib Graph is built.
+            
+        Returns:
+            List of outline IDs associated with the instance
+        """
+        if not save_metadata and self.fast_extract:
+            outlines = self.get_linked_ids(instance_id, BDO_HAS_OUTLINE)
+            if outlines is None:
+                print(f"No metadata found for instance {instance_id}")
+                return []
+            if not outlines:
+                print(f"No outlines found for instance {instance_id}")
+            return outlines
+
+        metadata = self.get_instance_metadata(instance_id)
+        if not metadata:
+            print(f"No metadata found for instance {instance_id}")
+            return []
+
+        # Save metadata to file
+        output_dir = Path("outputs")
+        output_dir.mkdir(exist_ok=True)
+        meta_file = output_dir / f"{instance_id}_metadata.ttl"
+        meta_file.write_text(metadata.serialize(format='turtle'))
+        print(f"Metadata saved to {meta_file}")
+
+        # Get outlines using BDO namespace
+        from rdflib import Namespace
+
+        BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+        outlines = []
+
+        # Look for hasOutline predicate
+        for _, _, obj in metadata.triples((None, BDO.hasOutline, None)):
+            outline_id = str(obj).split("/")[-1]
+            outlines.append(outline_id)
+            print(f"Found outline: {outline_id}")
+
+        if not outlines:
+            print(f"No outlines found for instance {instance_id}")
+            return []
+
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(outlines))
+
+    @staticmethod
+    def map_concurrently(
+        func: Callable[[T], Any], ids: Iterable[T], max_workers: int = 8
+    ) -> Iterator[tuple[T, Any]]:
+        """
+        Call `func` on every ID from a thread pool and yield results as they finish.
+
+        At most 2 * max_workers IDs are in flight at a time, so `ids` can be a
+        long or lazy iterable. Yields (id, result) pairs in completion order; if
+        the call for an ID raises, the exception is logged and yielded as its
+        result so one failure does not stop the batch.
+        """
+        ids = iter(ids)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def submit(count: int):
+                for item_id in islice(ids, count):
+                    pending[executor.submit(func, item_id)] = item_id
+
+            submit(2 * max_workers)
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item_id = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.error(f"Failed to process {item_id}: {e}")
+                            result = e
+                        yield item_id, result
+                    submit(len(done))
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_instance_metadata_many(
+        self, instance_ids: Iterable[str], max_workers: int = 8, json_format: bool = False
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Fetch metadata for many instances concurrently.
+
+        Yields (instance_id, metadata) as each request finishes. The metadata is
+        what get_instance_metadata returns (None when BDRC answers with an
+        error), or the exception raised for that instance.
+        """
+        return self.map_concurrently(
+            lambda instance_id: self.get_instance_metadata(instance_id, json_format=json_format),
+            instance_ids,
+            max_workers,
+        )
+
+    def get_work_of_instance_many(
+        self, instance_ids: Iterable[str], max_workers: int = 8
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Batch version of get_work_of_instance, yielding (instance_id, work_ids) as they finish.
+        """
+        return self.map_concurrently(self.get_work_of_instance, instance_ids, max_workers)
+
+    def get_outline_of_instance_many(
+        self, instance_ids: Iterable[str], max_workers: int = 8
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Batch version of get_outline_of_instance, yielding (instance_id, outline_ids) as they finish.
+        """
+        return self.map_concurrently(self.get_outline_of_instance, instance_ids, max_workers)
+
+    def get_related_instance_ids_from_work_many(
+        self, work_ids: Iterable[str], max_workers: int = 8
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Batch version of get_related_instance_ids_from_work, yielding (work_id, instance_ids) as they finish.
+        """
+        return self.map_concurrently(self.get_related_instance_ids_from_work, work_ids, max_workers)
+
+    def get_outline_metadata(self, outline_id: str):
+        metadata = self.get_instance_metadata(outline_id)
+        if not metadata:
+            return None
+        
+        return metadata
+    
+    def fetch_outline_trig(self, outline_id: str) -> Optional[str]:
+        """
+        Download the TriG graph of an outline without parsing it.
+        """
+        url = self.TRIG_URL.format(outline_id=outline_id)
+        response = self.http_get(url, {"Accept": "text/trig"}, endpoint="trig")
+        if response.status_code != 200:
+            logger.error(f"Error fetching {url}: {response.status_code}")
+            return None
+        return response.text
+
+    def get_outline_graph(self, outline_id: str):
+        from search_bdrc.parsing import parse_outline_graph
+
+        data = self.fetch_outline_trig(outline_id)
+        if data is None:
+            return None
+        with self.metrics.stage("parse", format="trig"):
+            graph = parse_outline_graph(data)
+        self.metrics.count("triples", len(graph), format="trig")
+        return graph
+
+    def get_instance_fields_many(
+        self,
+        ids: Iterable[str],
+        fetch_workers: int = 8,
+        parse_workers: Optional[int] = None,
+        queue_size: int = 32,
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Fetch and parse the metadata of many instances or works.
+
+        Downloads run on `fetch_workers` threads while Turtle parsing runs on a
+        pool of `parse_workers` processes (see pipeline.fetch_and_parse). Yields
+        (id, fields) as each finishes, where fields is the dictionary returned by
+        parsing.extract_instance_fields, None if the download failed, or the
+        exception raised for that ID.
+        """
+        from search_bdrc.parsing import extract_instance_fields
+        from search_bdrc.pipeline import fetch_and_parse
+
+        return fetch_and_parse(
+            ids, self.fetch_instance_ttl, extract_instance_fields, fetch_workers, parse_workers, queue_size
+        )
+
+    def get_outline_parts_many(
+        self,
+        outline_ids: Iterable[str],
+        fetch_workers: int = 4,
+        parse_workers: Optional[int] = None,
+        queue_size: int = 8,
+    ) -> Iterator[tuple[str, Any]]:
+        """
+        Fetch many outline graphs and extract their titles and ordered text parts.
+
+        Like get_instance_fields_many, with TriG parsing and text part extraction
+        (parsing.extract_outline) running in the process pool.
+        """
+        from search_bdrc.parsing import extract_outline
+        from search_bdrc.pipeline import fetch_and_parse
+
+        return fetch_and_parse(
+            outline_ids, self.fetch_outline_trig, extract_outline, fetch_workers, parse_workers, queue_size
+        )
+
+    def get_page_title(self, graph: Graph) -> Optional[str]:
+        from rdflib import RDF, Namespace
+
+        BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+        RDFS = Namespace("http://www.w3.org/2000/01/rdf-schema#")
+        
+        # Find subjects that are of type TitlePageTitle
+        for subject in graph.subjects(RDF.type, BDO.TitlePageTitle):
+            # Get their rdfs:label
+            for label in graph.objects(subject, RDFS.label):
+                return str(label)
+        return None
+
+    def get_ordered_text_parts(self, graph: Graph, compact: bool = False) -> Union[list[dict], list["TextPart"]]:
+        """
+        Get all text parts from the graph ordered by their tree index.
+        
+        Args:
+            graph: RDF graph containing the outline structure
+            compact: Return compact TextPart records (see search_bdrc.text_parts)
+                instead of dicts; their to_dict() gives the layout below
+            
+        Returns:
+            List of dictionaries containing text part information including:
+            - id: text part ID
+            - label: skos:prefLabel
+            - titles: list of title objects with type and label
+            - colophon: text colophon if available
+            - location: detailed content location info
+            - part_index: numerical index
+            - part_tree_index: hierarchical index
+            - instance_of: work ID this is an instance of
+            - part_of: parent section ID
+        """
+        from search_bdrc.text_parts import extract_text_parts
+
+        with self.metrics.stage("extract_text_parts"):
+            parts = extract_text_parts(graph, compact=compact)
+        self.metrics.count("text_parts", len(parts))
+        return parts
+
+
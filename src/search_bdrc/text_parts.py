@@ -0,0 +1,301 @@
+"""
+Extraction of text part records from BDRC outline graphs.
+
+An outline with tens of thousands of parts used to cost a dozen store lookups per
+part, one per property, plus more for each title and content location. Here the
+triples of every node that is needed are read in one sweep and grouped by
+predicate, so each triple is visited once and the cost grows linearly with the
+size of the outline.
+
+For large outlines the per-dict overhead of the records dominates memory, so
+they can also be built as compact __slots__ records (TextPart, Annotation) that
+turn back into the same dicts through to_dict().
+"""
+import sys
+from collections import defaultdict
+from typing import Optional, Union
+
+from rdflib import RDF, RDFS, Graph, Namespace
+from rdflib.term import Node
+
+BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+BDR = Namespace("http://purl.bdrc.io/resource/")
+SKOS = Namespace("http://www.w3.org/2004/02/skos/core#")
+
+PART_TYPES = [
+    BDR.PartTypeText,
+    BDR.PartTypeTableOfContent,
+    BDR.PartTypeVolume,
+    BDR.PartTypeSection,
+    BDR.PartTypeChapter,
+]
+
+
+def index_node(graph: Graph, node: Node) -> dict[Node, list[Node]]:
+    """
+    Group the triples of a node by predicate.
+
+    Objects keep the order in which the store returns them, so "first" and "last"
+    value choices match the ones made with graph.objects().
+    """
+    index = defaultdict(list)
+    for pred, obj in graph.predicate_objects(node):
+        index[pred].append(obj)
+    return index
+
+
+def _local_name(node: Node) -> str:
+    return str(node).split('/')[-1]
+
+
+def _location(graph: Graph, loc_node: Node) -> dict:
+    location_info = {'id': _local_name(loc_node)}
+    for pred, objects in index_node(graph, loc_node).items():
+        pred_name = _local_name(pred)
+        if 'contentLocation' in pred_name and pred_name != 'contentLocation':
+            key = pred_name.replace('contentLocation', '').lower()
+            for obj in objects:
+                try:
+                    location_info[key] = int(obj)
+                except ValueError:
+                    location_info[key] = _local_name(obj) if '/' in str(obj) else str(obj).split('#')[-1]
+    return location_info
+
+
+def _title(graph: Graph, title_node: Node) -> dict:
+    props = index_node(graph, title_node)
+    types = props.get(RDF.type)
+    labels = props.get(SKOS.prefLabel)
+    label = str(labels[-1]) if labels else None
+    if not label:
+        labels = props.get(RDFS.label)
+        if labels:
+            label = str(labels[-1])
+    return {
+        'id': _local_name(title_node),
+        'type': _local_name(types[-1]) if types else None,
+        'label': label,
+    }
+
+
+def _first(props: dict, pred: Node, convert=_local_name):
+    objects = props.get(pred)
+    return convert(objects[0]) if objects else None
+
+
+def text_part(graph: Graph, subject: Node) -> dict:
+    """Build the record of a single outline part."""
+    props = index_node(graph, subject)
+    labels = props.get(SKOS.prefLabel)
+    locations = props.get(BDO.contentLocation)
+    return {
+        'id': _local_name(subject),
+        'label': str(labels[-1]) if labels else None,
+        'location': _location(graph, locations[-1]) if locations else None,
+        'titles': [_title(graph, node) for node in props.get(BDO.hasTitle, ())],
+        'colophon': _first(props, BDO.colophon, str),
+        'part_index': _first(props, BDO.partIndex, int),
+        'part_tree_index': _first(props, BDO.partTreeIndex, str),
+        'instance_of': _first(props, BDO.instanceOf),
+        'part_of': _first(props, BDO.partOf),
+        'root_instance': _first(props, BDO.inRootInstance),
+    }
+
+
+def text_part_record(graph: Graph, subject: Node) -> "TextPart":
+    """Build the compact record of a single outline part, see text_part."""
+    props = index_node(graph, subject)
+    labels = props.get(SKOS.prefLabel)
+    locations = props.get(BDO.contentLocation)
+    return TextPart(
+        _local_name(subject),
+        label=str(labels[-1]) if labels else None,
+        location=_location(graph, locations[-1]) if locations else None,
+        titles=tuple(Title(**_title(graph, node)) for node in props.get(BDO.hasTitle, ())),
+        colophon=_first(props, BDO.colophon, str),
+        part_index=_first(props, BDO.partIndex, int),
+        part_tree_index=_first(props, BDO.partTreeIndex, str),
+        instance_of=_first(props, BDO.instanceOf),
+        part_of=_first(props, BDO.partOf),
+        root_instance=_first(props, BDO.inRootInstance),
+    )
+
+
+def extract_text_parts(graph: Graph, compact: bool = False) -> Union[list[dict], list["TextPart"]]:
+    """
+    Get all text parts from an outline graph ordered by their tree index.
+
+    See BdrcScraper.get_ordered_text_parts for the record layout. With compact
+    set, TextPart records are built directly instead of dicts, so the dict
+    form of the outline is never held.
+    """
+    # One lookup per part type keeps the order parts are listed in before
+    # sorting, which decides the order of parts sharing a tree index.
+    subjects = (
+        subject
+        for part_type in PART_TYPES
+        for subject in graph.subjects(BDO.partType, part_type)
+    )
+    if compact:
+        records = [text_part_record(graph, subject) for subject in subjects]
+        records.sort(key=lambda x: (x.part_tree_index or ''))
+        return records
+    text_parts = [text_part(graph, subject) for subject in subjects]
+    text_parts.sort(key=lambda x: (x['part_tree_index'] or ''))
+    return text_parts
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Location key tuples, shared by all records with the same keys
+_location_keys: dict[tuple, tuple] = {}
+
+
+class Title:
+    """Compact form of a title record."""
+
+    __slots__ = ('id', 'type', 'label')
+
+    def __init__(self, id: str, type: Optional[str], label: Optional[str]):
+        self.id = _intern(id)
+        self.type = _intern(type)
+        self.label = label
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'type': self.type, 'label': self.label}
+
+
+class TextPart:
+    """
+    Compact form of a text part record.
+
+    Holds the same fields as the dicts returned by extract_text_parts, with IDs
+    interned, the location split into a shared tuple of keys and a tuple of
+    values, and titles as Title records. to_dict() rebuilds the dict form.
+    """
+
+    __slots__ = (
+        'id', 'label', 'location_keys', 'location_values', 'titles', 'colophon', 'part_index',
+        'part_tree_index', 'instance_of', 'part_of', 'root_instance',
+    )
+
+    def __init__(self, id, label=None, location=None, titles=(), colophon=None, part_index=None,
+                 part_tree_index=None, instance_of=None, part_of=None, root_instance=None):
+        self.id = _intern(id)
+        self.label = label
+        if location is None:
+            self.location_keys = self.location_values = None
+        else:
+            keys = tuple(location)
+            self.location_keys = _location_keys.setdefault(keys, keys)
+            self.location_values = tuple(_intern(location[key]) for key in keys)
+        self.titles = titles
+        self.colophon = colophon
+        self.part_index = part_index
+        self.part_tree_index = _intern(part_tree_index)
+        self.instance_of = _intern(instance_of)
+        self.part_of = _intern(part_of)
+        self.root_instance = _intern(root_instance)
+
+    @classmethod
+    def from_dict(cls, part: dict) -> "TextPart":
+        return cls(
+            part.get('id'),
+            label=part.get('label'),
+            location=part.get('location'),
+            titles=tuple(Title(t.get('id'), t.get('type'), t.get('label')) for t in part.get('titles', [])),
+            colophon=part.get('colophon'),
+            part_index=part.get('part_index'),
+            part_tree_index=part.get('part_tree_index'),
+            instance_of=part.get('instance_of'),
+            part_of=part.get('part_of'),
+            root_instance=part.get('root_instance'),
+        )
+
+    def location_dict(self) -> Optional[dict]:
+        if self.location_keys is None or self.location_values is None:
+            return None
+        return dict(zip(self.location_keys, self.location_values))
+
+    def titles_list(self) -> list[dict]:
+        return [title.to_dict() for title in self.titles]
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'label': self.label,
+            'location': self.location_dict(),
+            'titles': self.titles_list(),
+            'colophon': self.colophon,
+            'part_index': self.part_index,
+            'part_tree_index': self.part_tree_index,
+            'instance_of': self.instance_of,
+            'part_of': self.part_of,
+            'root_instance': self.root_instance,
+        }
+
+
+class Annotation:
+    """
+    Compact form of a header annotation, as built by
+    TextPartProcessor._convert_to_annotation_format(compact=True).
+
+    It points at its TextPart instead of copying it; to_dict() builds the same
+    annotation dict as the default path, including the meta key order.
+    """
+
+    __slots__ = ('start_position', 'end_position', 'part', 'parent_id', 'has_children')
+
+    annotation_type = "header"
+    label = "section_header"
+
+    def __init__(self, start_position: int, end_position: int, part: TextPart,
+                 parent_id: Optional[int] = None, has_children: bool = False):
+        self.start_position = start_position
+        self.end_position = end_position
+        self.part = part
+        self.parent_id = parent_id
+        self.has_children = has_children
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.part.label
+
+    def to_dict(self) -> dict:
+        part = self.part
+        tree_index = part.part_tree_index
+        meta = {
+            "id": part.id,
+            "location": part.location_dict(),
+            "titles": part.titles_list(),
+            "colophon": part.colophon,
+            "part_index": part.part_index,
+            "part_tree_index": tree_index,
+            "instance_of": part.instance_of,
+            "part_of": part.part_of,
+            "root_instance": part.root_instance,
+            "level": len(tree_index.split('.')),
+            "parent": tree_index.rsplit('.', 1)[0] if '.' in tree_index else None,
+        }
+        if self.has_children:
+            meta['relationship'] = 'parent'
+        if self.parent_id is not None:
+            meta['parent_id'] = self.parent_id
+            meta['relationship'] = 'child'
+        return {
+            "annotation_type": self.annotation_type,
+            "start_position": self.start_position,
+            "end_position": self.end_position,
+            "label": self.label,
+            "name": part.label,
+            "meta": meta,
+        }
+
+
+def json_default(obj):
+    """json.dump `default` hook writing compact records in their dict form."""
+    if isinstance(obj, (TextPart, Title, Annotation)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,155 @@
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.synthetic import outline_trig
+from search_bdrc import BdrcScraper
+from search_bdrc.outline_formatter import TextPartProcessor, materialize_content
+from search_bdrc.parsing import parse_outline_graph
+from search_bdrc.text_parts import Annotation
+
+TRIG = Path(__file__).resolve().parent.parent / "outputs" / "trig"
+
+
+def scanning_annotation_format(text_parts, title="BDRC Text Parts", language="bo", content=""):
+    """The previous quadratic implementation, with its sort key fixed."""
+    text_parts.sort(key=lambda x: [int(i) for i in x['part_tree_index'].split('.')])
+    annotations = []
+    total_parts = len(text_parts)
+    content_length = len(content) if content else total_parts * 10
+    base_spacing = content_length // total_parts
+    current_pos = 1
+    for part in text_parts:
+        annotations.append({
+            "annotation_type": "header",
+            "start_position": current_pos,
+            "end_position": current_pos + base_spacing,
+            "label": "section_header",
+            "name": part['label'],
+            "meta": {
+                "id": part.get('id'),
+                "location": part.get('location'),
+                "titles": part.get('titles', []),
+                "colophon": part.get('colophon'),
+                "part_index": part.get('part_index'),
+                "part_tree_index": part['part_tree_index'],
+                "instance_of": part.get('instance_of'),
+                "part_of": part.get('part_of'),
+                "root_instance": part.get('root_instance'),
+                "level": len(part['part_tree_index'].split('.')),
+                "parent": '.'.join(part['part_tree_index'].split('.')[:-1]) if '.' in part['part_tree_index'] else None
+            }
+        })
+        current_pos += base_spacing
+    sorted_indices = sorted(
+        range(len(annotations)),
+        key=lambda i: (
+            -len(annotations[i]['meta']['part_tree_index'].split('.')),
+            annotations[i]['meta']['part_tree_index'],
+        )
+    )
+    for idx in sorted_indices:
+        anno = annotations[idx]
+        if anno['meta']['parent']:
+            for j, other in enumerate(annotations):
+                if other['meta']['part_tree_index'] == anno['meta']['parent']:
+                    anno['meta']['parent_id'] = j
+                    anno['meta']['relationship'] = 'child'
+                    other['meta']['relationship'] = 'parent'
+                    break
+        if anno['meta']['parent']:
+            current = anno['meta']['parent']
+            while current:
+                parent_idx = next(
+                    (i for i, a in enumerate(annotations) if a['meta']['part_tree_index'] == current), None
+                )
+                if parent_idx is None:
+                    break
+                parent = annotations[parent_idx]
+                parent['end_position'] = max(parent['end_position'], anno['end_position'])
+                current = parent['meta']['parent']
+    max_pos = max(a['end_position'] for a in annotations)
+    content = "_" * max_pos if not content else content + "_" * (max_pos - len(content))
+    annotations.sort(key=lambda x: [int(i) for i in x['meta']['part_tree_index'].split('.')])
+    return {
+        "text": {
+            "title": title, "content": content, "language": language, "source": "Buddhist Digital Resource Center"
+        },
+        "annotations": annotations,
+    }
+
+
+def part(tree_index):
+    return {"id": f"MW1_{tree_index}", "label": f"part {tree_index}", "part_tree_index": tree_index}
+
+
+def assert_same_output(text_parts, **kwargs):
+    processor = TextPartProcessor(BdrcScraper())
+    ours = processor._convert_to_annotation_format(copy.deepcopy(text_parts), **kwargs)
+    expected = scanning_annotation_format(copy.deepcopy(text_parts), **kwargs)
+    assert json.dumps(ours, ensure_ascii=False, indent=4) == json.dumps(expected, ensure_ascii=False, indent=4)
+    return ours
+
+
+@pytest.mark.parametrize("path", sorted(TRIG.glob("*.trig")), ids=lambda path: path.name)
+def test_fixture_outlines_match_scanning(path):
+    text_parts = BdrcScraper().get_ordered_text_parts(parse_outline_graph(path.read_text(encoding="utf-8")))
+
+    output = assert_same_output(text_parts, title="title")
+
+    assert len(output["annotations"]) == len(text_parts)
+
+
+def test_synthetic_outline_matches_scanning():
+    text_parts = BdrcScraper().get_ordered_text_parts(parse_outline_graph(outline_trig(400, fanout=4)))
+
+    assert_same_output(text_parts, content="ཀ" * 1234)
+
+
+def test_gaps_and_duplicates_match_scanning():
+    text_parts = [part(i) for i in ["2.1.1", "1", "1.10", "1.2", "2", "3.1.1", "3", "1.2", "1.2.1.1", "1.2.1"]]
+
+    output = assert_same_output(text_parts)
+
+    by_index = {a["meta"]["part_tree_index"]: a for a in output["annotations"]}
+    # "2.1" is missing, so its child is not attached to "2"
+    assert "parent_id" not in by_index["2.1.1"]["meta"]
+    assert by_index["1"]["end_position"] == max(a["end_position"] for a in output["annotations"][:6])
+
+
+@pytest.mark.parametrize("path", sorted(TRIG.glob("*.trig")), ids=lambda path: path.name)
+def test_compact_process_outline_writes_same_files(path, tmp_path, monkeypatch):
+    trig = path.read_text(encoding="utf-8")
+    scraper = BdrcScraper()
+    monkeypatch.setattr(scraper, "fetch_outline_trig", lambda outline_id: trig)
+    processor = TextPartProcessor(scraper)
+
+    written = {}
+    for compact in (False, True):
+        processor.cache_dir = tmp_path / f"cache_{compact}"
+        processor.cache_dir.mkdir()
+        output_dir = tmp_path / f"outputs_{compact}"
+        output = processor.process_outline(path.stem, output_dir=output_dir, compact=compact)
+        written[compact] = [
+            (processor.cache_dir / f"{path.stem}_annotations_full.json").read_bytes(),
+            (processor.cache_dir / f"{path.stem}_annotations.json").read_bytes(),
+            (output_dir / f"{path.stem}.json").read_bytes(),
+        ]
+        if compact:
+            assert isinstance(output["annotations"][0], Annotation)
+
+    assert written[True] == written[False]
+
+
+def test_virtual_content_keeps_real_prefix():
+    processor = TextPartProcessor(BdrcScraper())
+    text_parts = [part(i) for i in ["1", "1.1", "2"]]
+
+    virtual = processor._convert_to_annotation_format(copy.deepcopy(text_parts), content="ཀཁ", virtual_content=True)
+    default = processor._convert_to_annotation_format(copy.deepcopy(text_parts), content="ཀཁ")
+
+    assert virtual["text"]["content"] == "ཀཁ"
+    assert virtual["text"]["content_length"] == len(default["text"]["content"])
+    assert materialize_content(virtual) == default
@@ -0,0 +1,64 @@
+import threading
+import time
+from unittest.mock import patch
+
+from rdflib import Graph, Namespace, URIRef
+
+from search_bdrc import BdrcScraper
+
+BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+BDR = Namespace("http://purl.bdrc.io/resource/")
+
+
+def fake_ttl(instance_id):
+    if instance_id == "MW_BAD":
+        raise ConnectionError("connection reset")
+    if instance_id == "MW_MISSING":
+        return None
+    g = Graph()
+    g.add((BDR[instance_id], BDO.instanceOf, URIRef(f"http://purl.bdrc.io/resource/WA{instance_id[2:]}")))
+    return g.serialize(format="turtle")
+
+
+def test_get_work_of_instance_many_reports_each_id():
+    scraper = BdrcScraper()
+    ids = ["MW1", "MW2", "MW_BAD", "MW_MISSING"]
+    with patch.object(scraper, "fetch_instance_ttl", side_effect=fake_ttl):
+        results = dict(scraper.get_work_of_instance_many(ids, max_workers=2))
+
+    assert results["MW1"] == ["WA1"]
+    assert results["MW2"] == ["WA2"]
+    assert isinstance(results["MW_BAD"], ConnectionError)
+    assert results["MW_MISSING"] == []
+
+
+def test_get_instance_metadata_many_passes_json_format():
+    scraper = BdrcScraper()
+    with patch.object(scraper, "get_instance_metadata", return_value={"@id": "x"}) as mock_get:
+        results = list(scraper.get_instance_metadata_many(["MW1"], json_format=True))
+
+    assert results == [("MW1", {"@id": "x"})]
+    mock_get.assert_called_once_with("MW1", json_format=True)
+
+
+def test_map_concurrently_bounds_concurrency():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow(item_id):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return item_id.upper()
+
+    ids = (f"id{i}" for i in range(20))
+    results = dict(BdrcScraper.map_concurrently(slow, ids, max_workers=3))
+
+    assert len(results) == 20
+    assert results["id7"] == "ID7"
+    assert peak <= 3
@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from search_bdrc import BdrcScraper, outline_formatter
+from search_bdrc.outline_formatter import TextPartProcessor
+
+TRIG = Path(__file__).resolve().parent.parent / "outputs" / "trig"
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    scraper = BdrcScraper()
+    trig = {path.stem: path.read_text(encoding="utf-8") for path in TRIG.glob("*.trig")}
+    fetched = []
+
+    def fetch_outline_trig(outline_id):
+        fetched.append(outline_id)
+        if outline_id == "O_BROKEN":
+            return "this is not trig"
+        return trig.get(outline_id)
+
+    monkeypatch.setattr(scraper, "fetch_outline_trig", fetch_outline_trig)
+    processor = TextPartProcessor(scraper)
+    processor.cache_dir = tmp_path / "cache"
+    processor.cache_dir.mkdir()
+    processor.fetched = fetched
+    return processor
+
+
+def read_manifest(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_failures_are_isolated(processor, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    ids = ["O2DB80610", "O_MISSING", "O2DB95714", "O_BROKEN"]
+
+    records = processor.process_outlines(ids, output_dir=tmp_path / "out", workers=2, manifest=manifest)
+
+    status = {record["id"]: record["status"] for record in records}
+    assert status == {"O2DB80610": "ok", "O_MISSING": "error", "O2DB95714": "ok", "O_BROKEN": "error"}
+    assert read_manifest(manifest) == records
+    assert (tmp_path / "out" / "O2DB80610.json").exists()
+    ok = next(record for record in records if record["id"] == "O2DB95714")
+    assert ok["output"] == str(tmp_path / "out" / "O2DB95714.json")
+    assert ok["seconds"] >= 0
+    assert "ValueError" in next(r["error"] for r in records if r["id"] == "O_MISSING")
+
+
+def test_resume_skips_processed_ids(processor, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    processor.process_outlines(["O2DB95714", "O_MISSING"], manifest=manifest)
+    # a line cut short by a crash is ignored
+    with open(manifest, "a", encoding="utf-8") as f:
+        f.write('{"id": "O2DB80610", "sta')
+    processor.fetched.clear()
+
+    records = processor.process_outlines(["O2DB95714", "O_MISSING", "O2DB80610"], manifest=manifest, resume=True)
+
+    assert sorted(processor.fetched) == ["O2DB80610", "O_MISSING"]
+    assert {record["id"] for record in records} == {"O2DB80610", "O_MISSING"}
+
+
+def test_rerun_without_resume_reports_unchanged(processor, tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    processor.process_outlines(["O2DB95714"], manifest=manifest)
+
+    records = processor.process_outlines(["O2DB95714"], manifest=manifest, resume=False)
+
+    assert [record["status"] for record in records] == ["unchanged"]
+
+
+def test_rerun_with_defaults_fetches_again(processor):
+    processor.process_outlines(["O2DB95714"])
+    processor.fetched.clear()
+
+    records = processor.process_outlines(["O2DB95714"])
+
+    assert processor.fetched == ["O2DB95714"]
+    assert [record["status"] for record in records] == ["unchanged"]
+    assert (processor.cache_dir / "batch_outlines.jsonl").exists()
+
+
+def test_process_instances(processor, tmp_path, monkeypatch):
+    outlines = {"MW21752": ["O2DB95714"], "MW19999": ["O2DB80610", "O_BROKEN"], "MW0": []}
+    monkeypatch.setattr(
+        processor.scraper, "get_outline_of_instance", lambda instance_id, save_metadata=True: outlines[instance_id]
+    )
+
+    records = processor.process_instances(list(outlines), manifest=tmp_path / "manifest.jsonl")
+
+    by_id = {record["id"]: record for record in records}
+    assert by_id["MW21752"]["status"] == "ok"
+    assert by_id["MW21752"]["outputs"] == [str(processor.cache_dir / "O2DB95714_annotations.json")]
+    assert by_id["MW19999"]["status"] == "error"
+    assert by_id["MW0"] == {
+        "id": "MW0", "status": "ok", "outline_ids": [], "outputs": [], "seconds": by_id["MW0"]["seconds"]
+    }
+
+
+def test_write_outline_reports_the_output_file(processor, tmp_path):
+    output, unchanged = processor.write_outline("O2DB95714")
+
+    assert output == processor.cache_dir / "O2DB95714_annotations.json"
+    assert not unchanged
+    assert json.loads(output.read_text(encoding="utf-8"))["annotations"]
+
+    output, unchanged = processor.write_outline("O2DB95714", tmp_path / "out")
+
+    assert output == tmp_path / "out" / "O2DB95714.json"
+    assert unchanged
+    assert output.exists()
+
+
+def test_outlines_are_converted_in_worker_processes(processor, tmp_path, monkeypatch):
+    def parse_in_batch_process(data):
+        raise AssertionError("outline parsed in the batch's own process")
+
+    monkeypatch.setattr(outline_formatter, "parse_outline_graph", parse_in_batch_process)
+
+    records = processor.process_outlines(["O2DB95714"], manifest=tmp_path / "manifest.jsonl")
+
+    assert records[0]["status"] == "ok"
+    assert (processor.cache_dir / "O2DB95714_annotations.json").exists()
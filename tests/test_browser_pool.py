@@ -0,0 +1,273 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from search_bdrc import BdrcScraper, browser_pool
+from search_bdrc.rate_limit import RateLimiter, ThrottledError
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = None
+
+    def goto(self, url, wait_until=None):
+        self.browser.wait_until.append(wait_until)
+        if self.browser.crash_next:
+            self.browser.crash_next = False
+            self.browser.connected = False
+            raise RuntimeError("Target closed")
+        self.url = url
+        return self.browser.response
+
+    def wait_for_selector(self, selector, timeout=None):
+        self.browser.wait_until.append(selector)
+
+    def content(self):
+        return f"<html>{self.url}</html>"
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.route_handler = None
+
+    def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def new_page(self):
+        return FakePage(self.browser)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.crash_next = False
+        self.response = None
+        self.contexts = []
+        self.wait_until = []
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launched = []
+        self.chromium = self
+
+    def launch(self, headless=True):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    fake = FakePlaywright()
+    browser_pool.close_browser()
+    monkeypatch.setattr(browser_pool, "sync_playwright", lambda: fake)
+    yield fake
+    browser_pool.close_browser()
+
+
+def test_browser_is_reused_across_pages(fake_playwright):
+    for page_no in range(3):
+        content = browser_pool.fetch_page_content(f"http://test/{page_no}")
+        assert content == f"<html>http://test/{page_no}</html>"
+
+    assert len(fake_playwright.launched) == 1
+    contexts = fake_playwright.launched[0].contexts
+    assert len(contexts) == 3
+    assert all(context.closed for context in contexts)
+
+
+def test_browser_is_relaunched_after_crash(fake_playwright):
+    browser_pool.fetch_page_content("http://test/1")
+    fake_playwright.launched[0].crash_next = True
+
+    content = browser_pool.fetch_page_content("http://test/2")
+
+    assert content == "<html>http://test/2</html>"
+    assert len(fake_playwright.launched) == 2
+
+
+def test_throttled_page_backs_off_the_limiter(fake_playwright, monkeypatch):
+    limiter = RateLimiter(rate=10)
+    monkeypatch.setattr(browser_pool._state, "limiter", limiter)
+    browser_pool.fetch_page_content("http://test/1")
+    fake_playwright.launched[0].response = Mock(status=429, headers={"retry-after": "30"})
+
+    with pytest.raises(ThrottledError) as raised:
+        browser_pool.fetch_page_content("http://test/2")
+
+    assert raised.value.status == 429
+    state = limiter.state("test")
+    assert state["rate"] < 10
+    assert state["in_flight"] == 0
+    assert state["blocked_for"] > 25
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = Mock(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = "abort"
+
+    def continue_(self):
+        self.outcome = "continue"
+
+
+def test_fast_mode_blocks_assets_and_waits_for_results(fake_playwright):
+    settings = browser_pool.ScrapeSettings(fast=True)
+
+    browser_pool.fetch_page_content("http://test/1", settings)
+
+    browser = fake_playwright.launched[0]
+    assert browser.wait_until == ["domcontentloaded", settings.ready_selector]
+    handler = browser.contexts[0].route_handler
+    routes = {
+        "image": FakeRoute("image", "http://test/logo.png"),
+        "document": FakeRoute("document", "http://test/1"),
+        "script": FakeRoute("script", "http://test/app.js"),
+        "analytics": FakeRoute("script", "https://www.google-analytics.com/analytics.js"),
+    }
+    for route in routes.values():
+        handler(route)
+    assert {name: route.outcome for name, route in routes.items()} == {
+        "image": "abort",
+        "document": "continue",
+        "script": "continue",
+        "analytics": "abort",
+    }
+
+
+def test_default_mode_waits_for_network_idle(fake_playwright):
+    browser_pool.fetch_page_content("http://test/1")
+
+    browser = fake_playwright.launched[0]
+    assert browser.wait_until == ["networkidle"]
+    assert browser.contexts[0].route_handler is None
+
+
+def test_scrape_uses_persistent_browser(fake_playwright):
+    scraper = BdrcScraper()
+    page_no, content = BdrcScraper.scrape((scraper.search_url("query", 2), 2))
+    assert page_no == 2
+    assert "page=2" in content
+
+    BdrcScraper.scrape((scraper.search_url("query", 3), 3))
+    assert len(fake_playwright.launched) == 1
+
+
+class FakeAsyncPage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = None
+
+    async def goto(self, url, wait_until=None):
+        self.browser.open_pages += 1
+        self.browser.peak_pages = max(self.browser.peak_pages, self.browser.open_pages)
+        await asyncio.sleep(0.01)
+        self.browser.open_pages -= 1
+        self.url = url
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+
+class FakeAsyncContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return FakeAsyncPage(self.browser)
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncBrowser:
+    def __init__(self):
+        self.open_pages = 0
+        self.peak_pages = 0
+
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        return FakeAsyncContext(self)
+
+    async def close(self):
+        pass
+
+
+class FakeAsyncPlaywright:
+    def __init__(self):
+        self.launched = []
+        self.chromium = self
+
+    async def launch(self, headless=True):
+        browser = FakeAsyncBrowser()
+        self.launched.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        pass
+
+
+def test_arun_scrape_shares_browsers(monkeypatch):
+    fake = FakeAsyncPlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: fake)
+
+    res = asyncio.run(BdrcScraper().arun_scrape("query", 10, concurrency=4, browsers=2))
+
+    assert sorted(res) == list(range(1, 11))
+    assert "page=7" in res[7]
+    assert len(fake.launched) == 2
+    assert sum(browser.peak_pages for browser in fake.launched) <= 4
+
+
+def test_cancelled_page_load_frees_its_slot_without_backing_off(monkeypatch):
+    fake = FakeAsyncPlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: fake)
+    limiter = RateLimiter(rate=4, concurrency=4, cooldown=0)
+
+    async def load_and_cancel():
+        async with browser_pool.AsyncBrowserPool(browsers=1, limiter=limiter) as pool:
+            task = asyncio.create_task(pool.fetch_page_content("http://test/1"))
+            await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(load_and_cancel())
+
+    state = limiter.state("test")
+    assert state["in_flight"] == 0
+    assert state["rate"] == 4
+    assert state["concurrency"] == 4
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from benchmarks.replay_server import ReplayServer
+from search_bdrc import BdrcScraper
+from search_bdrc.cli import BatchRunner, JobError, main, parse_job
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    with ReplayServer(outline_parts=30, fanout=4) as server:
+        monkeypatch.setattr(BdrcScraper, "TTL_URL", f"{server.url}/resource/{{resource_id}}.ttl")
+        monkeypatch.setattr(BdrcScraper, "TRIG_URL", f"{server.url}/graph/{{outline_id}}.trig")
+        yield server
+
+
+def test_parse_job():
+    assert parse_job('{"op": "instance_works", "id": "MW1"}\n', None) == {"op": "instance_works", "id": "MW1"}
+    assert parse_job("MW1\n", "instance_outlines") == {"id": "MW1", "op": "instance_outlines"}
+    assert parse_job('"MW1"', "instance_outlines") == {"id": "MW1", "op": "instance_outlines"}
+    assert parse_job('{"op": "search", "query": "q", "pages": 2}', None)["pages"] == 2
+    bad_jobs = (("MW1", None), ('{"op": "search"}', None), ("[1]", "instance_works"), ('{"op": "x", "id": 1}', None))
+    for line, op in bad_jobs:
+        with pytest.raises(JobError):
+            parse_job(line, op)
+
+
+def test_runner_streams_results(server):
+    lines = [
+        '{"op": "instance_works", "id": "MW23703"}\n',
+        "\n",
+        "MW0CLI\n",
+        '{"op": "outline_annotations", "id": "OMW0CLI"}\n',
+        '{"op": "nope", "id": "MW1"}\n',
+    ]
+
+    records = sorted(BatchRunner(BdrcScraper(), workers=2).run(lines, "instance_outlines"), key=lambda r: r["line"])
+
+    assert [(r["line"], r["status"]) for r in records] == [(1, "ok"), (3, "ok"), (4, "ok"), (5, "error")]
+    assert records[0]["result"] == ["WA0BC002"]
+    assert records[1] == {**records[1], "op": "instance_outlines", "id": "MW0CLI", "result": ["OMW0CLI"]}
+    assert records[2]["result"] == {"unchanged": False, "output": "cache/OMW0CLI_annotations.json"}
+    assert "Unknown op 'nope'" in records[3]["error"]
+
+
+def test_main_reads_and_writes_jsonl(server, tmp_path, capsys):
+    jobs = tmp_path / "jobs.jsonl"
+    jobs.write_text("OMW0A\nOMW0B\n", encoding="utf-8")
+    results = tmp_path / "results.jsonl"
+    metrics = tmp_path / "metrics.json"
+
+    code = main([str(jobs), "-o", str(results), "--op", "outline_annotations",
+                 "--output-dir", str(tmp_path / "out"), "--metrics", str(metrics)])
+
+    records = [json.loads(line) for line in results.read_text(encoding="utf-8").splitlines()]
+    assert code == 0
+    assert sorted(r["id"] for r in records) == ["OMW0A", "OMW0B"]
+    assert all(r["status"] == "ok" for r in records)
+    assert (tmp_path / "out" / "OMW0A.json").exists()
+    assert capsys.readouterr().out == ""
+    counters = {c["name"]: c["value"] for c in json.loads(metrics.read_text(encoding="utf-8"))["counters"]}
+    assert counters["text_parts"] == 60
+
+
+def test_search_jobs_share_one_spawned_browser_pool(monkeypatch):
+    from contextlib import contextmanager
+
+    from search_bdrc import browser_pool
+
+    started = []
+
+    class FakePool:
+        def imap_unordered(self, func, iterable):
+            for args in iterable:
+                page_no = args[1]
+                yield page_no, [f"MW{page_no}"] if page_no <= 2 else []
+
+    @contextmanager
+    def fake_browser_worker_pool(processes, settings=None, limiter=None, start_method=None):
+        started.append((processes, start_method))
+        yield FakePool()
+
+    monkeypatch.setattr(browser_pool, "browser_worker_pool", fake_browser_worker_pool)
+    scraper = BdrcScraper()
+    runner = BatchRunner(scraper, workers=4, processes=3)
+    lines = [json.dumps({"op": "search", "query": q}) for q in ("a", "b", "c")]
+
+    records = list(runner.run(lines))
+    runner.close()
+
+    assert [r["status"] for r in records] == ["ok"] * 3
+    assert all(sorted(r["result"]) == ["MW1", "MW2"] for r in records)
+    assert started == [(3, "spawn")]
+    assert scraper.worker_pool is None
@@ -0,0 +1,190 @@
+import hashlib
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from search_bdrc import BdrcScraper
+from search_bdrc import etext_download
+from search_bdrc.etext_download import download_file, download_instance_etexts
+
+VOLUMES = {
+    "UT1_001": ("ཀ་ཁ་ག་ང་།\n" * 5000).encode("utf-8"),
+    "UT1_002": ("བཀྲ་ཤིས་བདེ་ལེགས།\n" * 3000).encode("utf-8"),
+    "UT1_003": b"short volume\n",
+}
+
+
+@pytest.fixture
+def etext_server():
+    """Range-capable file server; `drops` cuts the next responses short."""
+    state = {"requests": [], "drops": 0, "short": 0, "ranges": True}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            name = self.path.strip("/").removesuffix(".txt")
+            body = VOLUMES.get(name)
+            state["requests"].append((name, self.headers.get("Range")))
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            match = re.match(r"bytes=(\d+)-", self.headers.get("Range") or "")
+            start = int(match.group(1)) if match and state["ranges"] else 0
+            if start >= len(body) and match:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if match and state["ranges"]:
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+            else:
+                self.send_response(200)
+            if state["short"]:
+                state["short"] -= 1
+                # end the response early without an error
+                end = start + (len(body) - start) // 3
+                self.send_header("Content-Length", str(end - start))
+                self.end_headers()
+                self.wfile.write(body[start:end])
+                return
+            self.send_header("Content-Length", str(len(body) - start))
+            self.end_headers()
+            if state["drops"]:
+                state["drops"] -= 1
+                # send part of the body, then drop the connection
+                self.wfile.write(body[start:start + (len(body) - start) // 3])
+                self.wfile.flush()
+                self.close_connection = True
+                return
+            self.wfile.write(body[start:])
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+    server.server_close()
+
+
+def test_dropped_connection_is_resumed(etext_server, tmp_path):
+    url, state = etext_server
+    state["drops"] = 2
+    body = VOLUMES["UT1_001"]
+
+    path = download_file(
+        f"{url}/UT1_001.txt", tmp_path / "UT1_001.txt", sha256=hashlib.sha256(body).hexdigest(), chunk_size=1024
+    )
+
+    assert path.read_bytes() == body
+    assert not (tmp_path / "UT1_001.txt.part").exists()
+    ranges = [header for _, header in state["requests"]]
+    assert ranges[0] is None
+    assert all(header.startswith("bytes=") for header in ranges[1:])
+    assert len(ranges) == 3
+
+
+def test_partial_file_is_resumed(etext_server, tmp_path):
+    url, state = etext_server
+    body = VOLUMES["UT1_002"]
+    (tmp_path / "UT1_002.txt.part").write_bytes(body[:1000])
+
+    download_file(f"{url}/UT1_002.txt", tmp_path / "UT1_002.txt", size=len(body))
+
+    assert (tmp_path / "UT1_002.txt").read_bytes() == body
+    assert state["requests"] == [("UT1_002", "bytes=1000-")]
+
+
+def test_short_last_attempt_is_kept_for_resuming(etext_server, tmp_path):
+    url, state = etext_server
+    state["short"] = 1
+    body = VOLUMES["UT1_002"]
+
+    with pytest.raises(IOError):
+        download_file(f"{url}/UT1_002.txt", tmp_path / "UT1_002.txt", size=len(body), retries=0)
+    assert (tmp_path / "UT1_002.txt.part").stat().st_size == len(body) // 3
+
+    download_file(f"{url}/UT1_002.txt", tmp_path / "UT1_002.txt", size=len(body), retries=0)
+
+    assert (tmp_path / "UT1_002.txt").read_bytes() == body
+    assert state["requests"][-1] == ("UT1_002", f"bytes={len(body) // 3}-")
+
+
+def test_server_without_ranges_restarts(etext_server, tmp_path):
+    url, state = etext_server
+    state["ranges"] = False
+    body = VOLUMES["UT1_002"]
+    (tmp_path / "UT1_002.txt.part").write_bytes(b"stale data")
+
+    download_file(f"{url}/UT1_002.txt", tmp_path / "UT1_002.txt")
+
+    assert (tmp_path / "UT1_002.txt").read_bytes() == body
+
+
+def test_complete_part_file_and_existing_file(etext_server, tmp_path):
+    url, state = etext_server
+    body = VOLUMES["UT1_003"]
+    (tmp_path / "UT1_003.txt.part").write_bytes(body)
+
+    download_file(f"{url}/UT1_003.txt", tmp_path / "UT1_003.txt")
+    download_file(f"{url}/UT1_003.txt", tmp_path / "UT1_003.txt", size=len(body))
+
+    assert (tmp_path / "UT1_003.txt").read_bytes() == body
+    assert state["requests"] == [("UT1_003", f"bytes={len(body)}-")]
+
+
+def test_hash_mismatch_raises(etext_server, tmp_path):
+    url, _ = etext_server
+
+    with pytest.raises(IOError):
+        download_file(f"{url}/UT1_003.txt", tmp_path / "UT1_003.txt", sha256="0" * 64)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_instance_etexts(etext_server, tmp_path, monkeypatch):
+    url, _ = etext_server
+    scraper = BdrcScraper()
+    linked = {
+        ("MW1", etext_download.BDO_INSTANCE_HAS_REPRODUCTION): ["W1", "IE1"],
+        ("IE1", etext_download.BDO_ETEXT_RESOURCE): [],
+        ("IE1", etext_download.BDO_INSTANCE_HAS_VOLUME): ["VL1", "VL2"],
+        ("VL1", etext_download.BDO_ETEXT_RESOURCE): ["UT1_002", "UT1_001"],
+        ("VL2", etext_download.BDO_ETEXT_RESOURCE): ["UT1_003", "UT1_404"],
+    }
+    monkeypatch.setattr(scraper, "get_linked_ids", lambda resource_id, predicate: linked.get((resource_id, predicate)))
+
+    results = dict(download_instance_etexts(
+        "MW1", output_dir=tmp_path, workers=3, scraper=scraper, url_template=url + "/{etext_id}.txt"
+    ))
+
+    assert sorted(results) == ["UT1_001", "UT1_002", "UT1_003", "UT1_404"]
+    for etext_id in ("UT1_001", "UT1_002", "UT1_003"):
+        assert results[etext_id] == tmp_path / "MW1" / f"{etext_id}.txt"
+        assert results[etext_id].read_bytes() == VOLUMES[etext_id]
+    assert isinstance(results["UT1_404"], IOError)
+
+
+def test_text_of_instance_joins_volumes_in_volume_order(tmp_path, monkeypatch):
+    volumes = ["UT1_9", "UT1_10"]
+    for etext_id in volumes:
+        (tmp_path / f"{etext_id}.txt").write_text(etext_id, encoding="utf-8")
+    monkeypatch.setattr(etext_download, "list_etext_volumes", lambda instance_id, scraper: volumes)
+
+    def download_instance_etexts(instance_id, scraper, etext_ids):
+        # completion order differs from volume order
+        for etext_id in reversed(etext_ids):
+            yield etext_id, tmp_path / f"{etext_id}.txt"
+
+    monkeypatch.setattr(etext_download, "download_instance_etexts", download_instance_etexts)
+
+    assert etext_download.get_text_from_instance_id("MW1") == "UT1_9\nUT1_10"
@@ -0,0 +1,60 @@
+import os
+import random
+
+import pytest
+
+from search_bdrc.etext_reader import EtextReader
+
+TEXT = "".join(
+    random.Random(0).choice(["ཀ", "ྐ", "་", "།", "a", " ", "\n", "é", "𝄞", "བཀྲ་ཤིས་"]) for _ in range(5000)
+)
+
+
+@pytest.fixture
+def etext(tmp_path):
+    path = tmp_path / "UT1_001.txt"
+    path.write_bytes(TEXT.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("block_bytes", [1, 7, 64, 16384])
+def test_spans_match_decoded_text(etext, block_bytes):
+    rng = random.Random(block_bytes)
+    with EtextReader(etext, block_bytes=block_bytes, cache_index=False) as reader:
+        assert len(reader) == len(TEXT)
+        for _ in range(300):
+            start = rng.randrange(-5, len(TEXT) + 5)
+            end = start + rng.randrange(0, 200)
+            assert reader.read(start, end) == TEXT[max(start, 0):end]
+        assert reader.read(0, len(TEXT)) == TEXT
+
+
+def test_index_is_cached_and_invalidated(etext, monkeypatch):
+    with EtextReader(etext, block_bytes=64) as reader:
+        first = reader.read(100, 200)
+    assert (etext.parent / "UT1_001.txt.charidx.json").exists()
+
+    def fail(self):
+        raise AssertionError("index rebuilt")
+
+    with monkeypatch.context() as m:
+        m.setattr(EtextReader, "_build_index", fail)
+        with EtextReader(etext, block_bytes=64) as reader:
+            assert reader.read(100, 200) == first
+
+    etext.write_bytes(("ཀ" * 10).encode("utf-8"))
+    os.utime(etext, ns=(0, 0))
+    with EtextReader(etext, block_bytes=64) as reader:
+        assert reader.read(0, 100) == "ཀ" * 10
+
+
+def test_annotations_and_empty_file(tmp_path, etext):
+    with EtextReader(etext) as reader:
+        annotations = [{"start_position": 1, "end_position": 11}, {"start_position": 11, "end_position": 30}]
+        assert list(reader.iter_annotations(annotations)) == [TEXT[1:11], TEXT[11:30]]
+
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    with EtextReader(empty) as reader:
+        assert len(reader) == 0
+        assert reader.read(0, 10) == ""
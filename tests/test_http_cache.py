@@ -0,0 +1,107 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from search_bdrc import BdrcScraper
+from search_bdrc.http_cache import HttpCache
+
+TURTLE = b"""
+@prefix bdo: <http://purl.bdrc.io/ontology/core/> .
+<http://purl.bdrc.io/resource/MW1> bdo:instanceOf <http://purl.bdrc.io/resource/WA1> .
+"""
+
+
+def make_response(status_code=200, content=TURTLE, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.content = content
+    response.text = content.decode()
+    response.headers = headers or {"Content-Type": "text/turtle", "ETag": '"v1"'}
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(tmp_path / "http", ttl=60)
+
+
+def test_fresh_entry_is_served_without_network(cache):
+    get = Mock(return_value=make_response())
+
+    first = cache.fetch("http://test/MW1.ttl", {"Accept": "text/turtle"}, get=get)
+    second = cache.fetch("http://test/MW1.ttl", {"Accept": "text/turtle"}, get=get)
+
+    assert first.status_code == second.status_code == 200
+    assert second.from_cache
+    assert second.text == TURTLE.decode()
+    get.assert_called_once()
+    assert cache.stats["hits"] == 1
+
+
+def test_accept_header_is_part_of_the_key(cache):
+    get = Mock(return_value=make_response())
+
+    cache.fetch("http://test/MW1", {"Accept": "text/turtle"}, get=get)
+    cache.fetch("http://test/MW1", {"Accept": "application/ld+json"}, get=get)
+
+    assert get.call_count == 2
+
+
+def test_stale_entry_is_revalidated(cache):
+    cache.ttl = 0
+    get = Mock(return_value=make_response())
+    cache.fetch("http://test/MW1.ttl", {"Accept": "text/turtle"}, get=get)
+
+    get.return_value = make_response(status_code=304, content=b"")
+    response = cache.fetch("http://test/MW1.ttl", {"Accept": "text/turtle"}, get=get)
+
+    assert response.status_code == 200
+    assert response.content == TURTLE
+    assert get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    assert cache.stats["revalidated"] == 1
+
+
+def test_errors_are_not_cached(cache):
+    get = Mock(return_value=make_response(status_code=500))
+
+    cache.fetch("http://test/MW1.ttl", get=get)
+    cache.fetch("http://test/MW1.ttl", get=get)
+
+    assert get.call_count == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HttpCache(tmp_path / "http", ttl=60, max_bytes=len(TURTLE) * 2)
+    get = Mock(return_value=make_response())
+    for name in ("a", "b"):
+        cache.fetch(f"http://test/{name}", get=get)
+    # touch "a" so that "b" becomes the least recently used entry
+    cache.fetch("http://test/a", get=get)
+    cache.fetch("http://test/c", get=get)
+
+    assert cache.stats["evictions"] == 1
+    get.reset_mock()
+    cache.fetch("http://test/a", get=get)
+    cache.fetch("http://test/c", get=get)
+    get.assert_not_called()
+    cache.fetch("http://test/b", get=get)
+    get.assert_called_once()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    get = Mock(return_value=make_response())
+    HttpCache(tmp_path / "http").fetch("http://test/MW1.ttl", get=get)
+
+    response = HttpCache(tmp_path / "http").fetch("http://test/MW1.ttl", get=get)
+
+    assert response.from_cache
+    get.assert_called_once()
+
+
+def test_scraper_metadata_goes_through_cache(cache):
+    scraper = BdrcScraper(http_cache=cache)
+    with patch.object(scraper.session, "get", return_value=make_response()) as mock_get:
+        assert scraper.get_work_of_instance("MW1") == ["WA1"]
+        assert scraper.get_work_of_instance("MW1") == ["WA1"]
+
+    mock_get.assert_called_once()
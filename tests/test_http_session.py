@@ -0,0 +1,62 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from search_bdrc import BdrcScraper
+from search_bdrc.http_session import create_session
+
+
+@pytest.fixture
+def flaky_server():
+    """Server answering 503 to the first two requests for each path."""
+    seen = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            seen[self.path] = seen.get(self.path, 0) + 1
+            status, body = (503, b"busy") if seen[self.path] <= 2 else (200, b"ok")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_retries_server_errors(flaky_server):
+    url, seen = flaky_server
+    session = create_session(retries=3, backoff_factor=0)
+
+    response = session.get(f"{url}/resource/MW1.ttl", timeout=5)
+
+    assert response.status_code == 200
+    assert seen["/resource/MW1.ttl"] == 3
+
+
+def test_session_gives_up_after_retries(flaky_server):
+    url, seen = flaky_server
+    session = create_session(retries=1, backoff_factor=0)
+
+    response = session.get(f"{url}/resource/MW2.ttl", timeout=5)
+
+    assert response.status_code == 503
+    assert seen["/resource/MW2.ttl"] == 2
+
+
+def test_scraper_owns_one_session():
+    scraper = BdrcScraper()
+    adapter = scraper.session.get_adapter("https://purl.bdrc.io/")
+
+    assert adapter is scraper.session.get_adapter("https://ldspdi-dev.bdrc.io/")
+    assert adapter.max_retries.total > 0
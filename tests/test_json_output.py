@@ -0,0 +1,76 @@
+import json
+import threading
+
+import pytest
+
+from search_bdrc.json_output import iter_json_chunks, write_json
+
+DOCUMENTS = [
+    {},
+    {"text": {"title": "ཀ \"quoted\"\nline", "content": "___"}, "annotations": []},
+    {
+        "text": {"title": "t", "content": ""},
+        "annotations": [
+            {"name": None, "meta": {"titles": [], "location": {"page": 1}, "level": 2}},
+            {"name": "b", "meta": {"titles": [{"id": "TT1", "label": "x"}], "location": None}},
+        ],
+    },
+    {"a": [], "b": [[1, 2], {}], "c": 1.5},
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_chunks_match_json_dumps(document):
+    assert "".join(iter_json_chunks(document)) == json.dumps(document, ensure_ascii=False, indent=4)
+    assert "".join(iter_json_chunks(document, indent=2)) == json.dumps(document, ensure_ascii=False, indent=2)
+    assert "".join(iter_json_chunks(document, indent=None)) == json.dumps(
+        document, ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def test_write_json_streams_generator_to_all_paths(tmp_path):
+    annotations = ({"start_position": i} for i in range(3))
+    paths = [tmp_path / "a.json", tmp_path / "b.json"]
+
+    write_json({"text": {}, "annotations": annotations}, paths)
+
+    expected = json.dumps({"text": {}, "annotations": [{"start_position": i} for i in range(3)]}, indent=4)
+    assert [path.read_text(encoding="utf-8") for path in paths] == [expected, expected]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "b.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text("previous")
+
+    def annotations():
+        yield {"start_position": 1}
+        raise RuntimeError("conversion failed")
+
+    with pytest.raises(RuntimeError):
+        write_json({"annotations": annotations()}, [path])
+
+    assert path.read_text() == "previous"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_concurrent_writes_to_one_path(tmp_path):
+    path = tmp_path / "out.json"
+    errors = []
+
+    def write(n):
+        try:
+            for _ in range(20):
+                write_json({"text": {"n": n}, "annotations": list(range(200))}, [path])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert json.loads(path.read_text(encoding="utf-8"))["annotations"] == list(range(200))
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import search_bdrc
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def run_isolated(code: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    ).stdout
+    return json.loads(out)
+
+
+def test_scraper_import_loads_no_heavy_dependency():
+    result = run_isolated(
+        "import json, logging, sys\n"
+        "from search_bdrc import BdrcScraper, ScrapeSettings\n"
+        "BdrcScraper(session=object()).search_url('x', 1)\n"
+        "heavy = ['playwright', 'rdflib', 'requests', 'tqdm', 'multiprocessing.pool', 'asyncio']\n"
+        "print(json.dumps({'loaded': [m for m in heavy if m in sys.modules],"
+        " 'handlers': len(logging.getLogger().handlers)}))"
+    )
+
+    assert result == {"loaded": [], "handlers": 0}
+
+
+def test_importing_modules_configures_no_logging():
+    result = run_isolated(
+        "import json, logging\n"
+        "import search_bdrc.outline_formatter, search_bdrc.etext_download\n"
+        "print(json.dumps({'handlers': len(logging.getLogger().handlers)}))"
+    )
+
+    assert result == {"handlers": 0}
+
+
+def test_lazy_attributes():
+    from search_bdrc.scraper import BdrcScraper
+
+    assert search_bdrc.BdrcScraper is BdrcScraper
+    assert "TextPartProcessor" in dir(search_bdrc)
+    with pytest.raises(AttributeError):
+        search_bdrc.NoSuchThing
@@ -24,7 +24,7 @@ def scraper():
 
 class TestMetadataFunctions:
     def test_get_instance_metadata_success(self, scraper):
-        with patch('requests.get') as mock_get:
+        with patch.object(scraper.session, 'get') as mock_get:
             # Mock successful response
             mock_response = Mock()
             mock_response.status_code = 200
@@ -40,11 +40,12 @@ class TestMetadataFunctions:
             assert isinstance(result, Graph)
             mock_get.assert_called_once_with(
                 "https://ldspdi-dev.bdrc.io/resource/TEST123.ttl",
-                headers={"Accept": "text/turtle"}
+                headers={"Accept": "text/turtle"},
+                timeout=scraper.timeout
             )
 
     def test_get_instance_metadata_failure(self, scraper):
-        with patch('requests.get') as mock_get:
+        with patch.object(scraper.session, 'get') as mock_get:
             # Mock failed response
             mock_response = Mock()
             mock_response.status_code = 404
@@ -56,7 +57,7 @@ class TestMetadataFunctions:
             mock_get.assert_called_once()
 
     def test_get_instance_metadata_json_success(self, scraper):
-        with patch('requests.get') as mock_get:
+        with patch.object(scraper.session, 'get') as mock_get:
             # Mock successful JSON response
             mock_response = Mock()
             mock_response.status_code = 200
@@ -68,7 +69,8 @@ class TestMetadataFunctions:
             assert result == {"test": "data"}
             mock_get.assert_called_once_with(
                 "https://purl.bdrc.io/resource/TEST123.jsonld",
-                headers={"Accept": "application/ld+json"}
+                headers={"Accept": "application/ld+json"},
+                timeout=scraper.timeout
             )
 
     def test_get_outline_of_instance_success(self, scraper, mock_metadata_graph, tmp_path):
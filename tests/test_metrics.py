@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from benchmarks.replay_server import ReplayServer
+from search_bdrc import BdrcScraper
+from search_bdrc.http_cache import HttpCache
+from search_bdrc.metrics import NULL_METRICS, Metrics
+from search_bdrc.outline_formatter import TextPartProcessor
+
+
+def test_timings_and_counters():
+    metrics = Metrics()
+    for seconds in (0.5, 0.25, 1.0):
+        metrics.observe("parse", seconds, format="trig")
+    metrics.count("http_bytes", 100, endpoint="ttl")
+    metrics.count("http_bytes", 50, endpoint="ttl")
+    with pytest.raises(KeyError):
+        with metrics.stage("convert_annotations"):
+            raise KeyError("part")
+
+    summary = metrics.summary()
+
+    parse, failed = summary["timings"][1], summary["timings"][0]
+    assert parse == {
+        "name": "parse", "labels": {"format": "trig"}, "count": 3,
+        "total_s": 1.75, "mean_s": 1.75 / 3, "min_s": 0.25, "max_s": 1.0,
+    }
+    assert failed["name"] == "convert_annotations" and failed["labels"] == {"error": "KeyError"}
+    assert summary["counters"] == [{"name": "http_bytes", "labels": {"endpoint": "ttl"}, "value": 150}]
+    assert json.loads(metrics.to_json()) == summary
+
+
+def test_prometheus_text():
+    metrics = Metrics()
+    metrics.observe("parse", 0.5, format="trig")
+    metrics.observe("parse", 1.5, format="turtle")
+    metrics.count("outlines", status='o"k')
+
+    assert metrics.to_prometheus().splitlines() == [
+        "# TYPE search_bdrc_parse_seconds summary",
+        'search_bdrc_parse_seconds_count{format="trig"} 1',
+        'search_bdrc_parse_seconds_sum{format="trig"} 0.5',
+        'search_bdrc_parse_seconds_count{format="turtle"} 1',
+        'search_bdrc_parse_seconds_sum{format="turtle"} 1.5',
+        "# TYPE search_bdrc_parse_seconds_max gauge",
+        'search_bdrc_parse_seconds_max{format="trig"} 0.5',
+        'search_bdrc_parse_seconds_max{format="turtle"} 1.5',
+        "# TYPE search_bdrc_outlines_total counter",
+        'search_bdrc_outlines_total{status="o\\"k"} 1',
+    ]
+
+
+def test_scraper_records_nothing_by_default():
+    scraper = BdrcScraper()
+
+    assert scraper.metrics is NULL_METRICS
+    assert TextPartProcessor(scraper).metrics is NULL_METRICS
+
+
+def test_process_outline_records_stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metrics = Metrics()
+    scraper = BdrcScraper(metrics=metrics, http_cache=HttpCache(tmp_path / "http"))
+    processor = TextPartProcessor(scraper)
+
+    with ReplayServer(outline_parts=40, fanout=4) as server:
+        server.point(scraper)
+        output = processor.process_outline("OMW0METRICS")
+        processor.process_outline("OMW0METRICS")
+        trig = server.body("/graph/OMW0METRICS.trig")
+
+    summary = metrics.summary()
+    timings = {(t["name"], tuple(t["labels"].items())): t["count"] for t in summary["timings"]}
+    counters = {(c["name"], tuple(c["labels"].items())): c["value"] for c in summary["counters"]}
+    assert timings == {
+        ("http", (("endpoint", "trig"),)): 2,
+        ("parse", (("format", "trig"),)): 1,
+        ("extract_text_parts", ()): 1,
+        ("convert_annotations", ()): 1,
+        ("write_json", ()): 1,
+    }
+    assert counters[("http_bytes", (("endpoint", "trig"),))] == 2 * len(trig)
+    assert counters[("http_cache_hits", (("endpoint", "trig"),))] == 1
+    assert counters[("text_parts", ())] == counters[("annotations", ())] == len(output["annotations"]) == 40
+    assert counters[("triples", (("format", "trig"),))] > 40
+    assert counters[("outlines", (("status", "ok"),))] == 1
+    assert counters[("outlines", (("status", "unchanged"),))] == 1
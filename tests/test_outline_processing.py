@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from search_bdrc import BdrcScraper
+from search_bdrc import outline_formatter
+from search_bdrc.outline_formatter import TextPartProcessor, load_annotations, materialize_content
+
+TRIG = Path(__file__).resolve().parent.parent / "outputs" / "trig" / "O2DB95714.trig"
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    scraper = BdrcScraper()
+    trig = {"O2DB95714": TRIG.read_text(encoding="utf-8")}
+    monkeypatch.setattr(scraper, "fetch_outline_trig", lambda outline_id: trig.get(outline_id))
+    parsed = []
+    parse = outline_formatter.parse_outline_graph
+    monkeypatch.setattr(
+        outline_formatter, "parse_outline_graph", lambda data: parsed.append(data) or parse(data)
+    )
+    processor = TextPartProcessor(scraper)
+    processor.cache_dir = tmp_path / "cache"
+    processor.cache_dir.mkdir()
+    processor.trig = trig
+    processor.parsed = parsed
+    return processor
+
+
+def test_unchanged_outline_is_skipped(processor, tmp_path):
+    first = processor.process_outline("O2DB95714")
+    second = processor.process_outline("O2DB95714", output_dir=tmp_path / "outputs")
+
+    assert len(processor.parsed) == 1
+    assert second == json.loads(json.dumps(first))
+    assert (tmp_path / "outputs" / "O2DB95714.json").read_bytes() == (
+        processor.cache_dir / "O2DB95714_annotations.json"
+    ).read_bytes()
+    manifest = json.loads((processor.cache_dir / "O2DB95714_annotations.meta.json").read_text())
+    assert manifest["processing_version"] == outline_formatter.PROCESSING_VERSION
+
+
+def test_changed_outline_is_reprocessed(processor):
+    processor.process_outline("O2DB95714")
+    processor.trig["O2DB95714"] = processor.trig["O2DB95714"].replace("dkar chag", "dkar chag/")
+
+    output = processor.process_outline("O2DB95714")
+
+    assert len(processor.parsed) == 2
+    assert "dkar chag/" in [a["name"] for a in output["annotations"]]
+
+
+def test_unchanged_outline_refreshes_a_stale_output_file(processor, tmp_path):
+    processor.process_outline("O2DB95714", output_dir=tmp_path / "outputs")
+    processor.trig["O2DB95714"] = processor.trig["O2DB95714"].replace("dkar chag", "dkar chag/")
+    # the cache is refreshed by a run without output_dir
+    processor.process_outline("O2DB95714")
+
+    processor.process_outline("O2DB95714", output_dir=tmp_path / "outputs")
+
+    assert len(processor.parsed) == 2
+    assert (tmp_path / "outputs" / "O2DB95714.json").read_bytes() == (
+        processor.cache_dir / "O2DB95714_annotations.json"
+    ).read_bytes()
+
+
+def test_force_and_version_bump_reprocess(processor, monkeypatch):
+    processor.process_outline("O2DB95714")
+    processor.process_outline("O2DB95714", force=True)
+    monkeypatch.setattr(outline_formatter, "PROCESSING_VERSION", "test")
+    processor.process_outline("O2DB95714")
+    processor.process_outline("O2DB95714")
+
+    assert len(processor.parsed) == 3
+
+
+def test_missing_cache_file_is_reprocessed(processor):
+    processor.process_outline("O2DB95714")
+    (processor.cache_dir / "O2DB95714_annotations_full.json").unlink()
+
+    processor.process_outline("O2DB95714")
+
+    assert len(processor.parsed) == 2
+    assert (processor.cache_dir / "O2DB95714_annotations_full.json").exists()
+
+
+def test_missing_outline_raises(processor):
+    with pytest.raises(ValueError):
+        processor.process_outline("O_MISSING")
+
+
+def test_written_files_match_json_dump(processor, tmp_path):
+    output = processor.process_outline("O2DB95714", output_dir=tmp_path / "outputs")
+
+    expected = json.dumps(output, ensure_ascii=False, indent=4).encode("utf-8")
+    assert (processor.cache_dir / "O2DB95714_annotations_full.json").read_bytes() == expected
+    assert (processor.cache_dir / "O2DB95714_annotations.json").read_bytes() == expected
+    assert (tmp_path / "outputs" / "O2DB95714.json").read_bytes() == expected
+
+
+def test_compact_json_mode(processor):
+    output = processor.process_outline("O2DB95714", indent=None)
+
+    written = (processor.cache_dir / "O2DB95714_annotations.json").read_text(encoding="utf-8")
+    assert "\n" not in written
+    assert json.loads(written) == json.loads(json.dumps(output))
+    processor.process_outline("O2DB95714")
+    assert len(processor.parsed) == 2
+
+
+def test_virtual_content_files_materialize_to_default(processor, tmp_path):
+    virtual = processor.process_outline("O2DB95714", virtual_content=True)
+    virtual_file = processor.cache_dir / "O2DB95714_annotations.json"
+    virtual_size = virtual_file.stat().st_size
+    default = processor.process_outline("O2DB95714")
+
+    assert len(processor.parsed) == 2
+    assert virtual["text"]["content"] == ""
+    assert virtual["text"]["content_length"] == len(default["text"]["content"])
+    assert virtual_size < virtual_file.stat().st_size
+    processor.process_outline("O2DB95714", virtual_content=True)
+    assert json.dumps(load_annotations(virtual_file)) == json.dumps(default)
+    assert json.dumps(materialize_content(virtual)) == json.dumps(default)
@@ -0,0 +1,80 @@
+import pytest
+
+from search_bdrc import BdrcScraper
+from search_bdrc.outline_formatter import TextPartProcessor
+from search_bdrc.page_index import PageIndex, VolumePageIndex
+
+
+def volume_text(pages, marker="[{}a]"):
+    return "".join(f"{marker.format(page)}ཀ་ཁ་ {page}\n" for page in pages)
+
+
+@pytest.fixture
+def volumes(tmp_path):
+    texts = {1: volume_text(range(1, 6)), 2: volume_text([1, 2, 2, 3])}
+    paths = []
+    for number, text in texts.items():
+        path = tmp_path / f"UT1_00{number}.txt"
+        path.write_bytes(text.encode("utf-8"))
+        paths.append(path)
+    return texts, paths
+
+
+def test_file_index_matches_text_index(volumes):
+    texts, paths = volumes
+
+    for text, path in zip(texts.values(), paths):
+        from_text = PageIndex.from_text(text)
+        from_file = PageIndex.from_file(path)
+        assert (list(from_file.pages), list(from_file.offsets), from_file.length) == (
+            list(from_text.pages), list(from_text.offsets), from_text.length
+        )
+
+
+def test_page_spans(volumes):
+    texts, _ = volumes
+    index = PageIndex.from_text(texts[1])
+
+    assert texts[1][index.page_start(2):index.page_end(3)] == "[2a]ཀ་ཁ་ 2\n[3a]ཀ་ཁ་ 3\n"
+    assert index.page_start(0) == 0
+    assert index.page_start(9) == index.page_end(5) == len(texts[1])
+
+
+def test_volume_spans(volumes):
+    texts, paths = volumes
+    index = VolumePageIndex.from_files(paths, separator_length=1)
+    joined = texts[1] + "\n" + texts[2]
+
+    assert index.length == len(joined)
+    start, end = index.span({"volume": 2, "page": 2, "endpage": 3})
+    assert joined[start:end] == texts[2][texts[2].index("[2a]"):]
+    start, end = index.span({"volume": 1, "page": 5, "endvolume": 2, "endpage": 1})
+    assert joined[start:end] == "[5a]ཀ་ཁ་ 5\n\n[1a]ཀ་ཁ་ 1\n"
+    assert index.span({"volume": 3, "page": 1}) is None
+    assert index.span({"page": 1}) is None
+    assert index.span(None) is None
+
+
+def test_annotations_are_placed_at_pages(volumes):
+    texts, paths = volumes
+    index = VolumePageIndex.from_files(paths)
+    joined = texts[1] + texts[2]
+    text_parts = [
+        {"id": "A", "label": "a", "part_tree_index": "1", "location": None},
+        {"id": "A1", "label": "a1", "part_tree_index": "1.1", "location": {"volume": 1, "page": 2, "endpage": 2}},
+        {"id": "A2", "label": "a2", "part_tree_index": "1.2", "location": {"volume": 1, "page": 4, "endpage": 5}},
+        {"id": "A3", "label": "a3", "part_tree_index": "1.3", "location": None},
+        {"id": "B", "label": "b", "part_tree_index": "2", "location": {"volume": 2, "page": 1, "endpage": 4}},
+    ]
+
+    output = TextPartProcessor(BdrcScraper())._convert_to_annotation_format(
+        text_parts, content=joined, page_index=index
+    )
+
+    spans = {a["meta"]["id"]: joined[a["start_position"]:a["end_position"]] for a in output["annotations"]}
+    assert spans["A1"] == "[2a]ཀ་ཁ་ 2\n"
+    assert spans["A2"] == "[4a]ཀ་ཁ་ 4\n[5a]ཀ་ཁ་ 5\n"
+    assert spans["A"] == "[2a]ཀ་ཁ་ 2\n[3a]ཀ་ཁ་ 3\n[4a]ཀ་ཁ་ 4\n[5a]ཀ་ཁ་ 5\n"
+    assert spans["A3"] == ""
+    assert spans["B"] == texts[2]
+    assert output["text"]["content"] == joined
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from search_bdrc import BdrcScraper
+from search_bdrc.parsing import extract_instance_fields
+from search_bdrc.pipeline import fetch_and_parse
+
+OUTPUTS = Path(__file__).resolve().parent.parent / "outputs"
+
+
+def fetch_fixture(instance_id):
+    if instance_id == "MW_BAD":
+        raise ConnectionError("connection reset")
+    path = OUTPUTS / f"{instance_id}_metadata.ttl"
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+def test_fetch_and_parse_extracts_fields():
+    ids = ["MW19999", "MW21752", "MW23703", "MW_BAD", "MW_MISSING"]
+
+    results = dict(
+        fetch_and_parse(ids, fetch_fixture, extract_instance_fields, fetch_workers=2, parse_workers=2, queue_size=2)
+    )
+
+    assert set(results) == set(ids)
+    assert results["MW21752"]["outlines"] == ["O2DB95714"]
+    assert isinstance(results["MW_BAD"], ConnectionError)
+    assert results["MW_MISSING"] is None
+
+
+def test_pipeline_matches_sequential_lookup(monkeypatch):
+    scraper = BdrcScraper()
+    monkeypatch.setattr(scraper, "fetch_instance_ttl", fetch_fixture)
+    ids = ["MW19999", "MW21752", "MW23703"]
+
+    results = dict(scraper.get_instance_fields_many(ids, fetch_workers=2, parse_workers=2))
+
+    for instance_id in ids:
+        assert sorted(results[instance_id]["works"]) == sorted(scraper.get_work_of_instance(instance_id))
+
+
+def test_outline_parts_are_extracted_in_workers(monkeypatch):
+    scraper = BdrcScraper()
+    monkeypatch.setattr(
+        scraper, "fetch_outline_trig", lambda outline_id: (OUTPUTS / "trig" / f"{outline_id}.trig").read_text()
+    )
+
+    results = dict(scraper.get_outline_parts_many(["O2DB95714"], parse_workers=1))
+
+    graph = scraper.get_outline_graph("O2DB95714")
+    assert results["O2DB95714"]["text_parts"] == scraper.get_ordered_text_parts(graph)
+    assert results["O2DB95714"]["title"] == scraper.get_page_title(graph)
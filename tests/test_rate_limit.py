@@ -0,0 +1,155 @@
+import multiprocessing
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from search_bdrc.http_session import create_session
+from search_bdrc.rate_limit import RateLimiter, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_bucket_allows_a_burst_then_waits():
+    limiter = RateLimiter(rate=10, burst=2)
+
+    for _ in range(2):
+        limiter.acquire("host")
+        limiter.release("host")
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire("host", timeout=0.01)
+    limiter.acquire("host", timeout=1)
+
+
+def test_concurrency_window():
+    limiter = RateLimiter(concurrency=1)
+    limiter.acquire("host")
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire("host", timeout=0.05)
+    limiter.acquire("other")
+
+    limiter.release("host")
+    limiter.acquire("host", timeout=1)
+
+
+def test_additive_increase_multiplicative_decrease():
+    limiter = RateLimiter(rate=4, concurrency=4, min_rate=1, cooldown=60)
+    limiter.acquire("host")
+    limiter.release("host")
+    increased = limiter.state("host")
+    assert increased["rate"] > 4
+
+    limiter.acquire("host")
+    limiter.release("host", "throttled")
+    limiter.acquire("host", timeout=1)
+    limiter.release("host", "error")
+
+    # The second failure falls in the cooldown of the first
+    state = limiter.state("host")
+    assert state["rate"] == pytest.approx(increased["rate"] / 2)
+    assert state["concurrency"] == 2
+
+
+def test_retry_after_holds_the_host():
+    limiter = RateLimiter()
+    limiter.acquire("host")
+    limiter.release("host", "throttled", retry_after=30)
+
+    assert limiter.state("host")["blocked_for"] > 25
+    with pytest.raises(TimeoutError):
+        limiter.acquire("host", timeout=0.05)
+
+
+def test_cancelled_request_only_frees_its_slot():
+    limiter = RateLimiter(rate=4, concurrency=4, cooldown=0)
+
+    with pytest.raises(KeyboardInterrupt):
+        with limiter.limit("http://host/page"):
+            raise KeyboardInterrupt
+    with pytest.raises(ConnectionError):
+        with limiter.limit("http://other/page"):
+            raise ConnectionError
+
+    assert limiter.state("host") == {"rate": 4, "concurrency": 4, "in_flight": 0, "blocked_for": 0}
+    assert limiter.state("other")["rate"] == 2
+
+
+def _throttle(limiter):
+    limiter.acquire("shared")
+    limiter.release("shared", "throttled")
+
+
+def test_state_is_shared_with_child_processes():
+    limiter = RateLimiter(rate=8)
+    limiter.state("local")
+
+    process = multiprocessing.Process(target=_throttle, args=(limiter,))
+    process.start()
+    process.join(10)
+
+    assert process.exitcode == 0
+    assert limiter.state("shared")["rate"] == 4
+
+
+@pytest.fixture
+def throttling_server():
+    """Server answering 429 with a Retry-After, then 503, then 200 for each path."""
+    seen = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            seen[self.path] = seen.get(self.path, 0) + 1
+            status, body = {1: (429, b"slow down"), 2: (503, b"busy")}.get(seen[self.path], (200, b"ok"))
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_retries_throttled_requests_through_the_limiter(throttling_server):
+    url, seen = throttling_server
+    limiter = RateLimiter(rate=10, cooldown=0)
+    session = create_session(retries=3, backoff_factor=0, rate_limiter=limiter)
+
+    response = session.get(f"{url}/resource/MW1.ttl", timeout=5)
+
+    assert response.status_code == 200
+    assert response.attempts == 3
+    assert seen["/resource/MW1.ttl"] == 3
+    state = limiter.state("127.0.0.1")
+    assert state["rate"] < 10
+    assert state["in_flight"] == 0
+
+
+def test_session_returns_the_last_throttled_response(throttling_server):
+    url, seen = throttling_server
+    session = create_session(retries=1, backoff_factor=0, rate_limiter=RateLimiter())
+
+    response = session.get(f"{url}/resource/MW2.ttl", timeout=5)
+
+    assert response.status_code == 503
+    assert response.attempts == 2
@@ -0,0 +1,144 @@
+import json
+from pathlib import Path
+
+import pytest
+from rdflib import BNode, ConjunctiveGraph, Graph, Literal
+
+from search_bdrc import BDO_HAS_OUTLINE, BDO_INSTANCE_OF, BDO_WORK_HAS_INSTANCE, BdrcScraper
+from search_bdrc.rdf_extract import (
+    extract_local_ids,
+    extract_objects,
+    iter_jsonld_triples,
+    iter_turtle_triples,
+)
+
+OUTPUTS = Path(__file__).resolve().parent.parent / "outputs"
+FIXTURES = sorted(OUTPUTS.glob("*.ttl")) + sorted((OUTPUTS / "trig").glob("*.trig"))
+
+INLINE_TURTLE = """
+@prefix bdo: <http://purl.bdrc.io/ontology/core/> .
+@prefix test: <http://purl.bdrc.io/resource/test_subject> .
+test: bdo:hasOutline <http://purl.bdrc.io/resource/O1234> .
+"""
+
+SYNTAX_TURTLE = r"""
+@base <http://purl.bdrc.io/resource/> .
+PREFIX bdo: <http://purl.bdrc.io/ontology/core/>
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+# a comment with "quotes" and <brackets>
+<MW1> a bdo:Instance ;
+    bdo:instanceOf <WA1>, <WA2> ;
+    bdo:note [ rdfs:label "nested \"note\""@en ; bdo:noteSource <MW2> ] ;
+    bdo:numberOfVolumes 12 ;
+    bdo:ratio 1.5 ;
+    bdo:released true ;
+    bdo:volumes ( <V1> <V2> ) ;
+    rdfs:comment '''multi
+line''' ;
+    rdfs:label "ༀ bstan"@bo-x-ewts .
+[] bdo:hasOutline <O1> .
+"""
+
+
+def rdflib_graph(text: str, trig: bool) -> Graph:
+    graph = ConjunctiveGraph() if trig else Graph()
+    graph.parse(data=text, format="trig" if trig else "turtle")
+    return graph
+
+
+def comparable(triples, literal_datatypes=None):
+    """Triple strings with blank nodes blanked out and literals normalized like rdflib does."""
+    literal_datatypes = literal_datatypes or {}
+    result = set()
+    for s, p, o in triples:
+        s = "_" if isinstance(s, BNode) or str(s).startswith("_:") else str(s)
+        if isinstance(o, Literal):
+            o = str(o)
+        elif isinstance(o, BNode) or str(o).startswith("_:"):
+            o = "_"
+        elif (s, str(p)) in literal_datatypes:
+            o = str(Literal(o, datatype=literal_datatypes[(s, str(p))]))
+        result.add((s, str(p), str(o)))
+    return result
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda path: path.name)
+def test_triples_match_rdflib(path):
+    text = path.read_text(encoding="utf-8")
+    graph = rdflib_graph(text, path.suffix == ".trig")
+    datatypes = {
+        (str(s), str(p)): o.datatype for s, p, o in graph if isinstance(o, Literal) and o.datatype
+    }
+
+    ours = list(iter_turtle_triples(text))
+
+    assert len(ours) == len(graph)
+    assert comparable(ours, datatypes) == comparable(graph)
+
+
+@pytest.mark.parametrize("text", [INLINE_TURTLE, SYNTAX_TURTLE], ids=["inline", "syntax"])
+def test_syntax_matches_rdflib(text):
+    graph = rdflib_graph(text, trig=False)
+
+    assert comparable(iter_turtle_triples(text)) == comparable(graph)
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda path: path.name)
+@pytest.mark.parametrize("predicate", [BDO_INSTANCE_OF, BDO_WORK_HAS_INSTANCE, BDO_HAS_OUTLINE])
+def test_extracted_ids_match_rdflib(path, predicate):
+    text = path.read_text(encoding="utf-8")
+    graph = rdflib_graph(text, path.suffix == ".trig")
+    expected = {str(obj).split("/")[-1] for _, pred, obj in graph if str(pred) == predicate}
+
+    assert set(extract_local_ids(text, predicate)) == expected
+
+
+def test_scraper_fast_path_matches_graph_path(monkeypatch):
+    text = (OUTPUTS / "MW21752_metadata.ttl").read_text(encoding="utf-8")
+    fast = BdrcScraper()
+    slow = BdrcScraper(fast_extract=False)
+    for scraper in (fast, slow):
+        monkeypatch.setattr(scraper, "fetch_instance_ttl", lambda instance_id: text)
+
+    assert sorted(fast.get_work_of_instance("MW21752")) == sorted(slow.get_work_of_instance("MW21752"))
+    assert fast.get_outline_of_instance("MW21752", save_metadata=False) == ["O2DB95714"]
+
+
+def test_jsonld_objects():
+    document = {
+        "@context": "http://context.bdrc.io/context.jsonld",
+        "@graph": [
+            {
+                "id": "bdr:MW1",
+                "type": "Instance",
+                "instanceOf": "bdr:WA1",
+                "hasOutline": {"@id": "bdr:O1"},
+                "prefLabel": {"@value": "bstan", "@language": "bo-x-ewts"},
+            },
+            {"@id": "bdr:WA1", "workHasInstance": ["bdr:MW1", "bdr:MW2"]},
+        ],
+    }
+
+    objects = extract_objects(
+        json.dumps(document), [BDO_INSTANCE_OF, BDO_WORK_HAS_INSTANCE], format="json-ld"
+    )
+
+    assert objects[BDO_INSTANCE_OF] == ["http://purl.bdrc.io/resource/WA1"]
+    assert objects[BDO_WORK_HAS_INSTANCE] == [
+        "http://purl.bdrc.io/resource/MW1",
+        "http://purl.bdrc.io/resource/MW2",
+    ]
+    assert ("http://purl.bdrc.io/resource/MW1", BDO_HAS_OUTLINE, "http://purl.bdrc.io/resource/O1") in set(
+        iter_jsonld_triples(document)
+    )
+
+
+@pytest.mark.parametrize("text", [
+    "@prefix bdo: <http://x/> .\nbdo:a bdo:b",
+    "@prefix ex: <http://x/> .\nex:a ex:p ex:b . ex:c ex:p ex:d",
+    "@prefix ex: <http://x/> .\nex:a ex:p [ ex:q ex:b",
+    "@prefix ex: <http://x/> .\nex:g { ex:a ex:p ex:b .",
+])
+def test_invalid_turtle_raises_value_error(text):
+    with pytest.raises(ValueError):
+        list(iter_turtle_triples(text))
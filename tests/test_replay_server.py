@@ -0,0 +1,21 @@
+from benchmarks.replay_server import RECORDED, ReplayServer
+from search_bdrc import BdrcScraper
+
+
+def test_scraper_reads_recorded_and_synthetic_responses():
+    scraper = BdrcScraper()
+    with ReplayServer(outline_parts=50, fanout=4) as server:
+        server.point(scraper)
+
+        assert scraper.search_url("query", 2) == server.search_url("query", 2)
+        assert scraper.fetch_instance_ttl("MW23703") == (RECORDED / "MW23703_metadata.ttl").read_text(encoding="utf-8")
+        recorded_trig = (RECORDED / "trig" / "O2DB95714.trig").read_text(encoding="utf-8")
+        assert scraper.fetch_outline_trig("O2DB95714") == recorded_trig
+        assert scraper.get_outline_of_instance("MW0BENCH1", save_metadata=False) == ["OMW0BENCH1"]
+        assert len(scraper.get_ordered_text_parts(scraper.get_outline_graph("OMW0BENCH1"))) == 50
+        assert isinstance(scraper.get_instance_metadata("MW0BENCH1", json_format=True), list)
+        assert scraper.fetch_instance_ttl("MW0BENCH1") == server.body("/resource/MW0BENCH1.ttl").decode()
+
+    # the scraper class is left pointing at BDRC
+    assert BdrcScraper().TTL_URL.startswith("https://ldspdi-dev.bdrc.io/")
+    assert BdrcScraper().search_url("query", 2).startswith("https://library.bdrc.io/")
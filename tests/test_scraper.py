@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+
+import pytest
+
+from search_bdrc import browser_pool
+from search_bdrc import BdrcScraper
+
+RESULT_PAGES = 5
+IDS_PER_PAGE = 3
+
+
+def fake_search_page(args):
+    _, page_no = args
+    # Past the last result page the search keeps returning the last page.
+    page_no = min(page_no, RESULT_PAGES)
+    anchors = "".join(
+        f'<a href="/show/bdr:MW{page_no}_{i}?uilang=bo">x</a>' for i in range(IDS_PER_PAGE)
+    )
+    return args[1], f"<html>{anchors}</html>"
+
+
+class FakePool:
+    def __init__(self):
+        self.requested = []
+        self.urls = []
+
+    def imap_unordered(self, func, iterable):
+        for args in iterable:
+            self.requested.append(args[1])
+            self.urls.append(args[0])
+            yield func(args)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+
+    @contextmanager
+    def fake_browser_worker_pool(processes, settings=None, limiter=None):
+        yield pool
+
+    monkeypatch.setattr(browser_pool, "browser_worker_pool", fake_browser_worker_pool)
+    monkeypatch.setattr(BdrcScraper, "scrape", staticmethod(fake_search_page))
+    return pool
+
+
+def test_auto_pagination_stops_when_results_run_dry(fake_pool):
+    scraper = BdrcScraper()
+
+    ids = scraper.get_related_instance_ids("query", processes=2)
+
+    assert len(ids) == RESULT_PAGES * IDS_PER_PAGE
+    assert scraper.result_page_count == RESULT_PAGES
+    # Waves of two pages: 1-2, 3-4, 5-6 where page 6 has nothing new.
+    assert fake_pool.requested == [1, 2, 3, 4, 5, 6]
+
+
+def test_iter_related_instance_ids_yields_new_ids_per_page(fake_pool):
+    scraper = BdrcScraper()
+
+    pages = dict(scraper.iter_related_instance_ids("query", processes=1, max_pages=3))
+
+    assert sorted(pages) == [1, 2, 3]
+    assert sorted(pages[2]) == [f"MW2_{i}" for i in range(IDS_PER_PAGE)]
+
+
+def test_pages_load_from_the_scrapers_search_url(fake_pool):
+    scraper = BdrcScraper()
+    scraper.SEARCH_URL = "http://127.0.0.1:8000/search?q={input}&page={page_no}"
+
+    scraper.get_related_instance_ids("query", 2)
+
+    assert fake_pool.urls == [f"http://127.0.0.1:8000/search?q=query&page={n}" for n in (1, 2)]
+    assert BdrcScraper().search_url("query", 1).startswith("https://library.bdrc.io/")
+
+
+@pytest.mark.parametrize("extract_in_worker", [True, False])
+def test_fixed_page_count_matches_with_and_without_worker_extraction(fake_pool, extract_in_worker):
+    scraper = BdrcScraper()
+
+    ids = scraper.get_related_instance_ids("query", 3, extract_in_worker=extract_in_worker)
+
+    assert sorted(ids) == sorted(f"MW{p}_{i}" for p in range(1, 4) for i in range(IDS_PER_PAGE))
+
+
+def test_scrape_instance_ids_returns_only_ids(monkeypatch):
+    monkeypatch.setattr(BdrcScraper, "scrape", staticmethod(fake_search_page))
+    scraper = BdrcScraper()
+
+    page_no, ids = BdrcScraper.scrape_instance_ids((scraper.search_url("query", 2), 2, scraper.instance_id_regex))
+
+    assert page_no == 2
+    assert sorted(ids) == [f"MW2_{i}" for i in range(IDS_PER_PAGE)]
+
+
+def test_failed_pages_are_retried_after_the_batch(fake_pool, monkeypatch):
+    failures = {2: 1, 3: 5}
+
+    def flaky_search_page(args):
+        if failures.get(args[1]):
+            failures[args[1]] -= 1
+            return args[1], None
+        return fake_search_page(args)
+
+    monkeypatch.setattr(BdrcScraper, "scrape", staticmethod(flaky_search_page))
+    scraper = BdrcScraper(page_retries=2, page_retry_delay=0)
+
+    pages = scraper.run_scrape("query", 4)
+
+    assert fake_pool.requested == [1, 2, 3, 4, 2, 3, 3]
+    assert "MW2_0" in pages[2]
+    # Page 3 failed every attempt
+    assert pages[3] == ""
+
+
+def test_failed_page_does_not_end_auto_pagination(fake_pool, monkeypatch):
+    failures = {2: 10}
+
+    def flaky_search_page(args):
+        if failures.get(args[1]):
+            failures[args[1]] -= 1
+            return args[1], None
+        return fake_search_page(args)
+
+    monkeypatch.setattr(BdrcScraper, "scrape", staticmethod(flaky_search_page))
+    scraper = BdrcScraper(page_retries=1, page_retry_delay=0)
+
+    ids = scraper.get_related_instance_ids("query", processes=2)
+
+    assert len(ids) == (RESULT_PAGES - 1) * IDS_PER_PAGE
+    assert scraper.result_page_count == RESULT_PAGES
+
+
+def test_auto_pagination_stops_when_no_page_of_a_wave_loads(fake_pool, monkeypatch):
+    monkeypatch.setattr(BdrcScraper, "scrape", staticmethod(lambda args: (args[1], None)))
+    scraper = BdrcScraper(page_retries=1, page_retry_delay=0)
+
+    ids = scraper.get_related_instance_ids("query", processes=2)
+
+    assert ids == []
+    assert scraper.result_page_count == 0
+    # One wave of two pages, each tried twice
+    assert fake_pool.requested == [1, 2, 1, 2]
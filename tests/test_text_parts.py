@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+from rdflib import RDF, RDFS, Namespace
+
+from benchmarks.synthetic import outline_trig
+from search_bdrc import BdrcScraper
+from search_bdrc.parsing import parse_outline_graph
+from search_bdrc.text_parts import extract_text_parts
+
+TRIG = Path(__file__).resolve().parent.parent / "outputs" / "trig"
+
+BDO = Namespace("http://purl.bdrc.io/ontology/core/")
+BDR = Namespace("http://purl.bdrc.io/resource/")
+SKOS = Namespace("http://www.w3.org/2004/02/skos/core#")
+
+
+def probing_text_parts(graph):
+    """The previous implementation, with one store lookup per property."""
+    def process_part(subject):
+        part_info = {
+            'id': str(subject).split('/')[-1],
+            'label': None,
+            'location': None,
+            'titles': [],
+            'colophon': None,
+            'part_index': None,
+            'part_tree_index': None,
+            'instance_of': None,
+            'part_of': None,
+            'root_instance': None
+        }
+        for label in graph.objects(subject, SKOS.prefLabel):
+            part_info['label'] = str(label)
+        for _, _, loc_node in graph.triples((subject, BDO.contentLocation, None)):
+            location_info = {'id': str(loc_node).split('/')[-1]}
+            for pred, obj in graph.predicate_objects(loc_node):
+                pred_name = str(pred).split('/')[-1]
+                if 'contentLocation' in pred_name and pred_name != 'contentLocation':
+                    key = pred_name.replace('contentLocation', '').lower()
+                    try:
+                        location_info[key] = int(obj)
+                    except ValueError:
+                        location_info[key] = str(obj).split('/')[-1] if '/' in str(obj) else str(obj).split('#')[-1]
+            part_info['location'] = location_info
+        for title_node in graph.objects(subject, BDO.hasTitle):
+            title_info = {'id': str(title_node).split('/')[-1], 'type': None, 'label': None}
+            for title_type in graph.objects(title_node, RDF.type):
+                title_info['type'] = str(title_type).split('/')[-1]
+            for label in graph.objects(title_node, SKOS.prefLabel):
+                title_info['label'] = str(label)
+            if not title_info['label']:
+                for label in graph.objects(title_node, RDFS.label):
+                    title_info['label'] = str(label)
+            part_info['titles'].append(title_info)
+        part_info['colophon'] = next((str(col) for col in graph.objects(subject, BDO.colophon)), None)
+        part_info['part_index'] = next((int(idx) for idx in graph.objects(subject, BDO.partIndex)), None)
+        part_info['part_tree_index'] = next((str(idx) for idx in graph.objects(subject, BDO.partTreeIndex)), None)
+        part_info['instance_of'] = next(
+            (str(work).split('/')[-1] for work in graph.objects(subject, BDO.instanceOf)), None
+        )
+        part_info['part_of'] = next(
+            (str(parent).split('/')[-1] for parent in graph.objects(subject, BDO.partOf)), None
+        )
+        part_info['root_instance'] = next(
+            (str(root).split('/')[-1] for root in graph.objects(subject, BDO.inRootInstance)), None
+        )
+        return part_info
+
+    text_parts = []
+    for part_type in [
+        BDR.PartTypeText, BDR.PartTypeTableOfContent, BDR.PartTypeVolume, BDR.PartTypeSection, BDR.PartTypeChapter
+    ]:
+        for s, _, _ in graph.triples((None, BDO.partType, part_type)):
+            text_parts.append(process_part(s))
+    return sorted(text_parts, key=lambda x: (x['part_tree_index'] or ''))
+
+
+@pytest.mark.parametrize("path", sorted(TRIG.glob("*.trig")), ids=lambda path: path.name)
+def test_fixture_outlines_match_probing(path):
+    graph = parse_outline_graph(path.read_text(encoding="utf-8"))
+
+    parts = BdrcScraper().get_ordered_text_parts(graph)
+
+    assert parts
+    assert parts == probing_text_parts(graph)
+    # key order matters for the JSON written from these records
+    assert [list(part) for part in parts] == [list(part) for part in probing_text_parts(graph)]
+
+
+def test_synthetic_outline_matches_probing():
+    graph = parse_outline_graph(outline_trig(500, fanout=6))
+
+    parts = extract_text_parts(graph)
+
+    assert len(parts) == 500
+    assert parts == probing_text_parts(graph)
+    assert any(len(part['titles']) == 2 for part in parts)
+
+
+def test_repeated_values_pick_the_same_object():
+    graph = parse_outline_graph("""
+        @prefix bdo: <http://purl.bdrc.io/ontology/core/> .
+        @prefix bdr: <http://purl.bdrc.io/resource/> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+        bdr:MW1_A bdo:partType bdr:PartTypeText ;
+            skos:prefLabel "first"@bo-x-ewts, "second"@en ;
+            bdo:contentLocation bdr:CL1, bdr:CL2 ;
+            bdo:hasTitle bdr:TT1 ;
+            bdo:partIndex 1, 2 .
+        bdr:CL1 bdo:contentLocationPage 3 .
+        bdr:CL2 bdo:contentLocationPage 4 ; bdo:contentLocationInstance bdr:W1 .
+        bdr:TT1 skos:prefLabel "" ; rdfs:label "a", "b" .
+    """)
+
+    assert extract_text_parts(graph) == probing_text_parts(graph)
+
+
+def test_compact_records_round_trip():
+    graph = parse_outline_graph((TRIG / "O2DB95714.trig").read_text(encoding="utf-8"))
+
+    parts = extract_text_parts(graph)
+    compact = extract_text_parts(graph, compact=True)
+
+    assert [part.to_dict() for part in compact] == parts
+    assert [list(part.to_dict()) for part in compact] == [list(part) for part in parts]
+    assert all(part.root_instance is compact[0].root_instance for part in compact)